@@ -2,23 +2,36 @@
 Unified MCP Server for DebtReversionAI
 Combines financial data and EDGAR tools into a single server for Dedalus deployment
 """
+import asyncio
 import os
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from src.tools.financial_tools import (
     get_stock_data as tools_get_stock_data,
     calculate_macd as tools_calculate_macd,
     check_52week_low as tools_check_52week_low,
     check_optionable as tools_check_optionable,
+    check_optionable_batch as tools_check_optionable_batch,
     get_stock_data_range as tools_get_stock_data_range,
+    get_stock_data_batch as tools_get_stock_data_batch,
+    check_52week_low_batch as tools_check_52week_low_batch,
+    calculate_macd_batch as tools_calculate_macd_batch,
 )
+from src.tools.screener import scan_52week_lows as tools_scan_52week_lows
 from src.tools.edgar_tools import (
     search_debt_conversions as tools_search_debt_conversions,
+    search_and_render_conversions as tools_search_and_render_conversions,
+    scan_market_conversions as tools_scan_market_conversions,
     get_recent_filings as tools_get_recent_filings,
     extract_conversion_terms as tools_extract_conversion_terms,
+    search_indexed_filings as tools_search_indexed_filings,
 )
 from src.tools.markdown_tools import render_structured_result as tools_render_structured_result
+from src.tools.optionable_index import optionable_index
+from src.tools.stats import get_cache_stats as tools_get_cache_stats
+from src.tools.ticker_map import ticker_map
 
 # Load environment variables from .env file
 env_path = Path(__file__).parent.parent / '.env'
@@ -61,11 +74,22 @@ mcp = FastMCP(
 
 Available tools:
 - get_stock_data(ticker, period): Get stock price data including 52-week high/low
-- calculate_macd(ticker, timeframe): Calculate MACD indicator for daily/weekly timeframes  
+- calculate_macd(ticker, timeframe): Calculate MACD indicator for daily/weekly/monthly timeframes, or "both" (daily + weekly)
 - check_52week_low(ticker, tolerance): Check if stock is at or near 52-week low
-- check_optionable(ticker): Verify if stock has options available
-- search_debt_conversions(ticker, months_back): Search for debt conversion events in 8-K filings
+- check_optionable(ticker, fast): Verify if stock has options available (fast=True skips the option-chain download)
+- check_optionable_batch(tickers): Optionability table for many tickers from the daily optionable index
+- get_stock_data_batch(tickers, period): Price summary table for many tickers in one call
+- check_52week_low_batch(tickers, tolerance): 52-week-low table for many tickers in one call
+- calculate_macd_batch(tickers, timeframe): MACD table for many tickers in one call
+- scan_52week_lows(universe, tolerance, limit): Rank a whole ticker universe by distance to the 52-week low
+- search_debt_conversions(ticker, months_back, keywords, items, max_results): Search for debt conversion events in 8-K filings (optional custom keyword list; only relevant 8-K items are downloaded unless items=["all"]; streams progress and matches, stops after max_results)
+- search_and_render_conversions(ticker, months_back, keywords, items, options, max_results): search_debt_conversions + convert_to_markdown in one call; returns the markdown snippet or chunks directly
+- convert_to_markdown(structured, options): Render a structured result as a markdown snippet or chunks; options={"mode": "chunked", "page_size": k} returns k chunks and a next_cursor, options={"cursor": next_cursor} the next page, options={"mode": "chunked", "top_k": k} only the k chunks densest in conversion keywords, $ amounts and dates
+- scan_market_conversions(start, end, keywords, max_filings): Scan every company's 8-K filings in a date window for debt conversion events
 - get_recent_filings(ticker, form_type, count): Get recent SEC filings for a company
+- extract_conversion_terms(filing_url): Extract conversion price, ratio, principal, maturity and VWAP discount terms from one filing
+- search_indexed_filings(phrases, days, universe, limit): Find already-fetched filings containing every phrase via the local text index (no EDGAR calls)
+- get_cache_stats(): Report counters for the price-history cache, OHLCV store, MACD state, optionable index, filing text cache and indexes, ticker map, SEC HTTP client and markdown cursors
 
 This server combines financial market data (via yfinance) with SEC EDGAR filing analysis.""",
 )
@@ -87,7 +111,10 @@ async def get_stock_data_range(ticker: str, start: str, end: str) -> str:
 
 @mcp.tool()
 async def calculate_macd(ticker: str, timeframe: str) -> str:
-    """Calculate MACD using internal financial tools."""
+    """Calculate MACD using internal financial tools.
+
+    timeframe: "daily", "weekly", "monthly" or "both" (daily and weekly from one fetch).
+    """
     return await tools_calculate_macd(ticker, timeframe)
 
 
@@ -98,15 +125,101 @@ async def check_52week_low(ticker: str, tolerance: float = 0.05) -> str:
 
 
 @mcp.tool()
-async def check_optionable(ticker: str) -> str:
-    """Check option availability using internal financial tools."""
-    return await tools_check_optionable(ticker)
+async def check_optionable(ticker: str, fast: bool = False) -> str:
+    """Check option availability using internal financial tools.
+
+    fast: answer from the expiration list alone, without downloading an option chain.
+    """
+    return await tools_check_optionable(ticker, fast)
+
+
+@mcp.tool()
+async def check_optionable_batch(tickers: list[str]) -> str:
+    """Check option availability for many tickers from the daily optionable index."""
+    return await tools_check_optionable_batch(tickers)
+
+
+@mcp.tool()
+async def get_stock_data_batch(tickers: list[str], period: str = "1y") -> str:
+    """Get price summaries for many tickers from one bulk download."""
+    return await tools_get_stock_data_batch(tickers, period)
+
+
+@mcp.tool()
+async def check_52week_low_batch(tickers: list[str], tolerance: float = 0.05) -> str:
+    """Check 52-week lows for many tickers from one bulk download."""
+    return await tools_check_52week_low_batch(tickers, tolerance)
+
+
+@mcp.tool()
+async def calculate_macd_batch(tickers: list[str], timeframe: str = "daily") -> str:
+    """Calculate MACD for many tickers from one bulk download."""
+    return await tools_calculate_macd_batch(tickers, timeframe)
+
+
+@mcp.tool()
+async def scan_52week_lows(universe: list[str] | str, tolerance: float = 0.05, limit: int = 50) -> str:
+    """Scan a universe (ticker list or universe name) for stocks near 52-week lows."""
+    return await tools_scan_52week_lows(universe, tolerance, limit)
 
 
 @mcp.tool()
-async def search_debt_conversions(ticker: str, months_back: int = 3) -> str:
-    """Search for debt conversion events using internal EDGAR tools."""
-    return await tools_search_debt_conversions(ticker, months_back)
+async def get_cache_stats() -> str:
+    """Report counters of every cache, index and upstream client (wrapper around src.tools.stats)."""
+    return await tools_get_cache_stats()
+
+
+def _scan_callbacks(ctx: Context | None, ticker: str):
+    """Progress and per-match notification callbacks for a conversion search, or (None, None)."""
+    if ctx is None:
+        return None, None
+
+    async def progress(scanned: int, total: int) -> None:
+        await ctx.report_progress(scanned, total, message=f"Scanned {scanned} of {total} 8-K filings")
+
+    async def on_match(conv: dict) -> None:
+        await ctx.info(f"{ticker} conversion match: {conv['date']} {conv['accession']} {conv['url']}")
+
+    return progress, on_match
+
+
+@mcp.tool()
+async def search_debt_conversions(ticker: str, months_back: int = 3, keywords: list[str] | None = None,
+                                  items: list[str] | None = None, max_results: int | None = None,
+                                  ctx: Context | None = None) -> str:
+    """Search for debt conversion events using internal EDGAR tools.
+
+    keywords: optional case-insensitive vocabulary replacing the default conversion keywords.
+    items: 8-K item codes worth downloading (default 1.01, 2.03, 3.02, 8.01); ["all"] scans every 8-K.
+    max_results: stop scanning once this many matches are found.
+    Progress (filings scanned / total) and each match are sent as notifications while the scan runs.
+    """
+    progress, on_match = _scan_callbacks(ctx, ticker)
+    return await tools_search_debt_conversions(ticker, months_back, keywords, items, max_results, progress, on_match)
+
+
+@mcp.tool()
+async def search_and_render_conversions(ticker: str, months_back: int = 3, keywords: list[str] | None = None,
+                                        items: list[str] | None = None, options: dict | None = None,
+                                        max_results: int | None = None, ctx: Context | None = None) -> dict:
+    """Search for debt conversion events and return them already rendered as markdown.
+
+    Equivalent to search_debt_conversions followed by convert_to_markdown in one call;
+    options are the convert_to_markdown options (e.g. {"mode": "chunked", "max_tokens": 200}).
+    """
+    progress, on_match = _scan_callbacks(ctx, ticker)
+    return await tools_search_and_render_conversions(ticker, months_back, keywords, items, options or {},
+                                                     max_results, progress, on_match)
+
+
+@mcp.tool()
+async def scan_market_conversions(start: str | None = None, end: str | None = None,
+                                  keywords: list[str] | None = None, max_filings: int | None = None) -> str:
+    """Scan all filers' 8-Ks in a date window (YYYY-MM-DD, default last 7 days) for conversion events.
+
+    max_filings defaults to MARKET_SCAN_MAX_FILINGS (500).
+    """
+    return await tools_scan_market_conversions(start, end, keywords, max_filings)
 
 
 @mcp.tool()
@@ -115,17 +228,39 @@ async def get_recent_filings(ticker: str, form_type: str = "8-K", count: int = 1
     return await tools_get_recent_filings(ticker, form_type, count)
 
 
+@mcp.tool()
+async def search_indexed_filings(phrases: list[str], days: int = 30, universe: str | list[str] | None = None,
+                                 limit: int = 50) -> str:
+    """Find filings fetched earlier that contain every phrase (e.g. ["convertible note", "conversion price"]).
+
+    Answered from the local inverted index of cached filing text in milliseconds; universe
+    (universe name or ticker list) restricts the companies.
+    """
+    return await tools_search_indexed_filings(phrases, days, universe, limit)
+
+
+@mcp.tool()
+async def extract_conversion_terms(filing_url: str) -> str:
+    """Extract structured conversion terms (with source offsets) from a filing URL or accession number."""
+    return await tools_extract_conversion_terms(filing_url)
+
+
 @mcp.tool()
 async def convert_to_markdown(structured: dict, options: dict = None) -> dict:
     """Convert a structured retrieval result into markdown chunks or snippet.
 
     Calls into src.tools.markdown_tools.render_structured_result which returns
     a dict containing either {'mode':'snippet','markdown':...} or
-    {'mode':'chunked','chunks':[...]}.
+    {'mode':'chunked','chunks':[...]}. With options {'page_size': k} chunked mode
+    returns k chunks and a 'next_cursor'; pass {'cursor': next_cursor} (structured
+    may be empty) to fetch the next page. With {'top_k': k} only the k chunks
+    scoring highest for conversion keywords, $ amounts and dates are returned,
+    each with its original 'index' and a 'score'.
     """
-    # Render and return the dict directly so LLM callers can inspect chunks
+    # Render and return the dict directly so LLM callers can inspect chunks.
+    # Rendering may read cached filings and convert HTML, so it runs off the event loop.
     try:
-        return tools_render_structured_result(structured or {}, options or {})
+        return await asyncio.to_thread(tools_render_structured_result, structured or {}, options or {})
     except Exception as e:
         return {'error': str(e)}
 
@@ -145,6 +280,13 @@ def main():
         print('DebtReversionAI MCP Server loaded successfully')
         print('Tools available: get_stock_data, calculate_macd, check_52week_low, check_optionable, search_debt_conversions, get_recent_filings')
         return 0
+
+    # Map the SEC ticker table into memory in the background so the first
+    # EDGAR tool call does not pay for the download
+    threading.Thread(target=ticker_map.load, daemon=True).start()
+    if optionable_index.symbols_url:
+        # Re-download the optionable symbol directory once per OPTIONABLE_SYMBOLS_TTL
+        threading.Thread(target=optionable_index.refresh_schedule, daemon=True).start()
     
     # Determine transport mode (stdio is default for Dedalus)
     # Resolve host
@@ -0,0 +1,163 @@
+"""Structured extraction of debt-conversion terms from filing text.
+
+The conversion search used to hand the LLM raw 1,000-character snippets and
+a list of every ``$`` amount in them. This module runs a small set of
+precompiled patterns over the text and returns typed terms, each with the
+offsets of the sentence fragment it came from:
+
+- ``conversion_price``: "conversion price of $0.50", "convertible ... at $1.25 per share"
+- ``conversion_ratio``: "conversion rate of 74.0741 shares ... per $1,000 principal amount"
+- ``principal``: "$5,000,000 aggregate principal amount", "principal amount of $2.5 million"
+- ``maturity``: "matures on June 30, 2027", "Convertible Notes due 2029"
+- ``vwap_discount``: "85% of the lowest VWAP during the 10 trading days", "20% discount to the VWAP"
+
+:func:`extract_terms_batch` runs the engine over many snippets in one call.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+import re
+
+_FLAGS = re.IGNORECASE
+_NUM = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_SCALE = r"(?:\s*(?P<scale>million|billion|thousand)\b)?"
+_SCALES = {"thousand": 1e3, "million": 1e6, "billion": 1e9}
+_MONTHS = r"(?:January|February|March|April|May|June|July|August|September|October|November|December)"
+
+_PRICE_RES = (
+    re.compile(
+        r"conversion\s+price\s+(?:per\s+share\s+)?(?:of|equal\s+to|is|shall\s+be|will\s+be|was|initially)?\s*"
+        r"(?:of\s+)?(?:approximately\s+)?\$\s?(?P<amount>" + _NUM + r")", _FLAGS),
+    re.compile(
+        r"convert(?:ible|ed)?\b[^.$]{0,120}?\bat\s+(?:a\s+(?:fixed\s+)?(?:conversion\s+)?price\s+of\s+)?"
+        r"\$\s?(?P<amount>" + _NUM + r")\s+per\s+share", _FLAGS),
+)
+_RATIO_RE = re.compile(
+    r"conversion\s+rate\s+(?:of|is|will\s+be|shall\s+be)?\s*(?:initially\s+)?(?P<shares>" + _NUM + r")\s+shares"
+    r"[^.]{0,80}?per\s+\$\s?(?P<per>" + _NUM + r")", _FLAGS)
+_PRINCIPAL_RES = (
+    re.compile(
+        r"\$\s?(?P<amount>" + _NUM + r")" + _SCALE + r"\s+(?:in\s+)?(?:original\s+|aggregate\s+)*principal\s+amount",
+        _FLAGS),
+    re.compile(
+        r"(?:aggregate\s+|original\s+)*principal\s+amount\s+of\s+(?:up\s+to\s+)?\$\s?(?P<amount>" + _NUM + r")"
+        + _SCALE, _FLAGS),
+)
+_MATURITY_RES = (
+    re.compile(
+        r"(?:matur(?:e|es|ing)|maturity\s+date\s+(?:of|is|shall\s+be)|(?:due|payable)(?:\s+and\s+payable)?)\s+"
+        r"(?:on\s+)?(?P<date>" + _MONTHS + r"\s+\d{1,2},\s+\d{4})", _FLAGS),
+    re.compile(r"\bnotes?\s+due\s+(?P<year>(?:19|20)\d{2})\b", _FLAGS),
+)
+_VWAP_RE = re.compile(
+    r"(?P<pct>\d{1,3}(?:\.\d+)?)\s*%\s+(?P<relation>discount\s+to|of)\s+(?:the\s+)?"
+    r"[^.;%]{0,120}?\b(?:VWAPs?|volume[- ]weighted\s+average\s+(?:trading\s+|sale\s+)?prices?)", _FLAGS)
+_LOOKBACK_RE = re.compile(r"(?P<days>\d{1,3})\)?\s+(?:consecutive\s+)?trading\s+days?", _FLAGS)
+_DOLLAR_RE = re.compile(r"\$(" + _NUM + r")")
+
+
+class ConversionTerm(NamedTuple):
+    kind: str
+    value: Union[float, str, Dict[str, Optional[float]]]
+    start: int  # offset of the matched fragment in the source text
+    end: int
+    text: str
+
+
+def _amount(match: re.Match) -> float:
+    value = float(match.group("amount").replace(",", ""))
+    scale = match.groupdict().get("scale")
+    return value * _SCALES[scale.lower()] if scale else value
+
+
+def extract_prices(text: str) -> List[float]:
+    """Return every plausible ``$`` amount in ``text`` (e.g. $1,234.56), in order."""
+    if not text:
+        return []
+    candidates = []
+    for raw in _DOLLAR_RE.findall(text):
+        value = float(raw.replace(",", ""))
+        # Filter out unrealistic values for conversion prices
+        if 0.0001 < value < 1000000:
+            candidates.append(value)
+    return candidates
+
+
+def extract_terms(text: str, base_offset: int = 0) -> List[ConversionTerm]:
+    """Extract conversion terms from ``text``; offsets are shifted by ``base_offset``."""
+    if not text:
+        return []
+    terms: List[ConversionTerm] = []
+
+    def add(kind, value, m: re.Match):
+        terms.append(ConversionTerm(kind, value, base_offset + m.start(), base_offset + m.end(), m.group(0)))
+
+    for pattern in _PRICE_RES:
+        for m in pattern.finditer(text):
+            add("conversion_price", _amount(m), m)
+    for m in _RATIO_RE.finditer(text):
+        shares = float(m.group("shares").replace(",", ""))
+        per = float(m.group("per").replace(",", ""))
+        add("conversion_ratio", {
+            "shares": shares, "per_principal": per, "implied_price": per / shares if shares else None,
+        }, m)
+    for pattern in _PRINCIPAL_RES:
+        for m in pattern.finditer(text):
+            # "... shares per $1,000 principal amount" is a ratio denominator, not a principal
+            if text[max(0, m.start() - 8):m.start()].rstrip().lower().endswith("per"):
+                continue
+            add("principal", _amount(m), m)
+    for m in _MATURITY_RES[0].finditer(text):
+        try:
+            day = datetime.strptime(re.sub(r"\s+", " ", m.group("date")).title(), "%B %d, %Y")
+        except ValueError:
+            continue
+        add("maturity", day.date().isoformat(), m)
+    for m in _MATURITY_RES[1].finditer(text):
+        add("maturity", m.group("year"), m)
+    for m in _VWAP_RE.finditer(text):
+        pct = float(m.group("pct"))
+        is_discount = m.group("relation").lower().startswith("discount")
+        lookback = _LOOKBACK_RE.search(text, m.start(), min(len(text), m.end() + 120))
+        add("vwap_discount", {
+            "discount_pct": pct if is_discount else round(100.0 - pct, 6),
+            "percent_of_vwap": round(100.0 - pct, 6) if is_discount else pct,
+            "lookback_days": float(lookback.group("days")) if lookback else None,
+        }, m)
+
+    # Two phrasings can match the same term; keep its first occurrence
+    seen = set()
+    unique = []
+    for term in sorted(terms, key=lambda t: (t.start, t.kind)):
+        key = (term.kind, repr(term.value))
+        if key not in seen:
+            seen.add(key)
+            unique.append(term)
+    return unique
+
+
+def extract_terms_batch(texts: Iterable[str], base_offsets: Optional[Iterable[int]] = None
+                        ) -> List[List[ConversionTerm]]:
+    """Run :func:`extract_terms` over many snippets at once."""
+    texts = list(texts)
+    offsets = list(base_offsets) if base_offsets is not None else [0] * len(texts)
+    return [extract_terms(t, o) for t, o in zip(texts, offsets)]
+
+
+def _money(value: float) -> str:
+    return f"${value:,.2f}" if value == round(value, 2) else f"${value:,.4f}"
+
+
+def format_term(term: ConversionTerm) -> str:
+    """One-line rendering of a term for tool output."""
+    value = term.value
+    if term.kind in ("conversion_price", "principal"):
+        shown = _money(value)
+    elif term.kind == "conversion_ratio":
+        implied = f", implied {_money(value['implied_price'])}" if value.get("implied_price") else ""
+        shown = f"{value['shares']:g} shares per {_money(value['per_principal'])}{implied}"
+    elif term.kind == "vwap_discount":
+        days = f" over {value['lookback_days']:g} trading days" if value.get("lookback_days") else ""
+        shown = f"{value['percent_of_vwap']:g}% of VWAP ({value['discount_pct']:g}% discount){days}"
+    else:
+        shown = str(value)
+    return f"{term.kind}={shown} @{term.start}"
@@ -1,8 +1,44 @@
 from mcp.types import TextContent
-from edgar import Company, set_identity
+from edgar import Filing, set_identity
+from contextlib import aclosing
 from datetime import datetime, date, timedelta
+from typing import Any, Dict
+import asyncio
+import logging
 import os
 import re
+import time
+
+from src.tools.conversion_terms import extract_prices, extract_terms, extract_terms_batch, format_term
+from src.tools.filing_cache import filing_text_cache
+from src.tools.filing_index import _parse_filing_date, filing_index
+from src.tools.form_index import form_index
+from src.tools.keyword_matcher import KeywordMatcher, get_matcher
+from src.tools.markdown_tools import render_structured_result
+from src.tools.screener import resolve_universe
+from src.tools.text_index import text_index
+from src.tools.ticker_map import ticker_map
+from src.tools.upstream import SEC, UPSTREAM_MAX_WORKERS, run_upstream, run_upstream_shared
+
+logger = logging.getLogger(__name__)
+
+# Filing bodies fetched concurrently by one search; the SEC executor
+# (SEC_MAX_WORKERS) still bounds the total across all searches
+SEC_FILING_FETCH_CONCURRENCY = int(os.getenv("SEC_FILING_FETCH_CONCURRENCY", str(UPSTREAM_MAX_WORKERS[SEC])))
+
+# Upper bound on filing bodies one market-wide scan downloads
+MARKET_SCAN_MAX_FILINGS = int(os.getenv("MARKET_SCAN_MAX_FILINGS", "500"))
+
+# 8-K items that can disclose a debt conversion: 1.01 material agreement,
+# 2.03 direct financial obligation, 3.02 unregistered equity sale, 8.01 other
+CONVERSION_ITEM_CODES = tuple(
+    c.strip() for c in os.getenv("CONVERSION_ITEM_CODES", "1.01,2.03,3.02,8.01").split(",") if c.strip()
+)
+
+# Exhibits that carry note, indenture and press-release conversion terms
+_CONVERSION_EXHIBIT_PREFIXES = ("EX-4", "EX-10", "EX-99")
+_EXHIBITS_MARKER = "[EXHIBITS]\n"
+_ITEM_CODE_RE = re.compile(r"\d+\.\d+")
 
 # Set SEC identity if provided
 if os.getenv("SEC_API_USER_AGENT"):
@@ -13,144 +49,359 @@ if os.getenv("SEC_API_USER_AGENT"):
         pass
 
 
-async def search_debt_conversions(ticker: str, months_back: int = 3) -> str:
-    try:
-        company = Company(ticker)
-
-        cutoff_date = datetime.now() - timedelta(days=months_back * 30)
-
-        # Some EDGAR client implementations use pyarrow-backed filters which may
-        # behave differently across environments. To avoid pyarrow-specific
-        # attribute errors, fetch a reasonable recent slice of filings and
-        # perform date filtering in Python.
-        raw_filings = company.get_filings(form="8-K")
-
-        conversions = []
-        keywords = [
-            "conversion",
-            "convertible",
-            "debt conversion",
-            "note conversion",
-            "debenture",
-        ]
+def _filing_text(filing) -> str:
+    """Blocking helper: return a cleaned text representation of ``filing``.
 
-        # Try to iterate a modest number of recent filings and filter by date
-        # in-Python to avoid pyarrow/chunked array issues in some installs.
+    Successfully extracted text is stored in the filing-text cache; the
+    ``str(filing)`` fallback is not, so a transient failure is retried later.
+    """
+    extracted = True
+    try:
+        # edgartools exposes filing.text(detail=...) for different levels
+        # of extraction; prefer a standard/clean text if available.
+        text = filing.text(detail='standard')
+    except Exception:
         try:
-            candidate_filings = list(raw_filings[:200])
+            text = filing.text()
         except Exception:
-            # If slicing fails for any reason, fallback to using the raw iterator
+            extracted = False
             try:
-                candidate_filings = list(raw_filings)
+                text = str(filing)
             except Exception:
-                candidate_filings = []
+                text = ''
 
-        # Debug: print how many candidate filings we will scan and their accessions/dates
+    if not isinstance(text, str):
         try:
-            debug_list = []
-            for f in candidate_filings:
-                debug_list.append({
-                    'accession': getattr(f, 'accession_no', None),
-                    'filing_date': getattr(f, 'filing_date', getattr(f, 'date', None))
-                })
-            print(f"[DEBUG] candidate_filings_count={len(candidate_filings)} sample={debug_list[:10]}")
+            text = str(text)
         except Exception:
-            print("[DEBUG] candidate_filings: unable to enumerate details")
+            text = ''
+    if extracted:
+        filing_text_cache.put(getattr(filing, 'accession_no', None), text)
+        _index_text(filing, text, "body")
+    return text
+
 
-        # Limit how many filings we will scan to avoid very long runs
-        for filing in candidate_filings:
+def _exhibits_text(filing) -> str:
+    """Blocking helper: return the text of ``filing``'s conversion-relevant exhibits."""
+    try:
+        exhibits = list(filing.exhibits)
+    except Exception:
+        return ''
+    parts = []
+    for exhibit in exhibits:
+        doc_type = (getattr(exhibit, 'document_type', '') or '').upper()
+        if not doc_type.startswith(_CONVERSION_EXHIBIT_PREFIXES):
+            continue
+        try:
+            text = exhibit.text()
+        except Exception:
+            continue
+        if text:
+            parts.append(f"[{doc_type}]\n{text}")
+    text = "\n\n".join(parts)
+    # Cached under its own key with a marker so "no exhibits" is cached too
+    accession = getattr(filing, 'accession_no', None)
+    if accession:
+        filing_text_cache.put(f"{accession}-exhibits", _EXHIBITS_MARKER + text)
+        _index_text(filing, text, "exhibits")
+    return text
+
+
+def _index_text(filing, text: str, part: str) -> None:
+    """Blocking helper: add text entering the filing-text cache to the inverted text index."""
+    accession = getattr(filing, 'accession_no', None)
+    if not filing_text_cache.enabled or not accession or not text:
+        return
+    fdate = _parse_filing_date(getattr(filing, 'filing_date', None))
+    cik = getattr(filing, 'cik', None)
+    text_index.add(
+        accession, text, part,
+        cik=int(cik) if cik else None,
+        company=getattr(filing, 'company', None),
+        form=getattr(filing, 'form', None),
+        filing_date=fdate.date() if fdate else None,
+    )
+
+
+def _unindex_evicted(key: str) -> None:
+    """Blocking helper: drop a filing-text cache entry that was evicted from the text index."""
+    if key.endswith("-exhibits"):
+        text_index.remove(key[: -len("-exhibits")], "exhibits")
+    else:
+        text_index.remove(key, "body")
+
+
+# The index only covers cached text, so it shrinks with the cache
+filing_text_cache.on_evict = _unindex_evicted
+
+
+async def get_filing_text(filing, include_exhibits: bool = False) -> str:
+    """Return the text of ``filing``, downloading it only on a filing-text cache miss.
+
+    With ``include_exhibits`` the text of EX-4/EX-10/EX-99 exhibits is appended.
+    """
+    accession = getattr(filing, 'accession_no', None)
+    # Cache reads decompress multi-MB files; keep them off the event loop
+    text = await asyncio.to_thread(filing_text_cache.get, accession)
+    if text is None:
+        text = await run_upstream_shared(SEC, ("text", accession or id(filing)), _filing_text, filing)
+    elif not await asyncio.to_thread(text_index.contains, accession):
+        # Cached before the text index existed: index it once
+        await run_upstream(SEC, _index_text, filing, text, "body")
+    if not include_exhibits:
+        return text
+
+    exhibits = await asyncio.to_thread(filing_text_cache.get, f"{accession}-exhibits") if accession else None
+    if exhibits is not None:
+        exhibits = exhibits[len(_EXHIBITS_MARKER):]
+    else:
+        exhibits = await run_upstream_shared(SEC, ("exhibits", accession or id(filing)), _exhibits_text, filing)
+    return f"{text}\n\n{exhibits}" if exhibits else text
+
+
+def _item_codes(items) -> set:
+    """Parse 8-K item codes ("2.03,9.01", "Item 2.03") into a set of codes."""
+    return set(_ITEM_CODE_RE.findall(items)) if isinstance(items, str) else set()
+
+
+def _wanted_items(items):
+    """Resolve the ``items`` option: None -> configured codes, "all" -> no filtering."""
+    if items is None:
+        return set(CONVERSION_ITEM_CODES)
+    if isinstance(items, str):
+        items = [items]
+    if any(str(i).strip().lower() == "all" for i in items):
+        return None
+    return set().union(*(_item_codes(str(i)) for i in items))
+
+
+def _indexed_filings(ticker: str, form: str, start: date, limit: int):
+    """Blocking helper: up to ``limit`` ``form`` filings since ``start``, newest first, from the filing index."""
+    cik, company, records = filing_index.query(ticker, form=form, start=start, limit=limit)
+    filings = []
+    for record in records:
+        filing = Filing(
+            cik=cik, company=company, form=record.form,
+            filing_date=record.filing_date, accession_no=record.accession_no,
+        )
+        filing.items = record.items
+        filings.append(filing)
+    return filings
+
+
+async def _scan_filing(filing, matcher: KeywordMatcher, semaphore: asyncio.Semaphore,
+                       include_exhibits: bool = False):
+    """Fetch one filing body and return its conversion record, or None if no keyword matches."""
+    async with semaphore:
+        # Try to get a cleaned text representation suitable for keyword search
+        text = await get_filing_text(filing, include_exhibits)
+
+    # Matching a multi-MB filing is CPU work: keep it off the event loop
+    first_idx, counts = await asyncio.to_thread(matcher.scan, text)
+
+    if not counts:
+        return None
+
+    # Produce a context snippet around the first keyword match
+    start = max(0, first_idx - 500)
+    end = min(len(text), first_idx + 500)
+    snippet = text[start:end]
+
+    # We do not attempt to guess a single conversion price here —
+    # the LLM can inspect the snippet if it needs to identify the
+    # correct price. Store the snippet and metadata only.
+    return {
+        "date": getattr(filing, 'filing_date', getattr(filing, 'date', None)),
+        "accession": getattr(filing, 'accession_no', None),
+        "company": getattr(filing, 'company', None),
+        "cik": getattr(filing, 'cik', None),
+        "items": getattr(filing, 'items', None),
+        "url": getattr(filing, 'url', None),
+        "snippet": snippet,
+        "snippet_offset": start,
+        "keywords": counts,
+    }
+
+
+def _attach_terms(conversions) -> None:
+    """Extract structured terms from every matched snippet in one batch."""
+    batch = extract_terms_batch(
+        (conv.get('snippet') or '' for conv in conversions),
+        (conv.get('snippet_offset') or 0 for conv in conversions),
+    )
+    for conv, terms in zip(conversions, batch):
+        conv['terms'] = terms
+
+
+async def _iter_scans(filings, matcher: KeywordMatcher, include_exhibits: bool = False):
+    """Yield ``(position, result)`` for each filing as soon as its scan completes.
+
+    At most ``SEC_FILING_FETCH_CONCURRENCY`` scans are in flight, so only
+    their filing bodies are held in memory. A failed scan yields its exception.
+    Closing the generator early cancels the scans still in flight.
+    """
+    concurrency = max(1, SEC_FILING_FETCH_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = iter(enumerate(filings))
+    in_flight = {}
+
+    def launch_next():
+        for position, filing in pending:
+            task = asyncio.ensure_future(_scan_filing(filing, matcher, semaphore, include_exhibits))
+            in_flight[task] = position
+            return
+
+    try:
+        for _ in range(concurrency):
+            launch_next()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                position = in_flight.pop(task)
+                launch_next()
+                yield position, task.exception() or task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+async def _collect_conversions(ticker: str, months_back: int, keywords=None, items=None,
+                               max_results: int = None, progress=None, on_match=None) -> dict:
+    """Run the conversion search and return its matches (newest first) and scan counts."""
+    cutoff_date = datetime.now() - timedelta(days=months_back * 30)
+
+    candidate_filings = await run_upstream_shared(
+        SEC, ("filings", ticker.upper(), "8-K", cutoff_date.date(), 200),
+        _indexed_filings, ticker, "8-K", cutoff_date.date(), 200,
+    )
+
+    matcher = get_matcher(keywords)
+    wanted_items = _wanted_items(items)
+    skipped_items = 0
+
+    # Debug: log how many candidate filings we will scan and their accessions/dates
+    # (never print: stdout carries the stdio JSON-RPC stream)
+    try:
+        debug_list = []
+        for f in candidate_filings:
+            debug_list.append({
+                'accession': getattr(f, 'accession_no', None),
+                'filing_date': getattr(f, 'filing_date', getattr(f, 'date', None))
+            })
+        logger.debug("candidate_filings_count=%d sample=%s", len(candidate_filings), debug_list[:10])
+    except Exception:
+        logger.debug("candidate_filings: unable to enumerate details")
+
+    # Limit how many filings we will scan to avoid very long runs
+    in_window = []
+    for filing in candidate_filings:
+        try:
+            fdate = getattr(filing, 'filing_date', None)
+            if fdate is None:
+                # Some filing objects provide date as a string under different attrs
+                fdate = getattr(filing, 'date', None)
+            # Normalize to datetime for comparison
+            fdate_dt = _parse_filing_date(fdate)
+
+            # Debug: log raw and parsed date for this filing
             try:
-                fdate = getattr(filing, 'filing_date', None)
-                if fdate is None:
-                    # Some filing objects provide date as a string under different attrs
-                    fdate = getattr(filing, 'date', None)
-                # Normalize to datetime for comparison
-                if isinstance(fdate, str):
-                    try:
-                        fdate_dt = datetime.fromisoformat(fdate)
-                    except Exception:
-                        # Try parsing only the date component
-                        try:
-                            fdate_dt = datetime.strptime(fdate.split('T')[0], '%Y-%m-%d')
-                        except Exception:
-                            fdate_dt = None
-                elif isinstance(fdate, datetime):
-                    fdate_dt = fdate
-                elif isinstance(fdate, date):
-                    # Convert date to datetime at midnight for comparison
-                    fdate_dt = datetime(fdate.year, fdate.month, fdate.day)
-                else:
-                    fdate_dt = None
-
-                # Debug: print raw and parsed date for this filing
-                try:
-                    accession_dbg = getattr(filing, 'accession_no', None)
-                except Exception:
-                    accession_dbg = None
-                print(f"[DEBUG] checking filing accession={accession_dbg} raw_date={fdate} parsed_date={fdate_dt}")
-
-                # If we could not determine a datetime for this filing, skip it
-                if not fdate_dt:
-                    print(f"[DEBUG] skipping accession={accession_dbg}: no parseable date")
-                    continue
-                # Skip filings older than cutoff
-                if fdate_dt < cutoff_date:
-                    print(f"[DEBUG] skipping accession={accession_dbg}: date {fdate_dt} older than cutoff {cutoff_date}")
-                    continue
-
-                # Try to get a cleaned text representation suitable for keyword search
-                try:
-                    # edgartools exposes filing.text(detail=...) for different levels
-                    # of extraction; prefer a standard/clean text if available.
-                    text = filing.text(detail='standard')
-                except Exception:
-                    try:
-                        text = filing.text()
-                    except Exception:
-                        try:
-                            text = str(filing)
-                        except Exception:
-                            text = ''
-
-                if not isinstance(text, str):
-                    try:
-                        text = str(text)
-                    except Exception:
-                        text = ''
-
-                text_l = text.lower()
-
-                if any(keyword in text_l for keyword in keywords):
-                    # Find the first keyword match and produce a context snippet
-                    first_idx = min((text_l.find(k) for k in keywords if k in text_l), default=-1)
-                    snippet = ''
-                    if first_idx != -1:
-                        start = max(0, first_idx - 500)
-                        end = min(len(text), first_idx + 500)
-                        snippet = text[start:end]
-
-                    # We do not attempt to guess a single conversion price here —
-                    # the LLM can inspect the snippet if it needs to identify the
-                    # correct price. Store the snippet and metadata only.
-                    conversions.append(
-                        {
-                            "date": getattr(filing, 'filing_date', getattr(filing, 'date', None)),
-                            "accession": getattr(filing, 'accession_no', None),
-                            "url": getattr(filing, 'url', None),
-                            "snippet": snippet,
-                        }
-                    )
+                accession_dbg = getattr(filing, 'accession_no', None)
             except Exception:
-                # Ignore issues parsing a single filing and continue
+                accession_dbg = None
+            logger.debug("checking filing accession=%s raw_date=%s parsed_date=%s", accession_dbg, fdate, fdate_dt)
+
+            # If we could not determine a datetime for this filing, skip it
+            if not fdate_dt:
+                logger.debug("skipping accession=%s: no parseable date", accession_dbg)
                 continue
+            # Skip filings older than cutoff
+            if fdate_dt < cutoff_date:
+                logger.debug("skipping accession=%s: date %s older than cutoff %s", accession_dbg, fdate_dt, cutoff_date)
+                continue
+            # Skip 8-Ks whose item codes can never carry a conversion (unknown items are scanned)
+            codes = _item_codes(getattr(filing, 'items', None))
+            if wanted_items is not None and codes and not codes & wanted_items:
+                logger.debug("skipping accession=%s: items %s not relevant", accession_dbg, sorted(codes))
+                skipped_items += 1
+                continue
+            in_window.append((fdate_dt, filing))
+        except Exception:
+            # Ignore issues parsing a single filing and continue
+            continue
 
-        result = f"Debt Conversion Search for {ticker} (Last {months_back} months):\n"
-        result += f"Found {len(conversions)} potential conversion events\n\n"
+    # Scan the in-window filings concurrently, reporting each match as it completes
+    matches = []
+    scanned = 0
+    async with aclosing(_iter_scans([f for _, f in in_window], matcher, include_exhibits=True)) as scans:
+        async for position, conv in scans:
+            scanned += 1
+            if isinstance(conv, dict):
+                _attach_terms([conv])
+                matches.append((in_window[position][0], conv))
+                if on_match is not None:
+                    await on_match(conv)
+            if progress is not None:
+                await progress(scanned, len(in_window))
+            if max_results and len(matches) >= max_results:
+                break
 
-        for conv in conversions:
+    # Report matches newest first regardless of fetch completion order
+    matches.sort(key=lambda m: m[0], reverse=True)
+    conversions = [conv for _, conv in matches]
+    return {
+        "conversions": conversions,
+        "scanned": scanned,
+        "total": len(in_window),
+        "skipped_items": skipped_items,
+        "max_results": max_results,
+    }
+
+
+def _search_summary(ticker: str, months_back: int, search: dict) -> str:
+    summary = f"Debt Conversion Search for {ticker} (Last {months_back} months):\n"
+    if search["skipped_items"]:
+        summary += f"Skipped {search['skipped_items']} 8-Ks with unrelated items\n"
+    summary += f"Found {len(search['conversions'])} potential conversion events"
+    if search["scanned"] < search["total"]:
+        summary += (f" (stopped after {search['max_results']} matches; "
+                    f"scanned {search['scanned']} of {search['total']} filings)")
+    return summary + "\n"
+
+
+def _conversion_details(conv) -> str:
+    """Keyword, term and snippet lines of one match, shared by the text and markdown outputs."""
+    out = ""
+    if conv.get('keywords'):
+        out += "Keywords: " + ", ".join(f"{k} ({n})" for k, n in conv['keywords'].items()) + "\n"
+    if conv.get('terms'):
+        out += "Terms: " + "; ".join(format_term(t) for t in conv['terms']) + "\n"
+    return out
+
+
+async def search_debt_conversions(ticker: str, months_back: int = 3, keywords=None, items=None,
+                                  max_results: int = None, progress=None, on_match=None) -> str:
+    """Scan recent 8-Ks for conversion language.
+
+    ``keywords`` overrides the configured vocabulary. Only 8-Ks reporting one of
+    ``items`` (default ``CONVERSION_ITEM_CODES``; "all" disables the filter) are
+    downloaded, together with their EX-4/EX-10/EX-99 exhibits.
+
+    Matches are streamed while the scan runs: ``on_match(conv)`` is awaited
+    for each match as it is found and ``progress(scanned, total)`` after each
+    filing. The scan stops, cancelling pending downloads, once ``max_results``
+    matches are found.
+    """
+    try:
+        search = await _collect_conversions(ticker, months_back, keywords, items, max_results, progress, on_match)
+
+        result = _search_summary(ticker, months_back, search) + "\n"
+        for conv in search["conversions"]:
             result += f"- Date: {conv['date']}\n"
             result += f"  Accession: {conv['accession']}\n"
+            if conv.get('items'):
+                result += f"  Items: {conv['items']}\n"
             result += f"  URL: {conv['url']}\n"
+            result += "".join(f"  {line}\n" for line in _conversion_details(conv).splitlines())
             if conv.get('snippet'):
                 result += "  Snippet:\n\n"
                 # include snippet in a fenced code block so LLMs can read it verbatim
@@ -162,47 +413,62 @@ async def search_debt_conversions(ticker: str, months_back: int = 3) -> str:
         return f"Error searching conversions for {ticker}: {str(e)}"
 
 
+async def search_and_render_conversions(ticker: str, months_back: int = 3, keywords=None, items=None,
+                                        options=None, max_results: int = None,
+                                        progress=None, on_match=None) -> Dict[str, Any]:
+    """Run the conversion search and render its matches with ``render_structured_result``.
+
+    ``options`` are the ``convert_to_markdown`` options (``mode``, ``max_tokens``,
+    ``full_text``, ``page_size``, ``top_k``); ``top_k`` ranking uses the search
+    ``keywords`` unless the options name their own. The result is the rendered
+    dict plus a ``summary`` line, so the snippets never make a round trip
+    through the caller.
+    """
+    try:
+        search = await _collect_conversions(ticker, months_back, keywords, items, max_results, progress, on_match)
+    except Exception as e:
+        return {'error': f"Error searching conversions for {ticker}: {str(e)}"}
+
+    structured = {'structured': []}
+    for conv in search["conversions"]:
+        text = f"### {conv['date']} {conv['accession']}\n\nURL: {conv['url']}\n"
+        if conv.get('items'):
+            text += f"Items: {conv['items']}\n"
+        text += _conversion_details(conv)
+        if conv.get('snippet'):
+            text += "\n```\n" + conv['snippet'] + "\n```"
+        structured['structured'].append({'snippet': text, 'accession': conv['accession']})
+
+    summary = _search_summary(ticker, months_back, search)
+    options = dict(options or {})
+    if keywords and options.get('top_k') and not options.get('keywords'):
+        options['keywords'] = keywords
+    # With no matches the summary itself is the rendered text, as when it was passed through
+    # Rendering may read cached filings and convert HTML: run it off the event loop
+    rendered = await asyncio.to_thread(render_structured_result,
+                                       structured if structured['structured'] else {'result': summary}, options)
+    rendered['summary'] = summary
+    return rendered
+
+
 async def get_recent_filings(ticker: str, form_type: str = "8-K", count: int = 10) -> str:
     try:
-        company = Company(ticker)
         # Return at most `count` filings within the last 6 months
         cutoff = datetime.now() - timedelta(days=6 * 30)
-        recent = []
-        try:
-            all_filings = company.get_filings(form=form_type)
-        except Exception:
-            all_filings = []
-
-        for filing in all_filings:
-            if len(recent) >= count:
-                break
-            fdate = getattr(filing, 'filing_date', None) or getattr(filing, 'date', None)
-            fdate_dt = None
-            if isinstance(fdate, str):
-                try:
-                    fdate_dt = datetime.fromisoformat(fdate)
-                except Exception:
-                    try:
-                        fdate_dt = datetime.strptime(fdate.split('T')[0], '%Y-%m-%d')
-                    except Exception:
-                        fdate_dt = None
-            elif isinstance(fdate, datetime):
-                fdate_dt = fdate
-            elif isinstance(fdate, date):
-                fdate_dt = datetime(fdate.year, fdate.month, fdate.day)
-
-            if not fdate_dt:
-                # Skip filings without a parseable date
-                continue
-            if fdate_dt < cutoff:
-                continue
-            recent.append(filing)
+        recent = await run_upstream_shared(
+            SEC, ("filings", ticker.upper(), form_type, cutoff.date(), count),
+            _indexed_filings, ticker, form_type, cutoff.date(), count,
+        )
 
         result = f"Recent {form_type} Filings for {ticker} (last 6 months, max {count}):\n\n"
         for filing in recent:
             result += f"- {getattr(filing, 'filing_date', getattr(filing, 'date', 'unknown'))}: {getattr(filing, 'form', form_type)}\n"
             result += f"  Accession: {getattr(filing, 'accession_no', 'unknown')}\n"
-            result += f"  URL: {getattr(filing, 'url', 'unknown')}\n\n"
+            result += f"  URL: {getattr(filing, 'url', 'unknown')}\n"
+            if filing_text_cache.contains(getattr(filing, 'accession_no', None)):
+                # Full text is available to convert_to_markdown without a download
+                result += "  Text: cached\n"
+            result += "\n"
 
         return result
 
@@ -210,6 +476,122 @@ async def get_recent_filings(ticker: str, form_type: str = "8-K", count: int = 1
         return f"Error getting {form_type} filings for {ticker}: {str(e)}"
 
 
+def _window_date(name: str, value):
+    parsed = _parse_filing_date(value)
+    if parsed is None:
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD form, got {value!r}")
+    return parsed.date()
+
+
+def _parse_window(start, end, default_days: int = 7):
+    end_d = _window_date("end", end) if end else date.today()
+    start_d = _window_date("start", start) if start else end_d - timedelta(days=default_days)
+    return start_d, end_d
+
+
+async def scan_market_conversions(start: str = None, end: str = None, keywords=None,
+                                  max_filings: int = None) -> str:
+    """Scan every company's 8-Ks filed in [start, end] (default: last 7 days) for conversion language.
+
+    ``max_filings`` defaults to ``MARKET_SCAN_MAX_FILINGS``.
+    """
+    try:
+        start_d, end_d = _parse_window(start, end)
+        if start_d > end_d:
+            return f"Error scanning market conversions: start {start_d} is after end {end_d}"
+        if max_filings is None:
+            max_filings = MARKET_SCAN_MAX_FILINGS
+        entries = await run_upstream_shared(SEC, ("form-index", start_d, end_d), form_index.filings, start_d, end_d)
+        total = len(entries)
+        entries = entries[:max(0, max_filings)]
+
+        filings = [
+            Filing(cik=e.cik, company=e.company, form=e.form, filing_date=e.filing_date, accession_no=e.accession_no)
+            for e in entries
+        ]
+        matcher = get_matcher(keywords)
+        found = []
+        failed = 0
+        async with aclosing(_iter_scans(filings, matcher)) as scans:
+            async for position, conv in scans:
+                if isinstance(conv, dict):
+                    found.append((position, conv))
+                elif isinstance(conv, Exception):
+                    failed += 1
+        # Entries are already newest first; keep that order
+        conversions = [conv for _, conv in sorted(found, key=lambda m: m[0])]
+        _attach_terms(conversions)
+
+        result = f"Market-wide Debt Conversion Scan ({start_d} -> {end_d}):\n"
+        result += f"Scanned {len(filings)} of {total} 8-K filings"
+        if total > len(filings):
+            result += f" (newest {len(filings)}; raise max_filings or narrow the window for the rest)"
+        if failed:
+            result += f", {failed} could not be fetched"
+        result += f"\nFound {len(conversions)} potential conversion events\n\n"
+
+        for conv in conversions:
+            result += f"- Date: {conv['date']}\n"
+            result += f"  Company: {conv['company']} (CIK {conv['cik']})\n"
+            result += f"  Accession: {conv['accession']}\n"
+            result += f"  URL: {conv['url']}\n"
+            if conv.get('keywords'):
+                result += "  Keywords: " + ", ".join(f"{k} ({n})" for k, n in conv['keywords'].items()) + "\n"
+            if conv.get('terms'):
+                result += "  Terms: " + "; ".join(format_term(t) for t in conv['terms']) + "\n"
+            if conv.get('snippet'):
+                result += "  Snippet:\n\n"
+                result += "```\n" + conv['snippet'] + "\n```\n\n"
+
+        return result
+
+    except Exception as e:
+        return f"Error scanning market conversions: {str(e)}"
+
+
+async def search_indexed_filings(phrases, days: int = 30, universe=None, limit: int = 50) -> str:
+    """Find cached filings containing every phrase, from the inverted text index.
+
+    ``universe`` (a universe name, file or ticker list) restricts the companies.
+    Nothing is downloaded or rescanned; filings never fetched are not covered.
+    """
+    try:
+        if isinstance(phrases, str):
+            phrases = [phrases]
+        end_d = date.today()
+        start_d = end_d - timedelta(days=max(0, days))
+        ciks = None
+        if universe:
+            tickers = await asyncio.to_thread(resolve_universe, universe)
+            entries = await run_upstream(SEC, lambda: [ticker_map.lookup(t) for t in tickers])
+            ciks = [entry[0] for entry in entries if entry]
+
+        # SQLite reads: keep them off the event loop
+        started = time.perf_counter()
+        hits = await asyncio.to_thread(text_index.query, phrases, start=start_d, end=end_d, ciks=ciks, limit=limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        indexed = await asyncio.to_thread(text_index.stats)
+        result = "Filing Text Index Query: " + " AND ".join(f'"{p}"' for p in phrases)
+        result += f" ({start_d} -> {end_d}"
+        if ciks is not None:
+            result += f", {len(ciks)} companies"
+        result += ")\n"
+        result += f"Found {len(hits)} filings among {indexed['filings']} indexed in {elapsed_ms:.1f} ms\n\n"
+        for hit in hits:
+            result += f"- Date: {hit.filing_date}\n"
+            result += f"  Company: {hit.company} (CIK {hit.cik})\n"
+            result += f"  Accession: {hit.accession_no}\n"
+            for phrase, found in hit.matches.items():
+                shown = ", ".join(f"{part}@{offset}" for part, offset in found[:5])
+                more = f", +{len(found) - 5} more" if len(found) > 5 else ""
+                result += f'  "{phrase}": {len(found)} ({shown}{more})\n'
+        return result
+
+    except Exception as e:
+        return f"Error querying the filing text index: {str(e)}"
+
+
 def _extract_price(text: str):
     # Backwards-compatible single-price extractor: return first candidate
     prices = _extract_prices_from_text(text)
@@ -217,29 +599,53 @@ def _extract_price(text: str):
 
 
 def _extract_prices_from_text(text: str):
-    """Return a list of numeric price candidates extracted from text.
+    """Return a list of numeric price candidates extracted from text (e.g. $1,234.56)."""
+    return extract_prices(text)
 
-    Supports numbers with optional commas and decimals, e.g. $1,234.56
-    Filters out implausible values via simple heuristics.
-    """
-    if not text:
-        return []
-
-    # Match $1,234.56 or $1234.56 or $1234
-    price_pattern = r"\$([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]+)?|[0-9]+(?:\.[0-9]+)?)"
-    raw_matches = re.findall(price_pattern, text)
-    candidates = []
-    for rm in raw_matches:
-        try:
-            norm = rm.replace(',', '')
-            val = float(norm)
-            # Filter out unrealistic values for conversion prices
-            if 0.0001 < val < 1000000:
-                candidates.append(val)
-        except Exception:
-            continue
-    return candidates
+
+# Full accession (0001234567-25-000123) or its 18-digit undashed form
+_ACCESSION_RE = re.compile(r"(\d{10})-?(\d{2})-?(\d{6})")
+
+
+def _accession_from(filing_url: str):
+    m = _ACCESSION_RE.search(filing_url or '')
+    return f"{m.group(1)}-{m.group(2)}-{m.group(3)}" if m else None
+
+
+def _find_filing(accession: str):
+    """Blocking helper: look up a filing by accession number."""
+    from edgar import find
+    return find(accession)
 
 
 async def extract_conversion_terms(filing_url: str) -> str:
-    return "Conversion term extraction not yet implemented"
+    """Extract conversion price, ratio, principal, maturity and VWAP formulas from one filing.
+
+    ``filing_url`` may be an EDGAR filing URL or a bare accession number.
+    Offsets refer to the filing text including its conversion exhibits.
+    """
+    accession = _accession_from(filing_url)
+    if not accession:
+        return f"Error extracting conversion terms: no accession number in {filing_url!r}"
+    try:
+        text = await asyncio.to_thread(filing_text_cache.get, accession)
+        exhibits = await asyncio.to_thread(filing_text_cache.get, f"{accession}-exhibits")
+        if text is not None and exhibits is not None:
+            exhibits = exhibits[len(_EXHIBITS_MARKER):]
+            text = f"{text}\n\n{exhibits}" if exhibits else text
+        else:
+            filing = await run_upstream_shared(SEC, ("find", accession), _find_filing, accession)
+            if filing is None:
+                return f"Error extracting conversion terms: filing {accession} not found"
+            text = await get_filing_text(filing, include_exhibits=True)
+
+        terms = extract_terms(text)
+        result = f"Conversion Terms for {accession}:\n"
+        result += f"Found {len(terms)} terms in {len(text):,} characters\n\n"
+        for term in terms:
+            fragment = " ".join(term.text.split())
+            result += f"- {format_term(term)}\n  Source [{term.start}:{term.end}]: {fragment}\n"
+        return result
+
+    except Exception as e:
+        return f"Error extracting conversion terms for {filing_url}: {str(e)}"
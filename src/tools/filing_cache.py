@@ -0,0 +1,174 @@
+"""Persistent, compressed cache of extracted filing text keyed by accession number.
+
+An EDGAR filing never changes once accepted, so the extracted text of a given
+accession is downloaded and cleaned at most once. Entries are stored as
+``<FILING_CACHE_DIR>/<accession>.txt.gz`` and evicted least-recently-used
+once the compressed total exceeds ``FILING_CACHE_MAX_BYTES`` (default 256 MB;
+``0`` disables the cache). Recency is kept in file mtimes so it survives
+restarts. ``on_evict`` is called with the key of every entry that leaves the
+cache (eviction or ``clear``) so derived data, like the text index, can follow.
+
+``get`` and ``put`` read, decompress and write multi-megabyte files: call them
+from executor threads, not the event loop. The lock only guards the in-memory
+bookkeeping, never file I/O.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+import gzip
+import os
+import re
+import threading
+
+from src.tools.persist import atomic_write, cache_path
+
+FILING_CACHE_DIR = Path(os.getenv(
+    "FILING_CACHE_DIR", str(cache_path("filings"))
+))
+FILING_CACHE_MAX_BYTES = int(os.getenv("FILING_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_SUFFIX = ".txt.gz"
+_ACCESSION_RE = re.compile(r"^[0-9A-Za-z-]+$")
+
+
+class FilingTextCache:
+    """Size-bounded LRU of gzip-compressed filing text on disk."""
+
+    def __init__(self, root: Path = FILING_CACHE_DIR, max_bytes: int = FILING_CACHE_MAX_BYTES,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._sizes: Optional["OrderedDict[str, int]"] = None
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, accession: str) -> Path:
+        return self.root / f"{accession}{_SUFFIX}"
+
+    def _index(self) -> "OrderedDict[str, int]":
+        # Rebuild recency order from file mtimes on first use
+        if self._sizes is None:
+            entries = []
+            try:
+                for path in self.root.glob(f"*{_SUFFIX}"):
+                    st = path.stat()
+                    entries.append((st.st_mtime, path.name[: -len(_SUFFIX)], st.st_size))
+            except OSError:
+                entries = []
+            entries.sort()
+            self._sizes = OrderedDict((acc, size) for _, acc, size in entries)
+            self._total = sum(self._sizes.values())
+        return self._sizes
+
+    def _removed(self, keys: Iterable[str]) -> None:
+        # Called outside the lock: the callback may do its own I/O
+        if self.on_evict is None:
+            return
+        for key in keys:
+            try:
+                self.on_evict(key)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _valid(accession) -> bool:
+        return isinstance(accession, str) and bool(_ACCESSION_RE.match(accession))
+
+    def contains(self, accession) -> bool:
+        if not self.enabled or not self._valid(accession):
+            return False
+        with self._lock:
+            return accession in self._index()
+
+    def get(self, accession) -> Optional[str]:
+        """Return the cached text for ``accession`` or None."""
+        if not self.enabled or not self._valid(accession):
+            return None
+        with self._lock:
+            if accession not in self._index():
+                self.misses += 1
+                return None
+        path = self._path(accession)
+        try:
+            text = gzip.decompress(path.read_bytes()).decode("utf-8")
+            os.utime(path)
+        except (OSError, EOFError, UnicodeDecodeError):
+            # Corrupt, or evicted by another thread while we read it
+            with self._lock:
+                sizes = self._index()
+                if accession in sizes:
+                    self._total -= sizes.pop(accession)
+                self.misses += 1
+            return None
+        with self._lock:
+            sizes = self._index()
+            if accession in sizes:
+                sizes.move_to_end(accession)
+            self.hits += 1
+        return text
+
+    def put(self, accession, text: str) -> None:
+        """Store ``text`` for ``accession`` and evict LRU entries over the size budget."""
+        if not self.enabled or not self._valid(accession) or not text:
+            return
+        data = gzip.compress(text.encode("utf-8"), compresslevel=6)
+        try:
+            atomic_write(self._path(accession), data)
+        except OSError:
+            # The caller already has the text
+            return
+        evicted = []
+        with self._lock:
+            sizes = self._index()
+            self._total += len(data) - sizes.pop(accession, 0)
+            sizes[accession] = len(data)
+            while self._total > self.max_bytes and len(sizes) > 1:
+                old, size = sizes.popitem(last=False)
+                self._total -= size
+                self.evictions += 1
+                evicted.append(old)
+        for old in evicted:
+            try:
+                self._path(old).unlink()
+            except OSError:
+                pass
+        self._removed(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            removed = list(self._index())
+            self._sizes = OrderedDict()
+            self._total = 0
+        for accession in removed:
+            try:
+                self._path(accession).unlink()
+            except OSError:
+                pass
+        self._removed(removed)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            sizes = self._index() if self.enabled else {}
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "root": str(self.root),
+                "entries": len(sizes),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+filing_text_cache = FilingTextCache()
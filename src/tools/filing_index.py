@@ -0,0 +1,278 @@
+"""Per-CIK index of filing metadata kept sorted by filing date.
+
+``get_recent_filings`` and ``search_debt_conversions`` used to walk
+``company.get_filings(...)`` item by item and parse each date through several
+fallback branches. The index stores one compact record per filing
+(date, accession, form, 8-K items) for every form a company files, sorted by
+date, at ``<FILING_INDEX_DIR>/<cik>.json``. Date-window queries bisect the
+sorted dates and walk newest-first, stopping as soon as ``limit`` matches are
+found. Tickers are resolved to CIKs through the local ticker map
+(``src/tools/ticker_map.py``).
+
+The index is built from the company's submissions JSON
+(``data.sec.gov/submissions``). Its recent-filings page covers at least the
+last year or 1,000 filings. The older pages are loaded through edgartools
+only when a query reaches further back than that. Once an index is older
+than ``FILING_INDEX_TTL`` seconds (default 1h), the submissions JSON is
+re-requested as a conditional GET with the stored ETag/Last-Modified
+validators. A 304 costs no download, and new filings are merged in.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+from src.tools.persist import cache_path, save_json
+from src.tools.sec_http import sec_http, validators_of
+from src.tools.ticker_map import company_cache, ticker_map
+
+FILING_INDEX_DIR = Path(os.getenv(
+    "FILING_INDEX_DIR", str(cache_path("filing_index"))
+))
+FILING_INDEX_TTL = float(os.getenv("FILING_INDEX_TTL", "3600"))
+SEC_SUBMISSIONS_URL = os.getenv("SEC_SUBMISSIONS_URL", "https://data.sec.gov/submissions/CIK{cik:010d}.json")
+
+# EDGAR's recent-filings page holds at least the last year of filings
+_RECENT_PAGE_DAYS = 365
+
+
+class FilingRecord(NamedTuple):
+    filing_date: str  # ISO date, the sort key
+    accession_no: str
+    form: str
+    items: str  # comma-separated 8-K item codes, '' for other forms
+
+
+def _parse_filing_date(value) -> Optional[datetime]:
+    """Normalise a filing date (date, datetime or ISO string) to a datetime, or None."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            try:
+                return datetime.strptime(value.split('T')[0], '%Y-%m-%d')
+            except ValueError:
+                return None
+    return None
+
+
+def _form_matches(form: str, wanted: Optional[str]) -> bool:
+    # company.get_filings(form=...) includes amendments by default; so do we
+    return wanted is None or form == wanted or form == f"{wanted}/A"
+
+
+def _filing_records(filings) -> List[FilingRecord]:
+    """Convert an edgartools filings collection to records, reading columns directly when possible."""
+    try:
+        data = filings.data
+        rows = zip(*(data[c].to_pylist() for c in ("filing_date", "accession_number", "form", "items")))
+    except Exception:
+        rows = (
+            (getattr(f, 'filing_date', None), getattr(f, 'accession_no', None),
+             getattr(f, 'form', None), getattr(f, 'items', None))
+            for f in filings
+        )
+    records = []
+    for fdate, accession, form, items in rows:
+        fdate_dt = _parse_filing_date(fdate)
+        if fdate_dt is None or not accession:
+            continue
+        records.append(FilingRecord(fdate_dt.date().isoformat(), accession, form or '', items or ''))
+    return records
+
+
+def _submission_records(recent: dict) -> List[FilingRecord]:
+    """Convert the column arrays of a submissions JSON ``filings.recent`` block to records."""
+    columns = ("filingDate", "accessionNumber", "form", "items")
+    rows = zip(*(recent.get(c) or [] for c in columns))
+    return [
+        FilingRecord(fdate, accession, form or '', items or '')
+        for fdate, accession, form, items in rows
+        if fdate and accession
+    ]
+
+
+class _CompanyIndex:
+    def __init__(self, cik: int, company: str, records: List[FilingRecord],
+                 refreshed_at: float = 0.0, complete: bool = False,
+                 validators: Optional[Dict[str, str]] = None):
+        self.cik = cik
+        self.company = company
+        self.records: List[FilingRecord] = []
+        self.dates: List[str] = []
+        self.refreshed_at = refreshed_at
+        self.complete = complete
+        # ETag / Last-Modified of the submissions JSON the records came from
+        self.validators = validators or {}
+        self.merge(records)
+
+    @property
+    def covers_from(self) -> Optional[str]:
+        return self.dates[0] if self.dates else None
+
+    def merge(self, records: List[FilingRecord]) -> int:
+        known = {r.accession_no for r in self.records}
+        new = [r for r in records if r.accession_no not in known]
+        if new:
+            self.records = sorted(self.records + new)
+            self.dates = [r.filing_date for r in self.records]
+        return len(new)
+
+    def window(self, form: Optional[str], start: Optional[date], end: Optional[date],
+               limit: Optional[int]) -> List[FilingRecord]:
+        lo = bisect_left(self.dates, start.isoformat()) if start else 0
+        hi = bisect_right(self.dates, end.isoformat()) if end else len(self.dates)
+        out = []
+        for i in range(hi - 1, lo - 1, -1):
+            record = self.records[i]
+            if not _form_matches(record.form, form):
+                continue
+            out.append(record)
+            if limit is not None and len(out) >= limit:
+                break
+        return out
+
+    def to_json(self) -> dict:
+        return {
+            "cik": self.cik,
+            "company": self.company,
+            "refreshed_at": self.refreshed_at,
+            "complete": self.complete,
+            "validators": self.validators,
+            "records": [list(r) for r in self.records],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "_CompanyIndex":
+        return cls(
+            data["cik"], data.get("company", ""), [FilingRecord(*r) for r in data.get("records", [])],
+            refreshed_at=data.get("refreshed_at", 0.0), complete=data.get("complete", False),
+            validators=data.get("validators"),
+        )
+
+
+class FilingIndex:
+    """Sorted per-CIK filing metadata with bisect date windows and incremental refresh."""
+
+    def __init__(self, root: Path = FILING_INDEX_DIR, ttl: float = FILING_INDEX_TTL):
+        self.root = Path(root)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._indexes: Dict[int, _CompanyIndex] = {}
+        # One refresh at a time per company; different companies refresh in parallel
+        self._cik_locks: Dict[int, threading.Lock] = {}
+        self.full_builds = 0
+        self.incremental_refreshes = 0
+        self.records_added = 0
+        self.not_modified = 0
+
+    def _load(self, cik: int) -> Optional[_CompanyIndex]:
+        # Called under the CIK's lock; the global lock only guards the dict,
+        # never the file read
+        with self._lock:
+            index = self._indexes.get(cik)
+        if index is None:
+            try:
+                index = _CompanyIndex.from_json(json.loads((self.root / f"{cik}.json").read_text()))
+            except Exception:
+                return None
+            with self._lock:
+                self._indexes[cik] = index
+        return index
+
+    @staticmethod
+    def _company(ticker_or_cik):
+        return company_cache.get(ticker_or_cik)
+
+    @staticmethod
+    def _submissions(cik: int, validators: Optional[Dict[str, str]] = None) -> Tuple[Optional[dict], Dict[str, str]]:
+        """Blocking: fetch the submissions JSON; returns (None, validators) when it is unchanged."""
+        response = sec_http.get(SEC_SUBMISSIONS_URL.format(cik=cik), validators=validators)
+        if response.status_code == 304:
+            return None, validators or {}
+        response.raise_for_status()
+        return response.json(), validators_of(response)
+
+    def _resolve(self, ticker: str) -> Tuple[int, Optional[object]]:
+        # Unknown tickers raise UnknownTickerError here, before any network call
+        cik = ticker_map.resolve(ticker)
+        if cik is not None:
+            return cik, None
+        # No ticker table could be loaded: let EDGAR resolve the ticker
+        company = self._company(ticker)
+        return int(company.cik), company
+
+    @staticmethod
+    def _needs_history(index: _CompanyIndex, start: Optional[date]) -> bool:
+        if start is None or index.complete or not index.dates:
+            return False
+        recent_floor = (date.today() - timedelta(days=_RECENT_PAGE_DAYS)).isoformat()
+        return start.isoformat() < min(index.covers_from, recent_floor)
+
+    def _ensure(self, cik: int, company, start: Optional[date]) -> _CompanyIndex:
+        index = self._load(cik)
+        now = time.time()
+
+        if index is None or not index.dates:
+            data, validators = self._submissions(cik)
+            filings = data.get("filings", {})
+            index = _CompanyIndex(cik, data.get("name", ''), _submission_records(filings.get("recent", {})),
+                                  refreshed_at=now, validators=validators,
+                                  complete=not filings.get("files"))
+            self.full_builds += 1
+        elif now - index.refreshed_at > self.ttl:
+            data, validators = self._submissions(cik, index.validators)
+            if data is None:
+                self.not_modified += 1
+            else:
+                added = index.merge(_submission_records(data.get("filings", {}).get("recent", {})))
+                index.validators = validators
+                self.records_added += added
+            index.refreshed_at = now
+            self.incremental_refreshes += 1
+        elif not self._needs_history(index, start):
+            return index
+
+        if self._needs_history(index, start):
+            # The query reaches past the recent page: load the full history once
+            company = company or self._company(cik)
+            index.merge(_filing_records(company.get_filings(trigger_full_load=True)))
+            index.complete = True
+            self.full_builds += 1
+
+        with self._lock:
+            self._indexes[cik] = index
+        # Only this CIK's lock is held: a slow write never blocks other companies
+        save_json(self.root / f"{cik}.json", index.to_json())
+        return index
+
+    def query(self, ticker: str, form: Optional[str] = None, start: Optional[date] = None,
+              end: Optional[date] = None, limit: Optional[int] = None) -> Tuple[int, str, List[FilingRecord]]:
+        """Blocking: return (cik, company name, records newest first) for ``ticker`` in [start, end]."""
+        cik, company = self._resolve(ticker)
+        with self._lock:
+            cik_lock = self._cik_locks.setdefault(cik, threading.Lock())
+        with cik_lock:
+            index = self._ensure(cik, company, start)
+            return index.cik, index.company, index.window(form, start, end, limit)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "companies": len(self._indexes),
+                "full_builds": self.full_builds,
+                "incremental_refreshes": self.incremental_refreshes,
+                "records_added": self.records_added,
+                "not_modified": self.not_modified,
+            }
+
+
+filing_index = FilingIndex()
@@ -1,13 +1,20 @@
 from mcp.types import TextContent
+import asyncio
 import yfinance as yf
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from src.tools.history_cache import get_history, get_history_batch, normalize_tickers
+from src.tools.indicators import align_frames, last_valid, macd_matrix
+from src.tools.macd_state import macd_state_store
+from src.tools.optionable_index import optionable_index
+from src.tools.upstream import YAHOO, run_upstream, run_upstream_shared
+
 
 async def get_stock_data(ticker: str, period: str = "1y") -> str:
     """Get stock data using yfinance and return a textual summary"""
-    stock = yf.Ticker(ticker)
-    hist = stock.history(period=period)
+    hist = await get_history(ticker, period=period)
 
     if hist.empty:
         return f"Could not retrieve stock data for {ticker}."
@@ -29,8 +36,7 @@ async def get_stock_data(ticker: str, period: str = "1y") -> str:
 
 async def get_stock_data_range(ticker: str, start: str, end: str) -> str:
     """Get stock data for an exact date range (start inclusive, end exclusive)."""
-    stock = yf.Ticker(ticker)
-    hist = stock.history(start=start, end=end)
+    hist = await get_history(ticker, start=start, end=end)
 
     if hist.empty:
         return f"Could not retrieve stock data for {ticker} in range {start} -> {end}."
@@ -74,26 +80,39 @@ def _calculate_macd_manual(close_prices: pd.Series) -> pd.DataFrame:
     return macd_df
 
 
-async def calculate_macd(ticker: str, timeframe: str) -> str:
-    stock = yf.Ticker(ticker)
+# (period, interval) per MACD timeframe. Weekly and monthly bars are resampled
+# from the same cached 2-year daily series, so no extra download is made.
+_MACD_WINDOWS = {
+    "daily": ("6mo", "1d"),
+    "weekly": ("2y", "1wk"),
+    "monthly": ("2y", "1mo"),
+}
+
 
-    if timeframe == "daily":
-        hist = stock.history(period="6mo", interval="1d")
-    else:
-        hist = stock.history(period="2y", interval="1wk")
+def _macd_timeframes(timeframe: str):
+    if timeframe == "both":
+        return ["daily", "weekly"]
+    return [timeframe if timeframe in _MACD_WINDOWS else "weekly"]
+
+
+async def _macd_report(ticker: str, timeframe: str) -> str:
+    period, interval = _MACD_WINDOWS[timeframe]
+    hist = await get_history(ticker, period=period, interval=interval)
 
     if hist.empty:
         return f"Could not calculate MACD for {ticker}."
 
-    macd = _calculate_macd_manual(hist["Close"])
+    # Persisted EMA state advances in O(1) per new bar; full recompute only
+    # on a cold start or after a split/dividend re-adjustment.
+    macd = await asyncio.to_thread(macd_state_store.update, ticker, timeframe, hist["Close"])
 
-    if macd is None or macd.empty:
+    if macd is None:
         return f"Could not calculate MACD for {ticker}."
 
-    current_price = hist["Close"].iloc[-1]
-    macd_line = macd["MACD_12_26_9"].iloc[-1]
-    signal_line = macd["MACDs_12_26_9"].iloc[-1]
-    histogram = macd["MACDh_12_26_9"].iloc[-1]
+    current_price = macd["close"]
+    macd_line = macd["macd"]
+    signal_line = macd["signal"]
+    histogram = macd["histogram"]
 
     return (
         f"""MACD Analysis for {ticker} ({timeframe}):
@@ -108,9 +127,14 @@ async def calculate_macd(ticker: str, timeframe: str) -> str:
     )
 
 
+async def calculate_macd(ticker: str, timeframe: str) -> str:
+    """MACD for ``timeframe`` in daily/weekly/monthly, or "both" (daily and weekly)."""
+    reports = [await _macd_report(ticker, tf) for tf in _macd_timeframes(timeframe)]
+    return "\n".join(reports)
+
+
 async def check_52week_low(ticker: str, tolerance: float) -> str:
-    stock = yf.Ticker(ticker)
-    hist = stock.history(period="1y")
+    hist = await get_history(ticker, period="1y")
 
     if hist.empty:
         return f"Could not retrieve stock data for {ticker}."
@@ -134,25 +158,211 @@ async def check_52week_low(ticker: str, tolerance: float) -> str:
     )
 
 
-async def check_optionable(ticker: str) -> str:
+def _format_table(headers, rows) -> str:
+    """Render rows as a compact pipe table suitable for LLM consumption."""
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    for row in rows:
+        lines.append("| " + " | ".join(str(v) for v in row) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def _missing_note(missing) -> str:
+    return f"No data: {', '.join(missing)}\n" if missing else ""
+
+
+async def get_stock_data_batch(tickers, period: str = "1y") -> str:
+    """Price summary for many tickers from a single bulk download."""
+    symbols = normalize_tickers(tickers)
+    if not symbols:
+        return "No tickers provided."
+    frames = await get_history_batch(symbols, period=period)
+
+    rows, missing = [], []
+    for t in symbols:
+        hist = frames.get(t)
+        if hist is None or hist.empty:
+            missing.append(t)
+            continue
+        current_price = hist["Close"].iloc[-1]
+        high = hist["High"].max()
+        low = hist["Low"].min()
+        rows.append([
+            t,
+            f"{current_price:.2f}",
+            f"{high:.2f}",
+            f"{low:.2f}",
+            f"{(current_price - low) / low * 100:.2f}",
+            f"{(high - current_price) / high * 100:.2f}",
+        ])
+
+    return (
+        f"Stock Data Batch ({len(rows)}/{len(symbols)} tickers, period {period}):\n"
+        + _format_table(["Ticker", "Price", "High", "Low", "From Low %", "From High %"], rows)
+        + _missing_note(missing)
+    )
+
+
+async def check_52week_low_batch(tickers, tolerance: float = 0.05) -> str:
+    """52-week-low check for many tickers from a single bulk download."""
+    symbols = normalize_tickers(tickers)
+    if not symbols:
+        return "No tickers provided."
+    frames = await get_history_batch(symbols, period="1y")
+
+    rows, missing = [], []
+    for t in symbols:
+        hist = frames.get(t)
+        if hist is None or hist.empty:
+            missing.append(t)
+            continue
+        current_price = hist["Close"].iloc[-1]
+        week52_low = hist["Low"].min()
+        week52_low_date = hist["Low"].idxmin()
+        distance_pct = (current_price - week52_low) / week52_low
+        days_since = (pd.Timestamp.now(tz=week52_low_date.tz) - week52_low_date).days
+        rows.append([
+            t,
+            f"{current_price:.2f}",
+            f"{week52_low:.2f}",
+            week52_low_date.strftime("%Y-%m-%d"),
+            days_since,
+            f"{distance_pct * 100:.2f}",
+            "YES" if distance_pct <= tolerance else "NO",
+        ])
+
+    return (
+        f"52-Week Low Batch ({len(rows)}/{len(symbols)} tickers, tolerance {tolerance * 100}%):\n"
+        + _format_table(["Ticker", "Price", "52W Low", "Low Date", "Days Since", "Distance %", "Near Low"], rows)
+        + _missing_note(missing)
+    )
+
+
+async def _macd_batch_table(symbols, timeframe: str) -> str:
+    period, interval = _MACD_WINDOWS[timeframe]
+    frames = await get_history_batch(symbols, period=period, interval=interval)
+
+    # One vectorised pass over the (tickers x bars) close matrix
+    tickers_with_data, matrices, _ = align_frames(frames, ("Close",))
+    close = matrices["Close"]
+    macd = macd_matrix(close)
+    last_close = last_valid(close)
+    last_macd = last_valid(macd["macd"])
+    last_signal = last_valid(macd["signal"])
+    last_hist = last_valid(macd["histogram"])
+
+    row_of = {t: i for i, t in enumerate(tickers_with_data)}
+    rows, missing = [], []
+    for t in symbols:
+        i = row_of.get(t)
+        if i is None or np.isnan(last_close[i]):
+            missing.append(t)
+            continue
+        rows.append([
+            t,
+            f"{last_close[i]:.2f}",
+            f"{last_macd[i]:.4f}",
+            f"{last_signal[i]:.4f}",
+            f"{last_hist[i]:.4f}",
+            "Below" if last_macd[i] < 0 else "Above",
+            "Bullish" if last_hist[i] > 0 else "Bearish",
+        ])
+
+    return (
+        f"MACD Batch ({timeframe}, {len(rows)}/{len(symbols)} tickers):\n"
+        + _format_table(["Ticker", "Price", "MACD", "Signal", "Histogram", "vs Zero", "Crossover"], rows)
+        + _missing_note(missing)
+    )
+
+
+async def calculate_macd_batch(tickers, timeframe: str = "daily") -> str:
+    """MACD for many tickers from a single bulk download."""
+    symbols = normalize_tickers(tickers)
+    if not symbols:
+        return "No tickers provided."
+    timeframes = _macd_timeframes(timeframe)
+    if len(timeframes) > 1:
+        # Fetch the longest window first so the shorter one is sliced from cache
+        await get_history_batch(symbols, period="2y", interval="1d")
+    tables = [await _macd_batch_table(symbols, tf) for tf in timeframes]
+    return "\n".join(tables)
+
+
+def _fetch_option_expirations(ticker: str):
+    """Blocking helper: return the option expiration dates (one light request)."""
+    return tuple(yf.Ticker(ticker).options)
+
+
+def _fetch_option_summary(ticker: str):
+    """Blocking helper: return (expiration dates, first-expiration call count)."""
+    stock = yf.Ticker(ticker)
+    options_dates = stock.options
+    if len(options_dates) == 0:
+        return options_dates, 0
+    return options_dates, len(stock.option_chain(options_dates[0]).calls)
+
+
+async def check_optionable(ticker: str, fast: bool = False) -> str:
+    """Report option availability; ``fast`` answers from the expiration list alone."""
     try:
-        stock = yf.Ticker(ticker)
-        options_dates = stock.options
+        if fast:
+            options_dates = await run_upstream_shared(
+                YAHOO, ("expirations", ticker.upper()), _fetch_option_expirations, ticker
+            )
+            call_count = None
+        else:
+            options_dates, call_count = await run_upstream_shared(
+                YAHOO, ("options", ticker.upper()), _fetch_option_summary, ticker
+            )
+        await run_upstream(YAHOO, optionable_index.record_many, {ticker: len(options_dates) > 0})
 
         if len(options_dates) > 0:
             first_exp = options_dates[0]
-            calls = stock.option_chain(first_exp).calls
+            calls_line = f"- Call Options Available: {call_count}\n" if call_count is not None else ""
 
             return (
                 f"""Options Availability for {ticker}:
 - Options Available: ✓ YES
 - Number of Expirations: {len(options_dates)}
 - Next Expiration: {first_exp}
-- Call Options Available: {len(calls)}
-- Options are tradeable: ✓ CONFIRMED
+{calls_line}- Options are tradeable: ✓ CONFIRMED
 """
             )
         else:
             return f"Options Availability for {ticker}: ✗ NO OPTIONS AVAILABLE"
     except Exception as e:
         return f"Error checking options for {ticker}: {str(e)}"
+
+
+async def check_optionable_batch(tickers) -> str:
+    """Optionability for many tickers from the daily index, checking only unknown symbols live."""
+    symbols = normalize_tickers(tickers)
+    if not symbols:
+        return "No tickers provided."
+
+    known = await run_upstream(YAHOO, optionable_index.lookup_many, symbols)
+    unknown = [t for t in symbols if known[t] is None]
+    results = await asyncio.gather(
+        *(run_upstream_shared(YAHOO, ("expirations", t), _fetch_option_expirations, t) for t in unknown),
+        return_exceptions=True,
+    )
+    learned = {}
+    failed = []
+    for t, dates in zip(unknown, results):
+        if isinstance(dates, Exception):
+            failed.append(t)
+        else:
+            learned[t] = len(dates) > 0
+    if learned:
+        await run_upstream(YAHOO, optionable_index.record_many, learned)
+
+    rows = []
+    for t in symbols:
+        if known[t] is not None:
+            rows.append([t, "✓ YES" if known[t] else "✗ NO", "index"])
+        elif t in learned:
+            rows.append([t, "✓ YES" if learned[t] else "✗ NO", "live"])
+    return (
+        f"Options Availability ({len(rows)} tickers, {len(learned)} checked live):\n"
+        + _format_table(["Ticker", "Optionable", "Source"], rows)
+        + _missing_note(failed)
+    )
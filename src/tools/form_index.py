@@ -0,0 +1,175 @@
+"""All-filers 8-K table built from EDGAR form index files.
+
+``search_debt_conversions`` needs a ticker up front. To answer "which
+companies disclosed conversions last week" this module ingests EDGAR's form
+index files, which list every filing by form type, and keeps the 8-K rows
+(form, company, CIK, date, accession) for a date window:
+
+- Days in quarters that have already ended come from the quarterly
+  ``full-index/<year>/QTR<n>/form.idx`` (one file per quarter).
+- Days in the current quarter come from
+  ``daily-index/<year>/QTR<n>/form.<YYYYMMDD>.idx``.
+
+``EDGAR_INDEX_BASE`` points at ``https://www.sec.gov/Archives/edgar`` by
+default and may be a local mirror directory with the same layout. Parsed
+per-day tables for past days never change, so they are stored as JSON under
+``FORM_INDEX_DIR`` and each index file is read at most once.
+"""
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+import json
+import os
+import re
+import threading
+
+from src.tools.persist import cache_path, save_json
+from src.tools.sec_http import sec_http
+
+EDGAR_INDEX_BASE = os.getenv("EDGAR_INDEX_BASE", "https://www.sec.gov/Archives/edgar")
+FORM_INDEX_DIR = Path(os.getenv(
+    "FORM_INDEX_DIR", str(cache_path("form_index"))
+))
+
+EIGHT_K_FORMS = ("8-K", "8-K/A")
+
+# FORM TYPE   COMPANY NAME   CIK   DATE FILED   FILE NAME (fixed-width, widths vary by year)
+_ROW_RE = re.compile(
+    r"^(?P<form>\S+(?: \S+)*?)\s{2,}(?P<company>.+?)\s+(?P<cik>\d+)\s+"
+    r"(?P<date>\d{4}-?\d{2}-?\d{2})\s+(?P<path>\S+)\s*$"
+)
+
+
+class IndexEntry(NamedTuple):
+    filing_date: str  # ISO date
+    form: str
+    company: str
+    cik: int
+    accession_no: str
+
+
+def _quarter(day: date) -> int:
+    return (day.month - 1) // 3 + 1
+
+
+def _quarter_end(year: int, quarter: int) -> date:
+    return date(year + (quarter == 4), 1 if quarter == 4 else quarter * 3 + 1, 1) - timedelta(days=1)
+
+
+def parse_form_index(lines: Iterable[str], forms: Sequence[str] = EIGHT_K_FORMS) -> Iterator[IndexEntry]:
+    """Yield entries of the given ``forms`` from the lines of a form.idx file."""
+    in_body = False
+    for line in lines:
+        if not in_body:
+            # The column header block ends with a row of dashes
+            in_body = line.startswith("---")
+            continue
+        if not line.startswith(forms):
+            # form.idx is sorted by form type, so a prefix test skips most rows cheaply
+            continue
+        m = _ROW_RE.match(line.rstrip("\n"))
+        if not m or m.group("form") not in forms:
+            continue
+        raw_date = m.group("date").replace("-", "")
+        accession = m.group("path").rsplit("/", 1)[-1].split(".", 1)[0]
+        yield IndexEntry(
+            f"{raw_date[:4]}-{raw_date[4:6]}-{raw_date[6:]}", m.group("form"),
+            m.group("company").strip(), int(m.group("cik")), accession,
+        )
+
+
+def _open_lines(relative: str) -> Optional[Iterator[str]]:
+    """Return the lines of an index file from the mirror or SEC, or None if it does not exist."""
+    if EDGAR_INDEX_BASE.startswith(("http://", "https://")):
+        # The SEC answers 403 for daily files that were never published (weekends, holidays)
+        return sec_http.open_lines(f"{EDGAR_INDEX_BASE.rstrip('/')}/{relative}")
+    path = Path(EDGAR_INDEX_BASE.replace("file://", "", 1)) / relative
+    if not path.exists():
+        return None
+    return iter(path.read_text(encoding="latin-1").splitlines())
+
+
+class FormIndex:
+    """Per-day all-filers 8-K tables ingested from EDGAR form index files."""
+
+    def __init__(self, root: Path = FORM_INDEX_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._days: Dict[str, List[IndexEntry]] = {}
+        self.files_read = 0
+
+    def _day_path(self, day: str) -> Path:
+        return self.root / f"{day}.json"
+
+    def _load_day(self, day: date) -> Optional[List[IndexEntry]]:
+        key = day.isoformat()
+        with self._lock:
+            if key in self._days:
+                return self._days[key]
+        try:
+            entries = [IndexEntry(*row) for row in json.loads(self._day_path(key).read_text())]
+        except Exception:
+            return None
+        with self._lock:
+            self._days[key] = entries
+        return entries
+
+    def _store_days(self, days: Dict[str, List[IndexEntry]]) -> None:
+        with self._lock:
+            self._days.update(days)
+        for key, entries in days.items():
+            if not save_json(self._day_path(key), [list(e) for e in entries]):
+                break
+
+    def _ingest_quarter(self, year: int, quarter: int) -> Optional[Dict[str, List[IndexEntry]]]:
+        lines = _open_lines(f"full-index/{year}/QTR{quarter}/form.idx")
+        if lines is None:
+            return None
+        self.files_read += 1
+        end = _quarter_end(year, quarter)
+        day = date(year, quarter * 3 - 2, 1)
+        days: Dict[str, List[IndexEntry]] = {}
+        while day <= end:
+            days[day.isoformat()] = []
+            day += timedelta(days=1)
+        for entry in parse_form_index(lines):
+            days.setdefault(entry.filing_date, []).append(entry)
+        self._store_days(days)
+        return days
+
+    def _ingest_day(self, day: date) -> List[IndexEntry]:
+        lines = _open_lines(f"daily-index/{day.year}/QTR{_quarter(day)}/form.{day:%Y%m%d}.idx")
+        if lines is None:
+            # Weekend, holiday or not yet published; only weekends are certain to stay empty
+            if day.weekday() >= 5 and day < date.today():
+                self._store_days({day.isoformat(): []})
+            return []
+        self.files_read += 1
+        entries = [e for e in parse_form_index(lines) if e.filing_date == day.isoformat()]
+        if day < date.today():
+            # Today's file can still grow, so only past days are kept
+            self._store_days({day.isoformat(): entries})
+        return entries
+
+    def filings(self, start: date, end: date) -> List[IndexEntry]:
+        """Blocking: every 8-K / 8-K/A filed in [start, end], newest first."""
+        today = date.today()
+        out: List[IndexEntry] = []
+        day = min(end, today)
+        while day >= start:
+            entries = self._load_day(day)
+            if entries is None and _quarter_end(day.year, _quarter(day)) < today:
+                days = self._ingest_quarter(day.year, _quarter(day))
+                entries = days.get(day.isoformat()) if days is not None else None
+            if entries is None:
+                entries = self._ingest_day(day)
+            out.extend(sorted(entries, key=lambda e: e.accession_no, reverse=True))
+            day -= timedelta(days=1)
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"days": len(self._days), "files_read": self.files_read}
+
+
+form_index = FormIndex()
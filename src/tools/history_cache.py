@@ -0,0 +1,298 @@
+"""Process-wide OHLCV history cache shared by the financial tools.
+
+Every tool in ``financial_tools`` asks this module for bars instead of calling
+``yf.Ticker(...).history()`` itself, so a single analysis of a ticker costs one
+upstream download rather than one per tool. Entries are keyed by
+``(ticker, interval, range)``, expire after ``HISTORY_CACHE_TTL`` seconds and
+are evicted least-recently-used once ``HISTORY_CACHE_MAX_ENTRIES`` is reached.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import os
+import threading
+import time
+
+import pandas as pd
+import yfinance as yf
+
+from src.tools.ohlcv_store import PERIOD_OFFSETS, ohlcv_store, slice_period
+from src.tools.upstream import YAHOO, run_upstream, upstream_flights
+
+HISTORY_CACHE_TTL = float(os.getenv("HISTORY_CACHE_TTL", "900"))
+HISTORY_CACHE_MAX_ENTRIES = int(os.getenv("HISTORY_CACHE_MAX_ENTRIES", "512"))
+
+# yfinance ``period`` strings ordered by lookback. A request for a shorter
+# period can be answered by slicing a cached longer one for the same interval.
+_PERIOD_ORDER = list(PERIOD_OFFSETS) + ["max"]
+
+# Daily requests shorter than this are fetched at this length and sliced, so
+# every tool (price summary, 52-week low, daily/weekly/monthly MACD) shares a
+# single daily download per ticker.
+HISTORY_DAILY_PERIOD = os.getenv("HISTORY_DAILY_PERIOD", "2y")
+
+# Coarser intervals are resampled locally from daily bars instead of being
+# downloaded separately. Yahoo labels weekly bars with the Monday they start.
+_RESAMPLE_RULES = {"1wk": "W-MON", "1mo": "MS"}
+_RESAMPLE_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+CacheKey = Tuple[str, str, str]
+
+
+def make_key(ticker: str, interval: str = "1d", period: Optional[str] = None,
+             start: Optional[str] = None, end: Optional[str] = None) -> CacheKey:
+    """Build the cache key for a history request.
+
+    Period requests use the period string as the range; explicit date ranges
+    are encoded as ``"start:end"``.
+    """
+    if period is not None:
+        rng = period
+    else:
+        rng = f"{start or ''}:{end or ''}"
+    return (ticker.strip().upper(), interval, rng)
+
+
+class HistoryCache:
+    """Thread- and task-safe TTL + LRU cache of ``history()`` frames.
+
+    The lock is never held across an await or an upstream call, so it is safe
+    to use from the event loop and from executor threads alike. Cached frames
+    are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, ttl: float = HISTORY_CACHE_TTL, max_entries: int = HISTORY_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, pd.DataFrame]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _fresh(self, key: CacheKey, now: float) -> Optional[pd.DataFrame]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, frame = entry
+        if now - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return frame
+
+    def get(self, key: CacheKey) -> Optional[pd.DataFrame]:
+        """Return a cached frame for ``key`` or None, updating hit/miss counters.
+
+        When ``key`` names a period that is not cached itself, any fresh entry
+        with the same ticker and interval and a longer period is sliced instead.
+        """
+        ticker, interval, rng = key
+        now = time.monotonic()
+        with self._lock:
+            frame = self._fresh(key, now)
+            if frame is None and rng in _PERIOD_ORDER:
+                for longer in _PERIOD_ORDER[_PERIOD_ORDER.index(rng) + 1:]:
+                    covering = self._fresh((ticker, interval, longer), now)
+                    if covering is not None:
+                        frame = slice_period(covering, rng)
+                        break
+            if frame is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return frame
+
+    def put(self, key: CacheKey, frame: pd.DataFrame) -> None:
+        """Store ``frame`` under ``key``; empty frames are never cached."""
+        if frame is None or frame.empty:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), frame)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+history_cache = HistoryCache()
+
+
+def _download_history(ticker: str, interval: str, period: Optional[str],
+                      start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+    stock = yf.Ticker(ticker)
+    if period is not None:
+        if ohlcv_store.enabled:
+            # Only bars from the last closed stored one on are downloaded
+            return ohlcv_store.refresh(
+                ticker, interval, period,
+                lambda since: stock.history(period=period, interval=interval) if since is None
+                else stock.history(start=since, interval=interval),
+            )
+        return stock.history(period=period, interval=interval)
+    return stock.history(start=start, end=end, interval=interval)
+
+
+def _shorter(period: Optional[str], than: str) -> bool:
+    return (period in _PERIOD_ORDER and than in _PERIOD_ORDER
+            and _PERIOD_ORDER.index(period) < _PERIOD_ORDER.index(than))
+
+
+def _daily_period(period: str) -> str:
+    """Daily lookback to download for ``period`` (at least ``HISTORY_DAILY_PERIOD``)."""
+    return HISTORY_DAILY_PERIOD if _shorter(period, HISTORY_DAILY_PERIOD) else period
+
+
+def resample_bars(daily: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Aggregate daily OHLCV bars into weekly (``1wk``) or monthly (``1mo``) bars."""
+    if daily is None or daily.empty:
+        return pd.DataFrame() if daily is None else daily
+    agg = {col: how for col, how in _RESAMPLE_AGG.items() if col in daily.columns}
+    bars = daily.resample(_RESAMPLE_RULES[interval], label="left", closed="left").agg(agg)
+    return bars.dropna(subset=["Close"] if "Close" in bars.columns else None)
+
+
+async def get_history(ticker: str, period: Optional[str] = None, interval: str = "1d",
+                      start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+    """Return OHLCV bars for ``ticker``, downloading only on a cache miss.
+
+    Period requests are served from one shared daily series: shorter daily
+    periods are sliced from it and weekly/monthly bars are resampled from it.
+    """
+    if period is not None and interval in _RESAMPLE_RULES:
+        daily = await get_history(ticker, period=_daily_period(period), interval="1d")
+        return resample_bars(slice_period(daily, period), interval)
+    if period is not None and interval == "1d" and _shorter(period, HISTORY_DAILY_PERIOD):
+        return slice_period(await get_history(ticker, period=HISTORY_DAILY_PERIOD), period)
+
+    key = make_key(ticker, interval, period, start, end)
+    cached = history_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def fetch() -> pd.DataFrame:
+        frame = await run_upstream(YAHOO, _download_history, ticker, interval, period, start, end)
+        history_cache.put(key, frame)
+        return frame
+
+    # Concurrent callers for the same key await the first caller's download
+    return await upstream_flights.do((YAHOO, "history") + key, fetch)
+
+
+def normalize_tickers(tickers: Iterable[str] | str) -> List[str]:
+    """Accept a list or a comma/space separated string; return unique upper-case symbols in order."""
+    if isinstance(tickers, str):
+        tickers = tickers.replace(",", " ").split()
+    seen = []
+    for t in tickers:
+        t = str(t).strip().upper()
+        if t and t not in seen:
+            seen.append(t)
+    return seen
+
+
+def _download_batch(tickers: List[str], period: str, interval: str,
+                    start: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+    """Blocking helper: fetch many tickers with one ``yf.download`` request.
+
+    With ``start`` the request covers ``start``..today instead of ``period``.
+    """
+    if start is not None:
+        window = {"start": start.strftime("%Y-%m-%d")}
+    else:
+        window = {"period": period}
+    data = yf.download(
+        tickers,
+        interval=interval,
+        **window,
+        group_by="ticker",
+        auto_adjust=True,
+        ignore_tz=False,
+        threads=True,
+        progress=False,
+    )
+    frames: Dict[str, pd.DataFrame] = {}
+    if data is None or data.empty:
+        return frames
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for t in tickers:
+            if t in available:
+                frames[t] = data[t].dropna(how="all")
+    elif len(tickers) == 1:
+        frames[tickers[0]] = data.dropna(how="all")
+    return frames
+
+
+async def get_history_batch(tickers: Iterable[str] | str, period: str = "1y",
+                            interval: str = "1d") -> Dict[str, pd.DataFrame]:
+    """Return bars for many tickers; cache misses are fetched in one bulk download.
+
+    Tickers with no data upstream map to an empty frame. Downloaded frames are
+    added to the shared cache so later single-ticker tools reuse them. As in
+    :func:`get_history`, shorter daily periods are sliced from the shared
+    ``HISTORY_DAILY_PERIOD`` series, and weekly and monthly bars are resampled
+    from it.
+    """
+    if interval in _RESAMPLE_RULES:
+        daily = await get_history_batch(tickers, period=_daily_period(period), interval="1d")
+        return {t: resample_bars(slice_period(frame, period), interval) for t, frame in daily.items()}
+    if interval == "1d" and _shorter(period, HISTORY_DAILY_PERIOD):
+        daily = await get_history_batch(tickers, period=HISTORY_DAILY_PERIOD)
+        return {t: slice_period(frame, period) for t, frame in daily.items()}
+
+    symbols = normalize_tickers(tickers)
+    result: Dict[str, pd.DataFrame] = {}
+    missing = []
+    for t in symbols:
+        cached = history_cache.get(make_key(t, interval, period))
+        if cached is not None:
+            result[t] = cached
+        else:
+            missing.append(t)
+
+    if missing:
+        async def fetch() -> Dict[str, pd.DataFrame]:
+            if ohlcv_store.enabled:
+                return await run_upstream(
+                    YAHOO, ohlcv_store.refresh_many, missing, interval, period,
+                    lambda symbols, since: _download_batch(symbols, period, interval, since),
+                )
+            return await run_upstream(YAHOO, _download_batch, missing, period, interval)
+
+        fetched = await upstream_flights.do((YAHOO, "batch", tuple(missing), interval, period), fetch)
+        for t in missing:
+            frame = fetched.get(t)
+            if frame is None:
+                frame = pd.DataFrame()
+            history_cache.put(make_key(t, interval, period), frame)
+            result[t] = frame
+
+    return {t: result[t] for t in symbols}
+
+
+def cache_stats() -> Dict[str, float]:
+    """Counters for the shared history cache (hits, misses, evictions, size)."""
+    return history_cache.stats()
+
+
+def store_stats() -> Dict[str, float]:
+    """Counters for the on-disk OHLCV store (full vs incremental downloads)."""
+    return ohlcv_store.stats()
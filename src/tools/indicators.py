@@ -0,0 +1,86 @@
+"""Vectorised technical indicators over (tickers x bars) float matrices.
+
+Per-ticker pandas calls dominate the runtime of screens over hundreds of
+names. These helpers align many tickers' bars into one matrix and compute the
+indicator for every row at once: the EMA recurrence walks the bar axis once
+and updates all tickers per step with NumPy vector operations.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.tools.macd_state import FAST_SPAN, SIGNAL_SPAN, SLOW_SPAN
+
+
+def align_frames(frames: Dict[str, pd.DataFrame], columns: Sequence[str]
+                 ) -> Tuple[List[str], Dict[str, np.ndarray], pd.DatetimeIndex]:
+    """Align per-ticker bars on a common (tz-naive, normalised) date axis.
+
+    Returns (tickers, matrices, dates) where ``matrices[col]`` has shape
+    (len(tickers), len(dates)) and holds NaN for bars a ticker does not have.
+    Tickers missing any requested column are dropped.
+    """
+    series: Dict[str, Dict[str, pd.Series]] = {col: {} for col in columns}
+    for t, hist in frames.items():
+        if hist is None or hist.empty or any(col not in hist for col in columns):
+            continue
+        index = pd.DatetimeIndex(hist.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        index = index.normalize()
+        for col in columns:
+            series[col][t] = pd.Series(hist[col].to_numpy(dtype=float), index=index)
+
+    first = series[columns[0]]
+    if not first:
+        return [], {col: np.empty((0, 0)) for col in columns}, pd.DatetimeIndex([])
+
+    base = pd.concat(first, axis=1).sort_index()
+    base = base[~base.index.duplicated(keep="last")]
+    tickers = [str(c) for c in base.columns]
+    matrices = {columns[0]: base.to_numpy().T}
+    for col in columns[1:]:
+        other = pd.concat(series[col], axis=1)
+        other = other[~other.index.duplicated(keep="last")].reindex(base.index)[base.columns]
+        matrices[col] = other.to_numpy().T
+    return tickers, matrices, base.index
+
+
+def ema_matrix(values: np.ndarray, span: int) -> np.ndarray:
+    """Row-wise EMA equivalent to ``Series.dropna().ewm(span, adjust=False).mean()``.
+
+    Each row is seeded at its first non-NaN value; NaN bars leave the EMA
+    unchanged (and stay NaN in the output), matching the per-ticker path that
+    drops missing bars before computing.
+    """
+    alpha = 2.0 / (span + 1)
+    out = np.full(values.shape, np.nan)
+    if values.size == 0:
+        return out
+    ema = np.full(values.shape[0], np.nan)
+    for j in range(values.shape[1]):
+        col = values[:, j]
+        valid = ~np.isnan(col)
+        seed = valid & np.isnan(ema)
+        step = valid & ~seed
+        ema[seed] = col[seed]
+        ema[step] = alpha * col[step] + (1 - alpha) * ema[step]
+        out[valid, j] = ema[valid]
+    return out
+
+
+def macd_matrix(close: np.ndarray) -> Dict[str, np.ndarray]:
+    """MACD(12, 26, 9) line, signal and histogram for every row of ``close``."""
+    macd = ema_matrix(close, FAST_SPAN) - ema_matrix(close, SLOW_SPAN)
+    signal = ema_matrix(macd, SIGNAL_SPAN)
+    return {"macd": macd, "signal": signal, "histogram": macd - signal}
+
+
+def last_valid(values: np.ndarray) -> np.ndarray:
+    """Last non-NaN value in each row (NaN for empty rows)."""
+    if values.size == 0:
+        return np.full(values.shape[0], np.nan)
+    valid = ~np.isnan(values)
+    idx = values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    return np.where(valid.any(axis=1), values[np.arange(values.shape[0]), idx], np.nan)
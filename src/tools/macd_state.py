@@ -0,0 +1,178 @@
+"""Incremental MACD(12, 26, 9) state per (ticker, timeframe).
+
+``calculate_macd`` used to recompute three ``ewm`` passes over the whole
+6-month or 2-year series on every call. This module persists the EMA state
+instead and advances it in O(1) per new bar, using the same recurrence as
+``ewm(span=..., adjust=False)``::
+
+    ema_t = alpha * x_t + (1 - alpha) * ema_{t-1},  alpha = 2 / (span + 1)
+
+The state is anchored on the second-to-last bar it has seen. The newest bar is
+always re-applied from the anchor, so an intraday bar whose close keeps moving
+never corrupts the state. A full recomputation happens only on a cold start,
+when the anchor bar is no longer in the downloaded window, or when the
+anchor's close has changed (Yahoo back-adjusted history after a split or
+dividend).
+
+States are persisted as JSON at ``MACD_STATE_PATH`` so they survive restarts.
+The file is rewritten only when an anchor moves, and never under the lock that
+guards the in-memory states. ``update`` is blocking: async callers run it in a
+thread.
+"""
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import json
+import os
+import threading
+
+import pandas as pd
+
+from src.tools.persist import cache_path, save_json
+
+MACD_STATE_PATH = Path(os.getenv(
+    "MACD_STATE_PATH", str(cache_path("macd_state.json"))
+))
+
+FAST_SPAN = 12
+SLOW_SPAN = 26
+SIGNAL_SPAN = 9
+
+_ALPHA_FAST = 2.0 / (FAST_SPAN + 1)
+_ALPHA_SLOW = 2.0 / (SLOW_SPAN + 1)
+_ALPHA_SIGNAL = 2.0 / (SIGNAL_SPAN + 1)
+
+# Relative change in the anchor bar's close treated as a history re-adjustment
+_ADJUSTMENT_TOLERANCE = 1e-6
+
+# (fast EMA, slow EMA, signal EMA)
+EMAs = Tuple[float, float, float]
+
+
+def advance(emas: Optional[EMAs], close: float) -> EMAs:
+    """Advance the three EMAs by one bar; ``None`` seeds them from ``close``."""
+    if emas is None:
+        return close, close, 0.0
+    fast, slow, signal = emas
+    fast = _ALPHA_FAST * close + (1 - _ALPHA_FAST) * fast
+    slow = _ALPHA_SLOW * close + (1 - _ALPHA_SLOW) * slow
+    signal = _ALPHA_SIGNAL * (fast - slow) + (1 - _ALPHA_SIGNAL) * signal
+    return fast, slow, signal
+
+
+def _snapshot(emas: EMAs, close: float) -> Dict[str, float]:
+    fast, slow, signal = emas
+    macd = fast - slow
+    return {"macd": macd, "signal": signal, "histogram": macd - signal, "close": close}
+
+
+class MACDStateStore:
+    """Persisted per-(ticker, timeframe) MACD state with O(1) bar updates."""
+
+    def __init__(self, path: Path = MACD_STATE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        # Serialises writes so the last one persists the newest states
+        self._save_lock = threading.Lock()
+        self._states: Optional[Dict[str, dict]] = None
+        self.cold_starts = 0
+        self.incremental_updates = 0
+        self.adjustments = 0
+
+    def _load(self) -> Dict[str, dict]:
+        if self._states is None:
+            try:
+                self._states = json.loads(self.path.read_text())
+            except Exception:
+                self._states = {}
+        return self._states
+
+    def _save(self) -> None:
+        with self._save_lock:
+            with self._lock:
+                snapshot = dict(self._states or {})
+            save_json(self.path, snapshot)
+
+    def _cold_start(self, closes: pd.Series) -> Tuple[dict, EMAs]:
+        self.cold_starts += 1
+        emas: Optional[EMAs] = None
+        anchor: Optional[EMAs] = None
+        for value in closes.iloc[:-1].to_numpy(dtype=float):
+            emas = advance(emas, value)
+        anchor = emas
+        emas = advance(anchor, float(closes.iloc[-1]))
+        return self._state(closes, anchor), emas
+
+    @staticmethod
+    def _state(closes: pd.Series, anchor: Optional[EMAs]) -> dict:
+        if anchor is None or len(closes) < 2:
+            return {"anchor_ts": None, "anchor_close": None, "emas": None}
+        return {
+            "anchor_ts": pd.Timestamp(closes.index[-2]).isoformat(),
+            "anchor_close": float(closes.iloc[-2]),
+            "emas": list(anchor),
+        }
+
+    def update(self, ticker: str, timeframe: str, closes: pd.Series) -> Optional[Dict[str, float]]:
+        """Blocking: bring the state up to date with ``closes`` and return the latest MACD values.
+
+        Returns None when ``closes`` has no data.
+        """
+        closes = closes.dropna()
+        if closes.empty:
+            return None
+        key = f"{ticker.strip().upper()}|{timeframe}"
+
+        with self._lock:
+            states = self._load()
+            state = states.get(key)
+            emas = None
+            if state and state.get("emas") is not None:
+                anchor_ts = pd.Timestamp(state["anchor_ts"])
+                index = pd.DatetimeIndex(closes.index)
+                if anchor_ts.tzinfo is None and index.tz is not None:
+                    anchor_ts = anchor_ts.tz_localize(index.tz)
+                elif anchor_ts.tzinfo is not None and index.tz is None:
+                    anchor_ts = anchor_ts.tz_localize(None)
+                if anchor_ts in index:
+                    anchor_close = float(closes.loc[anchor_ts])
+                    previous = state["anchor_close"]
+                    if abs(anchor_close - previous) <= _ADJUSTMENT_TOLERANCE * max(1.0, abs(previous)):
+                        # Replay only the bars after the anchor (normally one or two)
+                        new_bars = closes[index > anchor_ts]
+                        if not new_bars.empty:
+                            self.incremental_updates += 1
+                            anchor = tuple(state["emas"])
+                            for value in new_bars.iloc[:-1].to_numpy(dtype=float):
+                                anchor = advance(anchor, value)
+                            emas = advance(anchor, float(new_bars.iloc[-1]))
+                            if len(new_bars) > 1:
+                                state = {
+                                    "anchor_ts": pd.Timestamp(new_bars.index[-2]).isoformat(),
+                                    "anchor_close": float(new_bars.iloc[-2]),
+                                    "emas": list(anchor),
+                                }
+                    else:
+                        self.adjustments += 1
+
+            if emas is None:
+                state, emas = self._cold_start(closes)
+
+            changed = states.get(key) != state
+            states[key] = state
+
+        if changed:
+            self._save()
+
+        return _snapshot(emas, float(closes.iloc[-1]))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "states": len(self._load()),
+                "cold_starts": self.cold_starts,
+                "incremental_updates": self.incremental_updates,
+                "adjustments": self.adjustments,
+            }
+
+
+macd_state_store = MACDStateStore()
@@ -1,5 +1,17 @@
-from typing import Dict, List, Generator, Any
+from collections import OrderedDict
+from html.parser import HTMLParser
+import heapq
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Generator, Any, Optional
+import os
 import re
+import secrets
+import threading
+import time
+
+from src.tools.conversion_terms import extract_prices
+from src.tools.filing_cache import filing_text_cache
+from src.tools.keyword_matcher import get_matcher, normalize_keywords
 
 try:
     import html2text
@@ -7,40 +19,148 @@ try:
 except Exception:
     _HAS_HTML2TEXT = False
 
+# Tags are sniffed in the document prefix only; filings open with their markup
+_SNIFF_CHARS = 4096
+_HTML_SNIFF_RE = re.compile(r"<(?:html|body|div|p|br)", re.IGNORECASE)
+
+# HTML is fed to the streaming converter in slices of this many characters
+_FEED_CHARS = 64 * 1024
+
+# Relevance ranking: dates that commonly anchor conversion events, and the
+# weight of each signal (a $ amount is the strongest hint of a conversion price)
+_DATE_RE = re.compile(
+    r"\b(?:(?:January|February|March|April|May|June|July|August|September|October|November|December)"
+    r"\s+\d{1,2},\s+\d{4}|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{2,4})\b",
+    re.IGNORECASE,
+)
+_KEYWORD_WEIGHT = 1.0
+_PRICE_WEIGHT = 2.0
+_DATE_WEIGHT = 1.0
+
+# Chunked sources being paged through with a cursor are kept this long / this many
+MARKDOWN_CURSOR_TTL = float(os.getenv("MARKDOWN_CURSOR_TTL", "900"))
+MARKDOWN_CURSOR_MAX_ENTRIES = int(os.getenv("MARKDOWN_CURSOR_MAX_ENTRIES", "64"))
+
 
 def _looks_like_html(s: str) -> bool:
     if not s:
         return False
-    low = s.lower()
-    return any(tag in low for tag in ("<html", "<body", "<div", "<p", "<br"))
+    return _HTML_SNIFF_RE.search(s, 0, _SNIFF_CHARS) is not None
+
+
+def _new_converter(out=None):
+    h = html2text.HTML2Text(out=out)
+    h.ignore_links = False
+    h.body_width = 0
+    return h
 
 
 def _html_to_text(s: str) -> str:
     if _HAS_HTML2TEXT:
+        # A fresh converter per document: html2text keeps parse state (open
+        # tables, links, paragraph spacing) that would leak into the next one
         try:
-            h = html2text.HTML2Text()
-            h.ignore_links = False
-            h.body_width = 0
-            return h.handle(s)
+            return _new_converter().handle(s)
         except Exception:
             pass
     # Fallback: very small heuristic stripper
     return re.sub(r"<[^>]+>", "", s)
 
 
-def _paragraph_chunks(text: str, target_chars: int) -> Generator[str, None, None]:
-    """Yield chunks of approximately target_chars length by joining paragraphs.
+class _TextExtractor(HTMLParser):
+    """Minimal streaming HTML -> text parser used when html2text is unavailable."""
+
+    _BLOCKS = {"p", "div", "br", "tr", "li", "table", "h1", "h2", "h3", "h4", "h5", "h6"}
+    _SKIP = {"script", "style", "head"}
+
+    def __init__(self, out):
+        super().__init__(convert_charrefs=True)
+        self.out = out
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self.skip += 1
+        elif tag in self._BLOCKS:
+            self.out("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP:
+            self.skip = max(0, self.skip - 1)
+        elif tag in self._BLOCKS:
+            self.out("\n\n")
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.out(data)
+
+
+def iter_html_paragraphs(html: Iterable[str]) -> Iterator[str]:
+    """Convert HTML to text incrementally, yielding each paragraph as soon as it is complete.
 
-    Splits on double-newline boundaries and accumulates paragraphs until the
-    chunk would exceed target_chars, then yields the chunk and continues.
+    ``html`` is an iterable of HTML fragments (e.g. slices of a multi-megabyte
+    exhibit); only the fragment being parsed and the current paragraph are
+    held in memory, and each fragment's output is split into paragraphs once.
     """
-    if not text:
-        return
-    paras = [p.strip() for p in text.split("\n\n") if p.strip()]
-    if not paras:
-        yield text[:target_chars]
-        return
+    pending: List[str] = []
+    parser = _new_converter(out=pending.append) if _HAS_HTML2TEXT else _TextExtractor(pending.append)
+    # Pieces of the paragraph still being parsed; kept unjoined so a long
+    # paragraph (a large table) is not re-split on every fragment
+    unfinished: List[str] = []
 
+    def drain(final: bool) -> Iterator[str]:
+        text = "".join(pending)
+        pending.clear()
+        # Only new text is split: a "\n\n" can straddle it and the unfinished
+        # paragraph only through that paragraph's last character
+        if unfinished and unfinished[-1].endswith("\n"):
+            unfinished[-1] = unfinished[-1][:-1]
+            text = "\n" + text
+        parts = text.split("\n\n")
+        unfinished.append(parts[0])
+        if len(parts) > 1:
+            parts[0] = "".join(unfinished)
+            unfinished[:] = [parts.pop()]
+        else:
+            parts = []
+        if final:
+            parts.append("".join(unfinished))
+            unfinished.clear()
+        for part in parts:
+            if part.strip():
+                yield part.strip()
+
+    carry = ""
+    for fragment in html:
+        # Feed up to the last tag start: a text run split across two feeds
+        # would be emitted as two words
+        data = carry + fragment
+        cut = data.rfind("<")
+        if cut <= 0:
+            carry = data
+            continue
+        parser.feed(data[:cut])
+        carry = data[cut:]
+        yield from drain(final=False)
+    parser.feed(carry)
+    if _HAS_HTML2TEXT:
+        parser.finish()
+    else:
+        parser.close()
+    yield from drain(final=True)
+
+
+def _slices(s: str, size: int = _FEED_CHARS) -> Iterator[str]:
+    for i in range(0, len(s), size):
+        yield s[i:i + size]
+
+
+def _paragraph_chunks(paras: Iterable[str], target_chars: int) -> Generator[str, None, None]:
+    """Yield chunks of approximately target_chars length by joining paragraphs.
+
+    Accumulates paragraphs (in order, as they arrive) until the chunk would
+    exceed target_chars, then yields the chunk and continues.
+    """
     current: List[str] = []
     cur_len = 0
     for p in paras:
@@ -57,6 +177,155 @@ def _paragraph_chunks(text: str, target_chars: int) -> Generator[str, None, None
         yield "\n\n".join(current)
 
 
+def _snippet_paragraphs(snippets: List[Dict[str, Any]]) -> Iterator[str]:
+    """Paragraphs of every snippet in order; HTML snippets are converted as they stream."""
+    for s in snippets:
+        t = s.get('text') or ''
+        if s.get('html'):
+            yield from iter_html_paragraphs(_slices(t))
+        else:
+            for p in t.split("\n\n"):
+                if p.strip():
+                    yield p.strip()
+
+
+def _chunk_stream(snippets: List[Dict[str, Any]], max_chars: int, start: int = 0) -> Iterator[str]:
+    return islice(_paragraph_chunks(_snippet_paragraphs(snippets), max_chars), start, None)
+
+
+def score_chunk(text: str, keywords: Optional[Iterable[str]] = None) -> float:
+    """Conversion-term score of a chunk: weighted keyword, ``$`` amount and date hits.
+
+    Chunks are filled to about the same length, so the raw count ranks them by
+    term density.
+    """
+    matcher = get_matcher(keywords)
+    keyword_hits = sum(1 for _ in matcher.finditer(text))
+    return (_KEYWORD_WEIGHT * keyword_hits
+            + _PRICE_WEIGHT * len(extract_prices(text))
+            + _DATE_WEIGHT * len(_DATE_RE.findall(text)))
+
+
+def _ranked_chunks(chunks: Iterable[str], top_k: int, keywords: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Keep the ``top_k`` highest-scoring chunks, returned in document order with their positions."""
+    keywords = normalize_keywords(keywords)
+    total = 0
+
+    def scored():
+        nonlocal total
+        for idx, chunk in enumerate(chunks):
+            total += 1
+            score = score_chunk(chunk, keywords)
+            if score > 0:
+                yield score, -idx, chunk
+
+    # Only top_k chunks are held at once; earlier chunks win ties
+    best = heapq.nlargest(max(1, top_k), scored())
+    out = [
+        {'index': -neg_idx, 'markdown': chunk, 'chars': len(chunk), 'score': score}
+        for score, neg_idx, chunk in sorted(best, key=lambda b: -b[1])
+    ]
+    return {'mode': 'chunked', 'chunks': out, 'ranked': True, 'total_chunks': total}
+
+
+class _CursorEntry:
+    __slots__ = ("snippets", "max_chars", "page_size", "position", "chunks", "touched", "lock")
+
+    def __init__(self, snippets, max_chars, page_size):
+        self.snippets = snippets
+        self.max_chars = max_chars
+        self.page_size = page_size
+        self.position = 0
+        self.chunks: Iterator[str] = _chunk_stream(snippets, max_chars)
+        self.touched = time.time()
+        self.lock = threading.Lock()
+
+
+class ChunkCursors:
+    """Bounded TTL + LRU store of chunked sources paged through with continuation cursors.
+
+    Each entry keeps the normalised snippets and a lazy chunk iterator positioned
+    at the next page, so a page costs only the chunks it returns. A cursor for
+    any other position (a retried page) rebuilds the iterator from the source.
+    """
+
+    def __init__(self, ttl: float = MARKDOWN_CURSOR_TTL, max_entries: int = MARKDOWN_CURSOR_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, _CursorEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _page(self, key: Optional[str], entry: _CursorEntry, start: int, page_size: int) -> Dict[str, Any]:
+        with entry.lock:
+            if start != entry.position:
+                entry.chunks = _chunk_stream(entry.snippets, entry.max_chars, start)
+            chunks = [
+                {'index': start + i, 'markdown': chunk, 'chars': len(chunk)}
+                for i, chunk in enumerate(islice(entry.chunks, page_size))
+            ]
+            # Peek one chunk ahead so the last page carries no cursor
+            peek = next(entry.chunks, None)
+            entry.position = start + len(chunks)
+            if peek is not None:
+                entry.chunks = chain([peek], entry.chunks)
+            entry.touched = time.time()
+        with self._lock:
+            self.pages += 1
+            if peek is None:
+                if key is not None:
+                    self._entries.pop(key, None)
+                key = None
+            elif key is None:
+                key = secrets.token_urlsafe(12)
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._entries.move_to_end(key)
+        next_cursor = f"{key}.{entry.position}" if key is not None else None
+        return {'mode': 'chunked', 'chunks': chunks, 'next_cursor': next_cursor}
+
+    def start(self, snippets: List[Dict[str, Any]], max_chars: int, page_size: int) -> Dict[str, Any]:
+        """Return the first page of a new chunked source, registering it if more pages follow."""
+        return self._page(None, _CursorEntry(snippets, max_chars, max(1, page_size)), 0, max(1, page_size))
+
+    def resume(self, cursor: str, page_size: Optional[int] = None) -> Dict[str, Any]:
+        """Return the page a ``next_cursor`` token points at.
+
+        Raises ValueError for a malformed, unknown or expired cursor.
+        """
+        key, _, position = str(cursor).rpartition(".")
+        if not key or not position.isdigit():
+            raise ValueError(f"Malformed cursor {cursor!r}")
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.touched > self.ttl:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+        if entry is None:
+            raise ValueError("Unknown or expired cursor; request the first page again")
+        return self._page(key, entry, int(position), max(1, int(page_size or entry.page_size)))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open": len(self._entries),
+                "max_entries": self.max_entries,
+                "pages": self.pages,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
+
+
+chunk_cursors = ChunkCursors()
+
+
 def render_structured_result(structured: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
     """Render a structured result (from EDGAR or other tools) into markdown.
 
@@ -67,11 +336,28 @@ def render_structured_result(structured: Dict[str, Any], options: Dict[str, Any]
             - mode: 'snippet' (default) or 'chunked'
             - max_tokens: integer target (approximate)
             - snippet_key: path/key inside structured that contains the snippet(s)
+            - full_text: replace each item's snippet with the full filing text
+              from the filing-text cache when its accession is cached
+            - page_size: chunked mode only; return this many chunks plus a
+              'next_cursor' token instead of every chunk
+            - cursor: a 'next_cursor' from an earlier page; returns the next
+              page of that source ('structured' is ignored)
+            - top_k: chunked mode only; return just the top_k chunks scored by
+              conversion keywords, $ amounts and dates (each keeps its original
+              'index' and gains a 'score'; chunks without any signal are
+              dropped). Takes precedence over page_size.
+            - keywords: keyword vocabulary for top_k scoring, a list or a
+              comma-separated string (default: the conversion keywords)
 
     Returns:
         A dict with either {'mode':'snippet','markdown':...} or
-        {'mode':'chunked','chunks':[{'index':0,'markdown':..., 'meta':...}, ...]}
+        {'mode':'chunked','chunks':[{'index':0,'markdown':..., 'meta':...}, ...]}.
+        Paged results also carry 'next_cursor' (None on the last page);
+        ranked results carry 'ranked' and 'total_chunks'.
     """
+    if (options or {}).get('cursor'):
+        return chunk_cursors.resume(options['cursor'], (options or {}).get('page_size'))
+
     mode = (options or {}).get('mode', 'snippet')
     max_tokens = int((options or {}).get('max_tokens', 1200) or 1200)
     # Very rough token->char heuristic
@@ -124,11 +410,22 @@ def render_structured_result(structured: Dict[str, Any], options: Dict[str, Any]
         except Exception:
             snippets = []
 
-    # Normalize: convert HTML when needed
+    # Swap snippets for full filing text already cached by the EDGAR tools
+    if (options or {}).get('full_text'):
+        for s in snippets:
+            cached = filing_text_cache.get((s.get('meta') or {}).get('accession'))
+            if cached is not None:
+                s['text'] = cached
+
+    # Normalize: convert HTML when needed. Chunked mode converts while it
+    # chunks, so a large exhibit is never held as a second, converted copy.
     for s in snippets:
         t = s.get('text') or ''
         if _looks_like_html(t):
-            s['text'] = _html_to_text(t)
+            if mode == 'snippet':
+                s['text'] = _html_to_text(t)
+            else:
+                s['html'] = True
 
     # Build markdown according to mode
     if mode == 'snippet':
@@ -143,8 +440,11 @@ def render_structured_result(structured: Dict[str, Any], options: Dict[str, Any]
                 meta_lines = [f"- {k}: {v}" for k, v in meta.items()]
                 piece += "\n" + "\n".join(meta_lines) + "\n\n"
             piece += s.get('text', '')
-            if cur_len + len(piece) > max_chars and cur_len > 0:
-                break
+            if cur_len + len(piece) > max_chars:
+                if cur_len > 0:
+                    break
+                # The first piece (e.g. a full cached filing) is cut to the budget
+                piece = piece[:max_chars]
             out_parts.append(piece)
             cur_len += len(piece)
 
@@ -154,12 +454,13 @@ def render_structured_result(structured: Dict[str, Any], options: Dict[str, Any]
         return {'mode': 'snippet', 'markdown': md, 'chars': len(md)}
 
     # chunked mode: produce paragraph-based chunks of approx max_chars
-    chunks: List[Dict[str, Any]] = []
-    combined_text = "\n\n".join(s.get('text', '') for s in snippets if s.get('text'))
-    if not combined_text:
-        return {'mode': 'chunked', 'chunks': []}
+    if (options or {}).get('top_k'):
+        return _ranked_chunks(_chunk_stream(snippets, max_chars), int(options['top_k']), options.get('keywords'))
+    if (options or {}).get('page_size'):
+        return chunk_cursors.start(snippets, max_chars, int(options['page_size']))
 
-    for idx, chunk in enumerate(_paragraph_chunks(combined_text, max_chars)):
+    chunks: List[Dict[str, Any]] = []
+    for idx, chunk in enumerate(_paragraph_chunks(_snippet_paragraphs(snippets), max_chars)):
         chunks.append({'index': idx, 'markdown': chunk, 'chars': len(chunk)})
 
     return {'mode': 'chunked', 'chunks': chunks}
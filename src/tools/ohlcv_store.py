@@ -0,0 +1,273 @@
+"""Incremental on-disk Parquet store of OHLCV bars.
+
+One Parquet file per (interval, ticker) lives under ``OHLCV_STORE_DIR``
+(``<dir>/<interval>/<TICKER>.parquet``) next to a small JSON sidecar that
+records how far back the partition is known to be complete. When a partition
+already covers the requested period, a refresh downloads only the bars from
+the last closed stored bar onwards and appends them, so repeated daily
+screens pull a handful of bars per ticker instead of the full 6 months to 2
+years.
+
+The last stored bar may belong to a session that was still trading when it
+was written, so it is simply replaced. The tail download starts one bar
+earlier, at the last *closed* bar: if that bar's close no longer matches
+(Yahoo back-adjusts history after splits and dividends), the partition is
+rebuilt from a full download instead of appended to. A full download that
+starts after the stored bars (a shorter period such as ``ytd``) is merged into
+the partition rather than replacing it, unless history was re-adjusted.
+
+Point ``OHLCV_STORE_DIR`` at a persistent volume so the store survives server
+restarts. Set ``OHLCV_STORE_ENABLED=0`` to bypass it. Requires ``pyarrow``;
+without it the store is disabled and tools download as before.
+"""
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+import json
+import os
+import time
+
+import pandas as pd
+
+from src.tools.persist import atomic_write, cache_path
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PARQUET = True
+except Exception:
+    _HAS_PARQUET = False
+
+OHLCV_STORE_DIR = Path(os.getenv(
+    "OHLCV_STORE_DIR", str(cache_path("ohlcv"))
+))
+OHLCV_STORE_ENABLED = os.getenv("OHLCV_STORE_ENABLED", "1") not in ("0", "false", "False")
+
+# Relative difference in the last closed bar's close that signals Yahoo has
+# re-adjusted history (split or dividend) since the partition was written.
+_ADJUSTMENT_TOLERANCE = 1e-4
+# Period starts often fall on weekends/holidays; allow this much slack when
+# deciding whether a partition covers a requested period.
+_COVERAGE_SLACK = pd.Timedelta(days=7)
+
+# Lookback of each yfinance ``period`` string ("max" has no fixed lookback).
+PERIOD_OFFSETS = {
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# download(start) -> frame; start=None means "the full requested period"
+Download = Callable[[Optional[pd.Timestamp]], pd.DataFrame]
+# download_many(tickers, start) -> {ticker: frame}
+DownloadMany = Callable[[List[str], Optional[pd.Timestamp]], Dict[str, pd.DataFrame]]
+
+
+def _period_start(period: str, tz=None) -> Optional[pd.Timestamp]:
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        return None
+    return pd.Timestamp.now(tz=tz) - offset
+
+
+class OHLCVStore:
+    """Parquet-backed append-only bar store, one partition per ticker/interval."""
+
+    def __init__(self, root: Path = OHLCV_STORE_DIR, enabled: bool = OHLCV_STORE_ENABLED):
+        self.root = Path(root)
+        self.enabled = enabled and _HAS_PARQUET
+        self.full_downloads = 0
+        self.incremental_downloads = 0
+        self.bars_downloaded = 0
+
+    def _paths(self, ticker: str, interval: str):
+        base = self.root / interval / ticker.upper()
+        return base.with_suffix(".parquet"), base.with_suffix(".json")
+
+    def read(self, ticker: str, interval: str) -> Optional[pd.DataFrame]:
+        data_path, _ = self._paths(ticker, interval)
+        if not data_path.exists():
+            return None
+        try:
+            return pd.read_parquet(data_path)
+        except Exception:
+            return None
+
+    def _covers_from(self, ticker: str, interval: str) -> Optional[pd.Timestamp]:
+        _, meta_path = self._paths(ticker, interval)
+        try:
+            meta = json.loads(meta_path.read_text())
+            return pd.Timestamp(meta["covers_from"]) if meta.get("covers_from") else None
+        except Exception:
+            return None
+
+    def write(self, ticker: str, interval: str, frame: pd.DataFrame,
+              covers_from: Optional[pd.Timestamp]) -> None:
+        """Atomically replace the partition for ``ticker``/``interval``."""
+        data_path, meta_path = self._paths(ticker, interval)
+        atomic_write(data_path, frame.to_parquet)
+        meta = {
+            "covers_from": covers_from.isoformat() if covers_from is not None else None,
+            "refreshed_at": time.time(),
+            "bars": len(frame),
+        }
+        atomic_write(meta_path, json.dumps(meta))
+
+    def tail_start(self, ticker: str, interval: str, period: str,
+                   stored: Optional[pd.DataFrame]) -> Optional[pd.Timestamp]:
+        """Return the date to resume downloading from, or None if a full download is needed."""
+        if stored is None or stored.empty:
+            return None
+        tz = getattr(stored.index, "tz", None)
+        wanted = _period_start(period, tz)
+        covers_from = self._covers_from(ticker, interval)
+        if wanted is None or covers_from is None:
+            # "max" (or an unknown period) can never be proven complete
+            return None
+        if covers_from.tzinfo is None and tz is not None:
+            covers_from = covers_from.tz_localize(tz)
+        elif covers_from.tzinfo is not None and tz is None:
+            covers_from = covers_from.tz_localize(None)
+        if covers_from > wanted + _COVERAGE_SLACK:
+            # A shorter stored window cannot serve a longer period
+            return None
+        return _closed_bar(stored)
+
+    def _merge(self, stored: pd.DataFrame, tail: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Append ``tail`` to ``stored``; None if the last closed bar was re-adjusted.
+
+        Bars after the last closed one (a session still trading when it was
+        stored) are replaced by their re-downloaded values.
+        """
+        if tail is None or tail.empty:
+            return stored
+        anchor = _closed_bar(stored)
+        if anchor in tail.index:
+            old_close = float(stored.loc[anchor, "Close"])
+            new_close = float(tail.loc[anchor, "Close"])
+            if old_close and abs(new_close - old_close) / abs(old_close) > _ADJUSTMENT_TOLERANCE:
+                return None
+        merged = pd.concat([stored, tail[stored.columns.intersection(tail.columns)]])
+        return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+    def _store_full(self, ticker: str, interval: str, period: str, frame: pd.DataFrame,
+                    stored: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Write a full-period download; returns the frame to slice ``period`` from.
+
+        A download starting after ``stored`` is merged into it so a short
+        period never truncates the partition other periods share.
+        """
+        self.full_downloads += 1
+        if frame is None or frame.empty:
+            return pd.DataFrame() if frame is None else frame
+        self.bars_downloaded += len(frame)
+        covers_from = _period_start(period, getattr(frame.index, "tz", None))
+        if stored is not None and not stored.empty and frame.index[0] > stored.index[0]:
+            merged = self._merge(stored, frame)
+            if merged is not None:
+                stored_from = self._covers_from(ticker, interval)
+                if stored_from is not None and (covers_from is None or stored_from < covers_from):
+                    covers_from = stored_from
+                self.write(ticker, interval, merged, covers_from)
+                return merged
+        self.write(ticker, interval, frame, covers_from)
+        return frame
+
+    def _store_tail(self, ticker: str, interval: str, stored: pd.DataFrame,
+                    tail: pd.DataFrame) -> Optional[pd.DataFrame]:
+        self.incremental_downloads += 1
+        merged = self._merge(stored, tail)
+        if merged is None:
+            return None
+        if tail is not None and not tail.empty:
+            self.bars_downloaded += len(tail)
+            self.write(ticker, interval, merged, self._covers_from(ticker, interval))
+        return merged
+
+    def refresh(self, ticker: str, interval: str, period: str, download: Download) -> pd.DataFrame:
+        """Blocking: bring one partition up to date and return bars for ``period``."""
+        stored = self.read(ticker, interval)
+        start = self.tail_start(ticker, interval, period, stored)
+        if start is not None:
+            try:
+                merged = self._store_tail(ticker, interval, stored, download(start))
+            except Exception:
+                # Upstream unavailable: serve what we already have
+                merged = stored
+            if merged is not None:
+                return slice_period(merged, period)
+        return slice_period(self._store_full(ticker, interval, period, download(None), stored), period)
+
+    def refresh_many(self, tickers: Iterable[str], interval: str, period: str,
+                     download_many: DownloadMany) -> Dict[str, pd.DataFrame]:
+        """Blocking: refresh many partitions with at most three bulk requests.
+
+        Cold tickers share one full-period download; warm ones share one tail
+        download starting at the oldest last closed bar; any partition whose
+        history was re-adjusted is rebuilt in a final full download.
+        """
+        result: Dict[str, pd.DataFrame] = {}
+        stored_frames: Dict[str, pd.DataFrame] = {}
+        warm: Dict[str, pd.Timestamp] = {}
+        cold: List[str] = []
+        for t in tickers:
+            stored = self.read(t, interval)
+            stored_frames[t] = stored
+            start = self.tail_start(t, interval, period, stored)
+            if start is None:
+                cold.append(t)
+            else:
+                warm[t] = start
+
+        if warm:
+            start = min(warm.values())
+            try:
+                tails = download_many(list(warm), start)
+            except Exception:
+                tails = None
+            for t in warm:
+                if tails is None:
+                    result[t] = stored_frames[t]
+                    continue
+                merged = self._store_tail(t, interval, stored_frames[t], tails.get(t))
+                if merged is None:
+                    cold.append(t)
+                else:
+                    result[t] = merged
+
+        if cold:
+            fulls = download_many(cold, None)
+            for t in cold:
+                result[t] = self._store_full(t, interval, period, fulls.get(t), stored_frames[t])
+
+        return {t: slice_period(result[t], period) for t in tickers}
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "enabled": self.enabled,
+            "root": str(self.root),
+            "full_downloads": self.full_downloads,
+            "incremental_downloads": self.incremental_downloads,
+            "bars_downloaded": self.bars_downloaded,
+        }
+
+
+def _closed_bar(stored: pd.DataFrame) -> pd.Timestamp:
+    # The newest bar may still be moving; the one before it is settled
+    return stored.index[-2] if len(stored) > 1 else stored.index[-1]
+
+
+def slice_period(frame: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Trim ``frame`` to the lookback of a yfinance ``period`` string."""
+    if frame is None or frame.empty:
+        return frame if frame is not None else pd.DataFrame()
+    start = _period_start(period, getattr(frame.index, "tz", None))
+    if start is None:
+        return frame
+    return frame[frame.index >= start]
+
+
+ohlcv_store = OHLCVStore()
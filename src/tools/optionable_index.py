@@ -0,0 +1,192 @@
+"""Persistent index of optionable ticker symbols.
+
+``check_optionable`` used to download a full option chain to answer a yes/no
+question. The index answers a batch of tickers with set lookups:
+
+- A symbol directory (one symbol per line, or a CSV whose first column is the
+  symbol, e.g. an OCC/Cboe listing export) is authoritative when configured.
+  ``OPTIONABLE_SYMBOLS_URL`` is downloaded on a schedule, every
+  ``OPTIONABLE_SYMBOLS_TTL`` seconds (default 1 day), by the thread the server
+  starts (:meth:`OptionableIndex.refresh_schedule`). Alternatively
+  ``OPTIONABLE_SYMBOLS_FILE`` names a file maintained outside the server. The
+  directory is reloaded whenever the file changes.
+- Without a directory the index is only a day-scoped memo of live expiration
+  lookups: two sets, optionable and not optionable, kept in memory and at
+  ``OPTIONABLE_INDEX_PATH``, dropped on the first lookup of a new day. Unknown
+  symbols are checked live.
+
+Lookups may stat and read the directory file, and recording writes JSON, so
+callers on the event loop run them through ``run_upstream``.
+"""
+from datetime import date
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Optional
+import json
+import os
+import threading
+import time
+
+import httpx
+
+from src.tools.persist import atomic_write, cache_path, save_json
+
+OPTIONABLE_INDEX_PATH = Path(os.getenv(
+    "OPTIONABLE_INDEX_PATH", str(cache_path("optionable_index.json"))
+))
+OPTIONABLE_SYMBOLS_FILE = os.getenv("OPTIONABLE_SYMBOLS_FILE")
+OPTIONABLE_SYMBOLS_URL = os.getenv("OPTIONABLE_SYMBOLS_URL")
+OPTIONABLE_SYMBOLS_TTL = float(os.getenv("OPTIONABLE_SYMBOLS_TTL", "86400"))
+
+
+def _read_symbol_file(path: Path) -> FrozenSet[str]:
+    symbols = set()
+    for line in path.read_text().splitlines():
+        field = line.split(",")[0].strip().strip('"').upper()
+        if field and not field.startswith("#") and field not in ("SYMBOL", "TICKER"):
+            symbols.add(field)
+    return frozenset(symbols)
+
+
+def _download_symbols(url: str) -> bytes:
+    response = httpx.get(url, timeout=60, follow_redirects=True)
+    response.raise_for_status()
+    return response.content
+
+
+class OptionableIndex:
+    """Symbol-directory lookups, falling back to day-scoped learned sets persisted to disk."""
+
+    def __init__(self, path: Path = OPTIONABLE_INDEX_PATH, symbols_file: Optional[str] = OPTIONABLE_SYMBOLS_FILE,
+                 symbols_url: Optional[str] = OPTIONABLE_SYMBOLS_URL, ttl: float = OPTIONABLE_SYMBOLS_TTL):
+        self.path = Path(path)
+        self.symbols_url = symbols_url
+        self.ttl = ttl
+        if symbols_file:
+            self.symbols_file = Path(symbols_file)
+        elif symbols_url:
+            self.symbols_file = self.path.with_name("optionable_symbols.csv")
+        else:
+            self.symbols_file = None
+        self.downloads = 0
+        self._lock = threading.Lock()
+        self._day: Optional[str] = None
+        self._optionable: set = set()
+        self._not_optionable: set = set()
+        self._directory: Optional[FrozenSet[str]] = None
+        self._directory_mtime: Optional[float] = None
+        self._loaded = False
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = json.loads(self.path.read_text())
+            self._day = data.get("day")
+            self._optionable = set(data.get("optionable", []))
+            self._not_optionable = set(data.get("not_optionable", []))
+        except Exception:
+            pass
+
+    def _roll_day(self) -> None:
+        today = date.today().isoformat()
+        if self._day != today:
+            self._day = today
+            self._optionable.clear()
+            self._not_optionable.clear()
+
+    def _refresh_directory(self) -> None:
+        if self.symbols_file is None:
+            return
+        try:
+            mtime = self.symbols_file.stat().st_mtime
+        except OSError:
+            self._directory = None
+            return
+        if mtime != self._directory_mtime:
+            self._directory = _read_symbol_file(self.symbols_file)
+            self._directory_mtime = mtime
+
+    def refresh_symbols(self) -> bool:
+        """Blocking: download the symbol directory if it is older than the TTL; True if downloaded."""
+        if not self.symbols_url or self.symbols_file is None:
+            return False
+        try:
+            if time.time() - self.symbols_file.stat().st_mtime < self.ttl:
+                return False
+        except OSError:
+            pass
+        try:
+            data = _download_symbols(self.symbols_url)
+            if not data.strip():
+                return False
+            atomic_write(self.symbols_file, data)
+        except Exception:
+            # Keep serving the previous directory (or the learned sets)
+            return False
+        with self._lock:
+            self.downloads += 1
+        return True
+
+    def refresh_schedule(self, stop: Optional[threading.Event] = None) -> None:
+        """Blocking: keep the symbol directory fresh until ``stop`` is set (run it in a daemon thread)."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.refresh_symbols()
+            stop.wait(max(60.0, self.ttl))
+
+    def lookup(self, ticker: str) -> Optional[bool]:
+        """True/False if known for today, None if a live check is needed."""
+        t = ticker.strip().upper()
+        with self._lock:
+            self._refresh_directory()
+            if self._directory is not None:
+                return t in self._directory
+            self._load()
+            self._roll_day()
+            if t in self._optionable:
+                return True
+            if t in self._not_optionable:
+                return False
+            return None
+
+    def record(self, ticker: str, optionable: bool) -> None:
+        t = ticker.strip().upper()
+        with self._lock:
+            self._load()
+            self._roll_day()
+            (self._optionable if optionable else self._not_optionable).add(t)
+            (self._not_optionable if optionable else self._optionable).discard(t)
+
+    def record_many(self, results: Dict[str, bool]) -> None:
+        for t, optionable in results.items():
+            self.record(t, optionable)
+        self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "day": self._day,
+                "optionable": sorted(self._optionable),
+                "not_optionable": sorted(self._not_optionable),
+            }
+        save_json(self.path, data)
+
+    def lookup_many(self, tickers: Iterable[str]) -> Dict[str, Optional[bool]]:
+        return {t: self.lookup(t) for t in tickers}
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._refresh_directory()
+            self._load()
+            self._roll_day()
+            return {
+                "day": self._day,
+                "directory_symbols": len(self._directory) if self._directory is not None else None,
+                "directory_downloads": self.downloads,
+                "optionable": len(self._optionable),
+                "not_optionable": len(self._not_optionable),
+            }
+
+
+optionable_index = OptionableIndex()
@@ -0,0 +1,54 @@
+"""Shared on-disk location and atomic writes for the server's persistent caches.
+
+Every cache lives under ``CACHE_DIR`` (``DEBTREVERSIONAI_CACHE_DIR``, default
+``~/.cache/debtreversionai``) unless its own path variable overrides it.
+Files are replaced atomically: the data is written to a temporary file next to
+the target and moved into place with ``os.replace``, so a reader (or a crash)
+never sees a partial file.
+"""
+from pathlib import Path
+from typing import Callable, Union
+import json
+import os
+import threading
+
+CACHE_DIR = Path(os.getenv("DEBTREVERSIONAI_CACHE_DIR", str(Path.home() / ".cache" / "debtreversionai")))
+
+
+def cache_path(name: str) -> Path:
+    """Default location of the cache file or directory ``name``."""
+    return CACHE_DIR / name
+
+
+def atomic_write(path: Path, data: Union[str, bytes, Callable[[Path], None]]) -> None:
+    """Atomically replace ``path`` with ``data`` (text, bytes, or a writer called with the temp path).
+
+    Parent directories are created. Raises on failure and leaves no temp file behind.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if callable(data):
+            data(tmp)
+        elif isinstance(data, bytes):
+            tmp.write_bytes(data)
+        else:
+            tmp.write_text(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def save_json(path: Path, data) -> bool:
+    """Best-effort :func:`atomic_write` of ``data`` as JSON; returns False instead of raising.
+
+    The persisted caches only save work across restarts: the in-memory copy
+    stays valid when the disk is full or read-only.
+    """
+    try:
+        atomic_write(path, json.dumps(data))
+        return True
+    except Exception:
+        return False
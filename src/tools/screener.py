@@ -0,0 +1,166 @@
+"""Universe-wide screens over the shared price history.
+
+``scan_52week_lows`` loads one year of daily bars for every ticker in a
+universe (bulk downloads through the history cache and OHLCV store), packs
+closes and lows into (tickers x bars) NumPy matrices and computes the distance
+to the 52-week low for all tickers at once. Loading stops at the latency
+budget; tickers that did not load in time are reported rather than waited for.
+
+A universe is a list of tickers, a comma/space separated string, or the name
+of a text file (one symbol per line, ``#`` comments allowed) in
+``UNIVERSE_DIR`` (default: ``data/universes`` in the repository, which ships
+``dow30.txt``), e.g. ``scan_52week_lows("dow30")`` reads
+``<UNIVERSE_DIR>/dow30.txt``. Only bare names inside ``UNIVERSE_DIR`` are
+read; paths are rejected, and so is a single name that has no file and does not
+look like a ticker symbol (``"sp500"`` is an error, not the ticker SP500).
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+import asyncio
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.tools.history_cache import get_history_batch, normalize_tickers
+from src.tools.indicators import align_frames, last_valid
+
+UNIVERSE_DIR = Path(os.getenv("UNIVERSE_DIR", str(Path(__file__).resolve().parents[2] / "data" / "universes")))
+SCREENER_BATCH_SIZE = int(os.getenv("SCREENER_BATCH_SIZE", "200"))
+SCREENER_TIME_BUDGET = float(os.getenv("SCREENER_TIME_BUDGET", "20"))
+
+_UNIVERSE_NAME_RE = re.compile(r"[A-Za-z0-9_-]+")
+# One to five letters with an optional share-class suffix (BRK.B, BF-B)
+_TICKER_RE = re.compile(r"[A-Za-z]{1,5}(?:[.-][A-Za-z]{1,2})?")
+
+
+def _universe_file(name: str) -> Path | None:
+    """Return ``<UNIVERSE_DIR>/<name>.txt`` if ``name`` is a bare universe name with a file."""
+    if not _UNIVERSE_NAME_RE.fullmatch(name):
+        return None
+    root = UNIVERSE_DIR.resolve()
+    candidate = (root / f"{name}.txt").resolve()
+    if candidate.parent != root or not candidate.is_file():
+        return None
+    return candidate
+
+
+def resolve_universe(universe: Iterable[str] | str) -> List[str]:
+    """Expand a universe name or ticker list into symbols.
+
+    Raises ValueError for a string that looks like a file path (only files in
+    ``UNIVERSE_DIR`` can be named) and for a single name that is neither a
+    universe file nor a ticker symbol.
+    """
+    if isinstance(universe, str):
+        name = universe.strip()
+        path = _universe_file(name)
+        if path is not None:
+            lines = path.read_text().splitlines()
+            return normalize_tickers(line.split("#")[0] for line in lines)
+        if "/" in name or "\\" in name or ".." in name:
+            raise ValueError(f"Universe {universe!r} must be a universe name in UNIVERSE_DIR or a ticker list, "
+                             "not a path")
+        if name and not re.search(r"[\s,]", name) and not _TICKER_RE.fullmatch(name):
+            raise ValueError(f"Unknown universe {universe!r}: no {name}.txt in {UNIVERSE_DIR} "
+                             "and not a ticker symbol")
+    return normalize_tickers(universe)
+
+
+def build_matrices(frames: Dict[str, pd.DataFrame]) -> Tuple[List[str], np.ndarray, np.ndarray, pd.DatetimeIndex]:
+    """Align per-ticker bars on a common date axis.
+
+    Returns (tickers, close, low, dates) where ``close`` and ``low`` are
+    float matrices of shape (len(tickers), len(dates)) with NaN for bars a
+    ticker does not have.
+    """
+    tickers, matrices, dates = align_frames(frames, ("Close", "Low"))
+    return tickers, matrices["Close"], matrices["Low"], dates
+
+
+def rank_52week_lows(close: np.ndarray, low: np.ndarray, tolerance: float) -> Dict[str, np.ndarray]:
+    """Vectorised distance-to-low for every row of the (tickers x bars) matrices.
+
+    Returns arrays (one entry per row): ``last`` close, ``low`` (52-week low),
+    ``low_idx`` (bar index of the low), ``distance`` ((last - low) / low),
+    ``near`` (distance <= tolerance) and ``order`` (row indices of the hits,
+    closest to the low first). Rows with no data have NaN distance.
+    """
+    n, width = close.shape
+    last = last_valid(close)
+    has_close = ~np.isnan(last)
+
+    has_low = ~np.isnan(low).all(axis=1) if width else np.zeros(n, dtype=bool)
+    filled_low = np.where(np.isnan(low), np.inf, low)
+    low_idx = np.argmin(filled_low, axis=1) if width else np.zeros(n, dtype=int)
+    low_min = np.where(has_low, filled_low[np.arange(n), low_idx], np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distance = (last - low_min) / low_min
+    ok = has_close & has_low & np.isfinite(distance) & (low_min > 0)
+    distance = np.where(ok, distance, np.nan)
+    near = ok & (distance <= tolerance)
+    hits = np.flatnonzero(near)
+    order = hits[np.argsort(distance[hits], kind="stable")]
+    return {"last": last, "low": low_min, "low_idx": low_idx, "distance": distance, "near": near, "order": order}
+
+
+async def _load_universe(symbols: List[str], budget: float) -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+    """Bulk-load one year of bars in chunks until the time budget runs out."""
+    deadline = time.monotonic() + budget
+    frames: Dict[str, pd.DataFrame] = {}
+    skipped: List[str] = []
+    chunks = [symbols[i:i + SCREENER_BATCH_SIZE] for i in range(0, len(symbols), max(1, SCREENER_BATCH_SIZE))]
+    for chunk in chunks:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            skipped.extend(chunk)
+            continue
+        try:
+            frames.update(await asyncio.wait_for(get_history_batch(chunk, period="1y"), timeout=remaining))
+        except asyncio.TimeoutError:
+            skipped.extend(chunk)
+    return frames, skipped
+
+
+async def scan_52week_lows(universe, tolerance: float = 0.05, limit: int = 50,
+                           time_budget: float = SCREENER_TIME_BUDGET) -> str:
+    """Rank every ticker in ``universe`` by distance to its 52-week low."""
+    try:
+        symbols = await asyncio.to_thread(resolve_universe, universe)
+    except ValueError as e:
+        return f"Error resolving universe: {e}"
+    if not symbols:
+        return "No tickers in universe."
+
+    started = time.monotonic()
+    frames, skipped = await _load_universe(symbols, time_budget)
+    tickers, close, low, dates = build_matrices(frames)
+    if not tickers:
+        return f"52-Week Low Scan: no price data for {len(symbols)} tickers."
+
+    ranked = rank_52week_lows(close, low, tolerance)
+    elapsed = time.monotonic() - started
+
+    lines = [
+        f"52-Week Low Scan ({len(ranked['order'])} hits within {tolerance * 100}% "
+        f"of {len(tickers)} tickers scanned, {elapsed:.1f}s):",
+        "| Rank | Ticker | Price | 52W Low | Low Date | Distance % |",
+        "|---|---|---|---|---|---|",
+    ]
+    for rank, row in enumerate(ranked["order"][:max(0, limit)], start=1):
+        lines.append(
+            f"| {rank} | {tickers[row]} | {ranked['last'][row]:.2f} | {ranked['low'][row]:.2f} "
+            f"| {dates[ranked['low_idx'][row]].strftime('%Y-%m-%d')} | {ranked['distance'][row] * 100:.2f} |"
+        )
+    if len(ranked["order"]) > limit:
+        lines.append(f"... {len(ranked['order']) - limit} more hits not shown (raise `limit`)")
+    seen = set(tickers) | set(skipped)
+    no_data = [t for t in symbols if t not in seen]
+    if no_data:
+        lines.append(f"No data: {len(no_data)} tickers")
+    if skipped:
+        lines.append(f"Skipped (time budget {time_budget:.0f}s exceeded): {len(skipped)} tickers")
+    return "\n".join(lines) + "\n"
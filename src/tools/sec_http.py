@@ -0,0 +1,222 @@
+"""Pooled, rate-limited HTTP client for the SEC's own endpoints.
+
+The SEC allows about 10 requests per second per client. ``SEC_RATE_LIMIT``
+(default 10) is this process's whole budget, split between two throttles:
+
+- edgartools downloads filing bodies and exhibits through its own throttle.
+  It gets ``EDGAR_RATE_LIMIT_PER_SEC`` requests per second (default: half of
+  ``SEC_RATE_LIMIT``). This module applies that share to edgartools, whether
+  edgartools is imported before or after it.
+- Every other request this server makes to sec.gov goes through
+  :data:`sec_http` and shares one token bucket at the rest of the budget.
+
+:data:`sec_http`:
+
+- Connections are pooled and kept alive in one ``httpx.Client``, used by the
+  blocking helpers on the SEC executor. The burst equals the rate.
+- A 429 or 503 is retried up to ``SEC_HTTP_RETRIES`` times (default 4). The
+  client honours ``Retry-After`` and otherwise backs off exponentially from
+  ``SEC_HTTP_BACKOFF`` seconds (default 0.5) with jitter.
+- ``validators`` turn a GET into a conditional GET (``If-None-Match`` /
+  ``If-Modified-Since``). The caller gets the 304 and keeps its own copy of the
+  body.
+"""
+from typing import Dict, Iterator, Optional, Tuple
+import os
+import random
+import sys
+import threading
+import time
+
+import httpx
+
+SEC_RATE_LIMIT = float(os.getenv("SEC_RATE_LIMIT", "10"))
+SEC_HTTP_MAX_CONNECTIONS = int(os.getenv("SEC_HTTP_MAX_CONNECTIONS", "10"))
+SEC_HTTP_RETRIES = int(os.getenv("SEC_HTTP_RETRIES", "4"))
+SEC_HTTP_BACKOFF = float(os.getenv("SEC_HTTP_BACKOFF", "0.5"))
+SEC_HTTP_TIMEOUT = float(os.getenv("SEC_HTTP_TIMEOUT", "60"))
+
+_RETRY_STATUSES = (429, 503)
+
+
+def split_rate_budget(total: float, edgartools: Optional[int] = None) -> Tuple[float, int]:
+    """Split ``total`` req/s into (sec_http rate, edgartools rate).
+
+    ``edgartools`` defaults to half the budget and is clamped so that both
+    sides keep at least 1 req/s; the two sum to ``total`` whenever it is 2 or
+    more. A total of 0 or less disables the sec_http bucket and leaves
+    edgartools at its own default.
+    """
+    if total <= 0:
+        return 0.0, edgartools or 9
+    if edgartools is None:
+        edgartools = int(total // 2)
+    edgartools = max(1, min(int(edgartools), int(total) - 1))
+    return max(total - edgartools, 1.0), edgartools
+
+
+SEC_HTTP_RATE_LIMIT, EDGAR_RATE_LIMIT_PER_SEC = split_rate_budget(
+    SEC_RATE_LIMIT,
+    int(os.environ["EDGAR_RATE_LIMIT_PER_SEC"]) if os.getenv("EDGAR_RATE_LIMIT_PER_SEC") else None,
+)
+
+
+def share_budget_with_edgartools(rate: int = EDGAR_RATE_LIMIT_PER_SEC) -> None:
+    """Throttle edgartools at ``rate`` req/s, its share of ``SEC_RATE_LIMIT``.
+
+    edgartools reads ``EDGAR_RATE_LIMIT_PER_SEC`` once, at import; if it is
+    already imported its client manager gets a new limiter instead.
+    """
+    os.environ["EDGAR_RATE_LIMIT_PER_SEC"] = str(rate)
+    httpclient = sys.modules.get("edgar.httpclient")
+    if httpclient is not None:
+        httpclient.HTTP_MGR.update_rate_limiter(rate)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers reserve a token and sleep until it is due."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self.waited = 0.0
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative queues the caller behind earlier reservations
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited += delay
+            return delay
+
+    def acquire_blocking(self) -> None:
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+def validators_of(response: httpx.Response) -> Dict[str, str]:
+    """Return the cache validators of ``response`` for a later conditional GET."""
+    out = {}
+    if response.headers.get("etag"):
+        out["etag"] = response.headers["etag"]
+    if response.headers.get("last-modified"):
+        out["last_modified"] = response.headers["last-modified"]
+    return out
+
+
+class SecHttpClient:
+    """SEC HTTP access with pooled connections, a shared rate limit and 429/503 retries."""
+
+    def __init__(self, rate: float = SEC_HTTP_RATE_LIMIT, max_connections: int = SEC_HTTP_MAX_CONNECTIONS,
+                 retries: int = SEC_HTTP_RETRIES, backoff: float = SEC_HTTP_BACKOFF,
+                 timeout: float = SEC_HTTP_TIMEOUT, transport=None):
+        self.bucket = TokenBucket(rate)
+        self.retries = retries
+        self.backoff = backoff
+        self._client_kwargs = {
+            "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            "timeout": timeout,
+            "follow_redirects": True,
+        }
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self.requests = 0
+        self.retried = 0
+        self.not_modified = 0
+
+    def _headers(self, headers: Optional[Dict[str, str]], validators: Optional[Dict[str, str]]) -> Dict[str, str]:
+        out = {"User-Agent": os.getenv("SEC_API_USER_AGENT", "DebtReversionAI")}
+        if validators:
+            if validators.get("etag"):
+                out["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                out["If-Modified-Since"] = validators["last_modified"]
+        out.update(headers or {})
+        return out
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        retry_after = response.headers.get("retry-after", "")
+        if retry_after.strip().isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _count(self, response: httpx.Response) -> None:
+        with self._lock:
+            self.requests += 1
+            if response.status_code == 304:
+                self.not_modified += 1
+
+    def _should_retry(self, response: httpx.Response, attempt: int) -> bool:
+        if response.status_code not in _RETRY_STATUSES or attempt >= self.retries:
+            return False
+        with self._lock:
+            self.retried += 1
+        return True
+
+    def _sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(transport=self._transport, **self._client_kwargs)
+            return self._client
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            validators: Optional[Dict[str, str]] = None, stream: bool = False) -> httpx.Response:
+        """Blocking GET; a 304 is returned as is when ``validators`` are given."""
+        client = self._sync_client()
+        request = client.build_request("GET", url, headers=self._headers(headers, validators))
+        attempt = 0
+        while True:
+            self.bucket.acquire_blocking()
+            response = client.send(request, stream=stream)
+            self._count(response)
+            if not self._should_retry(response, attempt):
+                return response
+            response.close()
+            time.sleep(self._retry_delay(response, attempt))
+            attempt += 1
+
+    def open_lines(self, url: str) -> Optional[Iterator[str]]:
+        """Blocking: stream the lines of a text file, or return None for 403/404."""
+        response = self.get(url, stream=True)
+        if response.status_code in (403, 404):
+            response.close()
+            return None
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+
+        def lines():
+            try:
+                yield from response.iter_lines()
+            finally:
+                response.close()
+
+        return lines()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retried,
+                "not_modified": self.not_modified,
+                "throttled_seconds": self.bucket.waited,
+                "rate_limit": self.bucket.rate,
+                "edgartools_rate_limit": EDGAR_RATE_LIMIT_PER_SEC,
+            }
+
+
+sec_http = SecHttpClient()
+share_budget_with_edgartools()
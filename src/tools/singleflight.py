@@ -0,0 +1,44 @@
+"""In-flight request coalescing ("single flight") for upstream fetches.
+
+When several MCP clients or parallel LLM tool calls ask for the same ticker at
+the same moment, only the first caller starts the upstream request; everyone
+else awaits the same task. The shared task is shielded from its callers, so a
+client that disconnects or is cancelled does not abort the fetch for the
+others. The key is removed as soon as the task finishes, so this only
+deduplicates concurrent work; caching completed results is left to the caches.
+"""
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one awaited task."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark failures as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return ``await fn()``, sharing the result with concurrent callers of ``key``."""
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._inflight), "leaders": self.leaders, "followers": self.followers}
@@ -0,0 +1,107 @@
+"""Counters of every cache, index and upstream client, for the ``get_cache_stats`` tool.
+
+Each subsystem keeps its own counters and exposes them through ``stats()``;
+this module only gathers and formats them, so the tool modules do not import
+each other for reporting.
+"""
+import asyncio
+
+from src.tools.filing_cache import filing_text_cache
+from src.tools.filing_index import filing_index
+from src.tools.history_cache import cache_stats, store_stats
+from src.tools.macd_state import macd_state_store
+from src.tools.markdown_tools import chunk_cursors
+from src.tools.optionable_index import optionable_index
+from src.tools.sec_http import sec_http
+from src.tools.text_index import text_index
+from src.tools.ticker_map import company_cache, ticker_map
+from src.tools.upstream import upstream_flights
+
+
+def format_cache_stats() -> str:
+    """Blocking: render every subsystem's counters (some read their on-disk state)."""
+    stats = cache_stats()
+    store = store_stats()
+    macd = macd_state_store.stats()
+    flights = upstream_flights.stats()
+    options = optionable_index.stats()
+    filings = filing_text_cache.stats()
+    index = filing_index.stats()
+    tickers = ticker_map.stats()
+    companies = company_cache.stats()
+    sec = sec_http.stats()
+    text = text_index.stats()
+    cursors = chunk_cursors.stats()
+    directory = options['directory_symbols']
+    return (
+        f"""Price History Cache:
+- Entries: {stats['entries']} / {stats['max_entries']}
+- TTL: {stats['ttl_seconds']:.0f}s
+- Hits: {stats['hits']}
+- Misses: {stats['misses']}
+- Evictions: {stats['evictions']}
+- Hit Rate: {stats['hit_rate'] * 100:.1f}%
+
+OHLCV Store ({"enabled" if store['enabled'] else "disabled"}, {store['root']}):
+- Full Downloads: {store['full_downloads']}
+- Incremental Downloads: {store['incremental_downloads']}
+- Bars Downloaded: {store['bars_downloaded']}
+
+MACD State:
+- Tracked Series: {macd['states']}
+- Cold Starts: {macd['cold_starts']}
+- Incremental Updates: {macd['incremental_updates']}
+- Split/Dividend Recomputes: {macd['adjustments']}
+
+Upstream Request Coalescing:
+- In Flight: {flights['in_flight']}
+- Fetches Started: {flights['leaders']}
+- Requests Coalesced: {flights['followers']}
+
+Optionable Index ({f"directory of {directory} symbols" if directory is not None else f"learned {options['day']}"}):
+- Optionable: {options['optionable']}
+- Not Optionable: {options['not_optionable']}
+
+Filing Text Cache ({"enabled" if filings['enabled'] else "disabled"}, {filings['root']}):
+- Entries: {filings['entries']}
+- Size: {filings['bytes'] / 1e6:.1f} / {filings['max_bytes'] / 1e6:.0f} MB
+- Hits: {filings['hits']}
+- Misses: {filings['misses']}
+- Evictions: {filings['evictions']}
+
+Filing Metadata Index:
+- Companies Loaded: {index['companies']}
+- Full Builds: {index['full_builds']}
+- Incremental Refreshes: {index['incremental_refreshes']}
+- New Filings Merged: {index['records_added']}
+- Unchanged (304) Refreshes: {index['not_modified']}
+
+Ticker Map:
+- Tickers: {tickers['tickers']}
+- Downloads: {tickers['downloads']}
+- Unknown Tickers Rejected: {tickers['unknown']}
+- Company Objects Cached: {companies['entries']} (hits {companies['hits']}, misses {companies['misses']})
+
+SEC HTTP Client:
+- Requests: {sec['requests']}
+- Retries (429/503): {sec['retries']}
+- Not Modified (304): {sec['not_modified']}
+- Rate-Limit Wait: {sec['throttled_seconds']:.1f}s
+- Rate Limit: {sec['rate_limit']:g} req/s (+{sec['edgartools_rate_limit']} req/s for edgartools downloads)
+
+Filing Text Index:
+- Filings Indexed: {text['filings']} ({text['docs']} texts)
+- Queries: {text['queries']}
+
+Markdown Chunk Cursors:
+- Open: {cursors['open']} / {cursors['max_entries']}
+- Pages Served: {cursors['pages']}
+- Expired: {cursors['expired']}
+- Evictions: {cursors['evictions']}
+"""
+    )
+
+
+async def get_cache_stats() -> str:
+    """Report counters for the price-history cache, bar store, filing caches and indexes, and SEC client."""
+    return await asyncio.to_thread(format_cache_stats)
@@ -0,0 +1,275 @@
+"""Inverted index over cached filing text for keyword and phrase queries.
+
+A conversion question ("which filings mention 'convertible note' and
+'conversion price' in the last 30 days?") used to mean decompressing or
+downloading every candidate body and scanning it again. When a filing's text
+(or its exhibits text) enters the filing-text cache it is also tokenised into
+this index:
+
+- ``docs``: one row per indexed text (accession, part ``body``/``exhibits``)
+  with the filing's CIK, company, form and date.
+- ``postings``: per (term, doc) the token positions and character offsets of
+  every occurrence, packed as 32-bit arrays.
+
+Terms are lowercase alphanumeric runs; a phrase matches where its terms occur
+at consecutive token positions. A query reads only the postings of its terms
+for documents in the date window, so it touches neither EDGAR nor the filing
+bodies. The index is a SQLite database at ``TEXT_INDEX_PATH``; it only holds
+text that is in the filing-text cache, and drops a filing's postings when the
+cache evicts it.
+"""
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import os
+import re
+import sqlite3
+import threading
+
+from src.tools.persist import cache_path
+
+TEXT_INDEX_PATH = Path(os.getenv(
+    "TEXT_INDEX_PATH", str(cache_path("text_index.sqlite3"))
+))
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+_MAX_TERM_LENGTH = 40
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    accession TEXT NOT NULL,
+    part TEXT NOT NULL,
+    cik INTEGER,
+    company TEXT,
+    form TEXT,
+    filing_date TEXT,
+    UNIQUE (accession, part)
+);
+CREATE INDEX IF NOT EXISTS docs_by_date ON docs (filing_date);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    offsets BLOB NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+"""
+
+
+class IndexHit(NamedTuple):
+    accession_no: str
+    filing_date: str
+    cik: Optional[int]
+    company: str
+    form: str
+    matches: Dict[str, List[Tuple[str, int]]]  # phrase -> [(part, character offset)]
+
+
+def tokenize(text: str) -> List[str]:
+    """Return the lowercase index terms of ``text``."""
+    return [m.group(0).lower() for m in _TOKEN_RE.finditer(text or "")]
+
+
+def _postings(text: str) -> Dict[str, Tuple[array, array]]:
+    out: Dict[str, Tuple[array, array]] = {}
+    for position, m in enumerate(_TOKEN_RE.finditer(text)):
+        term = m.group(0).lower()
+        if len(term) > _MAX_TERM_LENGTH:
+            continue
+        entry = out.get(term)
+        if entry is None:
+            entry = out[term] = (array("I"), array("I"))
+        entry[0].append(position)
+        entry[1].append(m.start())
+    return out
+
+
+def _unpack(blob: bytes) -> array:
+    values = array("I")
+    values.frombytes(blob)
+    return values
+
+
+class TextIndex:
+    """SQLite-backed term -> (accession, offsets) index of filing text."""
+
+    def __init__(self, path: Path = TEXT_INDEX_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._failed = False
+        self.queries = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and not self._failed:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._conn = conn
+            except (OSError, sqlite3.Error):
+                # Without a database, searches still scan filing text
+                self._failed = True
+        return self._conn
+
+    def contains(self, accession: str, part: str = "body") -> bool:
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return False
+            row = db.execute("SELECT 1 FROM docs WHERE accession = ? AND part = ?", (accession, part)).fetchone()
+            return row is not None
+
+    def add(self, accession: str, text: str, part: str = "body", cik: Optional[int] = None,
+            company: Optional[str] = None, form: Optional[str] = None, filing_date=None) -> None:
+        """Index (or re-index) ``text`` as ``part`` of filing ``accession``."""
+        if not accession or not text:
+            return
+        postings = _postings(text)
+        if isinstance(filing_date, date):
+            filing_date = filing_date.isoformat()
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return
+            try:
+                with db:
+                    row = db.execute(
+                        "SELECT id FROM docs WHERE accession = ? AND part = ?", (accession, part)
+                    ).fetchone()
+                    if row is None:
+                        doc_id = db.execute(
+                            "INSERT INTO docs (accession, part, cik, company, form, filing_date) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (accession, part, cik, company, form, filing_date),
+                        ).lastrowid
+                    else:
+                        doc_id = row[0]
+                        db.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                        db.execute(
+                            "UPDATE docs SET cik = ?, company = ?, form = ?, filing_date = ? WHERE id = ?",
+                            (cik, company, form, filing_date, doc_id),
+                        )
+                    db.executemany(
+                        "INSERT INTO postings (term, doc_id, positions, offsets) VALUES (?, ?, ?, ?)",
+                        ((term, doc_id, pos.tobytes(), offs.tobytes()) for term, (pos, offs) in postings.items()),
+                    )
+            except sqlite3.Error:
+                pass
+
+    def remove(self, accession: str, part: Optional[str] = None) -> None:
+        """Drop ``part`` of filing ``accession`` (every part by default) and its postings."""
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return
+            where, params = "accession = ?", (accession,)
+            if part is not None:
+                where, params = "accession = ? AND part = ?", (accession, part)
+            try:
+                with db:
+                    db.execute(f"DELETE FROM postings WHERE doc_id IN (SELECT id FROM docs WHERE {where})", params)
+                    db.execute(f"DELETE FROM docs WHERE {where}", params)
+            except sqlite3.Error:
+                pass
+
+    def _term_postings(self, db, term: str, window_sql: str, params: Sequence) -> Dict[int, Tuple[array, array]]:
+        rows = db.execute(
+            f"SELECT doc_id, positions, offsets FROM postings WHERE term = ? AND doc_id IN ({window_sql})",
+            (term, *params),
+        )
+        return {doc_id: (_unpack(pos), _unpack(offs)) for doc_id, pos, offs in rows}
+
+    def query(self, phrases: Iterable[str], start: Optional[date] = None, end: Optional[date] = None,
+              ciks: Optional[Iterable[int]] = None, limit: Optional[int] = None) -> List[IndexHit]:
+        """Filings whose text contains every phrase, newest first.
+
+        ``start``/``end`` bound the filing date and ``ciks`` restricts the
+        companies; each hit lists the offsets of every phrase occurrence.
+        """
+        phrases = [p for p in dict.fromkeys(p.strip() for p in phrases) if tokenize(p)]
+        if not phrases:
+            raise ValueError("query needs at least one phrase with letters or digits")
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("filing_date >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("filing_date <= ?")
+            params.append(end.isoformat())
+        if ciks is not None:
+            ciks = sorted(set(ciks))
+            if not ciks:
+                return []
+            clauses.append(f"cik IN ({','.join('?' * len(ciks))})")
+            params.extend(ciks)
+        window_sql = "SELECT id FROM docs" + (" WHERE " + " AND ".join(clauses) if clauses else "")
+
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return []
+            self.queries += 1
+            terms: Dict[str, Dict[int, Tuple[array, array]]] = {}
+            per_phrase: Dict[str, Dict[int, List[int]]] = {}
+            for phrase in phrases:
+                tokens = tokenize(phrase)
+                for token in tokens:
+                    if token not in terms:
+                        terms[token] = self._term_postings(db, token, window_sql, params)
+                docs = set(terms[tokens[0]])
+                for token in tokens[1:]:
+                    docs &= terms[token].keys()
+                found: Dict[int, List[int]] = {}
+                for doc_id in docs:
+                    first_positions, first_offsets = terms[tokens[0]][doc_id]
+                    starts = set(first_positions)
+                    for k, token in enumerate(tokens[1:], start=1):
+                        starts &= {p - k for p in terms[token][doc_id][0]}
+                        if not starts:
+                            break
+                    if starts:
+                        found[doc_id] = [o for p, o in zip(first_positions, first_offsets) if p in starts]
+                per_phrase[phrase] = found
+
+            doc_ids = set().union(*(found.keys() for found in per_phrase.values()))
+            meta = {}
+            if doc_ids:
+                ids = sorted(doc_ids)
+                rows = db.execute(
+                    "SELECT id, accession, part, cik, company, form, filing_date FROM docs "
+                    f"WHERE id IN ({','.join('?' * len(ids))})", ids,
+                )
+                meta = {row[0]: row[1:] for row in rows}
+
+        # A filing matches a phrase if its body or its exhibits do
+        filings: Dict[str, dict] = {}
+        for phrase, found in per_phrase.items():
+            for doc_id, offsets in found.items():
+                accession, part, cik, company, form, filing_date = meta[doc_id]
+                entry = filings.setdefault(accession, {
+                    "meta": (filing_date or "", cik, company or "", form or ""), "matches": {},
+                })
+                entry["matches"].setdefault(phrase, []).extend((part, o) for o in offsets)
+
+        hits = [
+            IndexHit(accession, *entry["meta"], {p: sorted(entry["matches"][p]) for p in phrases})
+            for accession, entry in filings.items()
+            if all(p in entry["matches"] for p in phrases)
+        ]
+        hits.sort(key=lambda h: (h.filing_date, h.accession_no), reverse=True)
+        return hits[:limit] if limit else hits
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return {"docs": 0, "filings": 0, "queries": self.queries}
+            docs, filings = db.execute("SELECT COUNT(*), COUNT(DISTINCT accession) FROM docs").fetchone()
+            return {"docs": docs, "filings": filings, "queries": self.queries}
+
+
+text_index = TextIndex()
@@ -0,0 +1,200 @@
+"""Local ticker -> CIK table and TTL-memoised EDGAR company objects.
+
+Resolving a ticker used to mean ``Company(ticker)``: a lookup request plus a
+download of the company's submissions on every tool call. The ticker map
+holds the SEC ``company_tickers.json`` table (about 10k rows) in memory:
+
+- If ``SEC_COMPANY_TICKERS_FILE`` points at a local copy of the file it is
+  authoritative and reloaded whenever it changes.
+- Otherwise the file is downloaded from ``SEC_COMPANY_TICKERS_URL``, stored
+  at ``TICKER_MAP_PATH`` and refreshed once it is older than
+  ``TICKER_MAP_TTL`` seconds (default 1 day). A failed refresh keeps serving
+  the previous table.
+
+Tickers missing from a loaded table raise :class:`UnknownTickerError` without
+any network call. Only when no table can be loaded at all do lookups fall
+back to ``Company(ticker)``.
+
+``company_cache`` memoises ``Company`` objects per ticker/CIK for
+``COMPANY_CACHE_TTL`` seconds (default 1h), so repeated tool calls reuse the
+loaded submissions metadata.
+"""
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+from edgar import Company
+
+from src.tools.persist import cache_path, save_json
+from src.tools.sec_http import sec_http
+
+SEC_COMPANY_TICKERS_URL = os.getenv("SEC_COMPANY_TICKERS_URL", "https://www.sec.gov/files/company_tickers.json")
+SEC_COMPANY_TICKERS_FILE = os.getenv("SEC_COMPANY_TICKERS_FILE")
+TICKER_MAP_PATH = Path(os.getenv(
+    "TICKER_MAP_PATH", str(cache_path("company_tickers.json"))
+))
+TICKER_MAP_TTL = float(os.getenv("TICKER_MAP_TTL", "86400"))
+COMPANY_CACHE_TTL = float(os.getenv("COMPANY_CACHE_TTL", "3600"))
+
+
+class UnknownTickerError(ValueError):
+    """Raised for a ticker that is not in the SEC ticker table."""
+
+
+def _normalise(ticker: str) -> str:
+    # The SEC lists share classes with a dash (BRK-B); Yahoo style uses a dot
+    return ticker.strip().upper().replace(".", "-")
+
+
+def _parse_tickers(data) -> Dict[str, Tuple[int, str]]:
+    """Map ticker -> (cik, title) from company_tickers.json (dict of rows or a list)."""
+    rows = data.values() if isinstance(data, dict) else data
+    table: Dict[str, Tuple[int, str]] = {}
+    for row in rows:
+        try:
+            ticker = _normalise(row["ticker"])
+            table.setdefault(ticker, (int(row["cik_str"]), row.get("title", "")))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return table
+
+
+def _download_tickers(url: str) -> dict:
+    response = sec_http.get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+class TickerMap:
+    """In-memory ticker -> CIK table from a local file or the SEC download, refreshed periodically."""
+
+    def __init__(self, path: Path = TICKER_MAP_PATH, source_file: Optional[str] = SEC_COMPANY_TICKERS_FILE,
+                 url: str = SEC_COMPANY_TICKERS_URL, ttl: float = TICKER_MAP_TTL):
+        self.path = Path(path)
+        self.source_file = Path(source_file) if source_file else None
+        self.url = url
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._table: Optional[Dict[str, Tuple[int, str]]] = None
+        self._source_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self.downloads = 0
+        self.unknown = 0
+
+    def _read(self, path: Path) -> Dict[str, Tuple[int, str]]:
+        return _parse_tickers(json.loads(path.read_text()))
+
+    def _refresh(self) -> None:
+        if self.source_file is not None:
+            try:
+                mtime = self.source_file.stat().st_mtime
+                if mtime != self._source_mtime:
+                    self._table = self._read(self.source_file)
+                    self._source_mtime = mtime
+            except Exception:
+                pass
+            return
+
+        now = time.time()
+        if self._table is not None and now - self._checked_at < self.ttl:
+            return
+        self._checked_at = now
+        try:
+            if now - self.path.stat().st_mtime < self.ttl:
+                self._table = self._read(self.path)
+                return
+        except Exception:
+            pass
+        try:
+            data = _download_tickers(self.url)
+            table = _parse_tickers(data)
+            if table:
+                self._table = table
+                self.downloads += 1
+                save_json(self.path, data)
+                return
+        except Exception:
+            pass
+        if self._table is None:
+            # Offline: a stale copy beats no table
+            try:
+                self._table = self._read(self.path)
+            except Exception:
+                pass
+
+    def load(self) -> int:
+        """Blocking: load (or refresh) the table now; returns the number of tickers."""
+        with self._lock:
+            self._refresh()
+            return len(self._table or ())
+
+    def lookup(self, ticker: str) -> Optional[Tuple[int, str]]:
+        """Return (cik, title) for ``ticker``, or None if it is unknown or no table is available."""
+        with self._lock:
+            self._refresh()
+            return (self._table or {}).get(_normalise(ticker))
+
+    def resolve(self, ticker: str) -> Optional[int]:
+        """Return the CIK for ``ticker`` (or a numeric CIK string).
+
+        Raises UnknownTickerError when a table is loaded and does not list the
+        ticker; returns None only when no table could be loaded.
+        """
+        key = ticker.strip()
+        if key.isdigit():
+            return int(key)
+        with self._lock:
+            self._refresh()
+            table = self._table
+            if table:
+                entry = table.get(_normalise(key))
+                if entry is None:
+                    self.unknown += 1
+                    raise UnknownTickerError(f"Unknown ticker {ticker!r}: not in the SEC company tickers table")
+                return entry[0]
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "tickers": len(self._table or ()),
+                "downloads": self.downloads,
+                "unknown": self.unknown,
+            }
+
+
+class CompanyCache:
+    """``Company`` objects memoised per ticker/CIK for ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = COMPANY_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, object]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ticker_or_cik):
+        """Blocking: return a memoised ``Company``, loading it on a miss or after the TTL."""
+        key = str(ticker_or_cik).strip().upper()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        company = Company(ticker_or_cik)
+        with self._lock:
+            self._entries[key] = (now, company)
+        return company
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+ticker_map = TickerMap()
+company_cache = CompanyCache()
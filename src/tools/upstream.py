@@ -0,0 +1,71 @@
+"""Bounded executors for blocking upstream I/O.
+
+yfinance and edgartools are synchronous libraries. Calling them directly from
+an ``async def`` tool blocks the FastMCP event loop, so under the
+streamable-http transport one slow EDGAR scan would stall every other client.
+Tools hand such calls to :func:`run_upstream`, which runs them on a dedicated
+thread pool per upstream. Pool sizes are configurable per upstream:
+
+- ``YAHOO_MAX_WORKERS`` (default 8) for Yahoo Finance
+- ``SEC_MAX_WORKERS`` (default 4) for SEC EDGAR; keep this low to stay within
+  the SEC fair-access policy.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+import asyncio
+import functools
+import os
+import threading
+
+from src.tools.singleflight import SingleFlight
+
+YAHOO = "yahoo"
+SEC = "sec"
+
+UPSTREAM_MAX_WORKERS = {
+    YAHOO: int(os.getenv("YAHOO_MAX_WORKERS", "8")),
+    SEC: int(os.getenv("SEC_MAX_WORKERS", "4")),
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+# Concurrent identical upstream requests share one in-flight fetch
+upstream_flights = SingleFlight()
+
+
+def get_executor(upstream: str) -> ThreadPoolExecutor:
+    """Return the shared executor for ``upstream``, creating it on first use."""
+    if upstream not in UPSTREAM_MAX_WORKERS:
+        raise ValueError(f"Unknown upstream '{upstream}'. Expected one of {sorted(UPSTREAM_MAX_WORKERS)}.")
+    with _executors_lock:
+        executor = _executors.get(upstream)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=max(1, UPSTREAM_MAX_WORKERS[upstream]),
+                thread_name_prefix=f"upstream-{upstream}",
+            )
+            _executors[upstream] = executor
+        return executor
+
+
+async def run_upstream(upstream: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run blocking ``fn(*args, **kwargs)`` on the executor for ``upstream``."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(upstream), functools.partial(fn, *args, **kwargs))
+
+
+async def run_upstream_shared(upstream: str, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Like :func:`run_upstream`, but concurrent calls with the same ``key`` share one fetch."""
+    return await upstream_flights.do(
+        (upstream, key), lambda: run_upstream(upstream, fn, *args, **kwargs)
+    )
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down all upstream executors (used by tests and on server exit)."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Benchmark for the parallel filing-body fetch in `search_debt_conversions`.
+
+Scans N in-window 8-K filings and reports wall-clock time for two modes:
+
+- sequential: one filing body at a time, which is how the search behaved
+              before bodies were fetched concurrently.
+- parallel:   the current search, capped at `SEC_FILING_FETCH_CONCURRENCY`
+              in-flight fetches (and `SEC_MAX_WORKERS` executor threads).
+
+By default EDGAR is simulated with a fixed per-filing latency so the numbers
+are reproducible offline. Pass `--live TICKER` to scan a real company.
+
+    python tests/mcp_tool_tests/run_filing_fetch_benchmark.py --filings 60 --latency 0.3 --concurrency 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, REPO_ROOT)
+
+from src.tools import edgar_tools  # noqa: E402
+from src.tools.filing_cache import FilingTextCache  # noqa: E402
+
+
+def _fake_filings(n: int, latency: float):
+    today = datetime.now()
+    filings = []
+    for i in range(n):
+        filing = SimpleNamespace(
+            accession_no=f'0000000000-25-{i:06d}',
+            filing_date=(today - timedelta(days=i % 60)).date(),
+            url=f'https://www.sec.gov/Archives/{i}',
+        )
+
+        def text(detail=None, i=i):
+            time.sleep(latency)
+            return 'Item 3.02 conversion of convertible notes' if i % 3 == 0 else 'Item 7.01 regulation FD'
+
+        filing.text = text
+        filings.append(filing)
+    return filings
+
+
+def _sequential_search(ticker: str, months_back: int):
+    """The pre-parallel behaviour: fetch and scan each filing body in turn."""
+    async def run():
+        previous = edgar_tools.SEC_FILING_FETCH_CONCURRENCY
+        edgar_tools.SEC_FILING_FETCH_CONCURRENCY = 1
+        try:
+            return await edgar_tools.search_debt_conversions(ticker, months_back)
+        finally:
+            edgar_tools.SEC_FILING_FETCH_CONCURRENCY = previous
+    return run()
+
+
+def _measure(label, coro_factory, ticker, months_back):
+    start = time.perf_counter()
+    with patch('builtins.print'):
+        result = asyncio.run(coro_factory(ticker, months_back))
+    elapsed = time.perf_counter() - start
+    found = next((line for line in result.splitlines() if line.startswith('Found')), result[:80])
+    print(f"{label:<10} elapsed={elapsed:6.2f}s  {found}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel filing fetch benchmark')
+    parser.add_argument('--filings', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.3, help='Simulated per-filing fetch latency (seconds)')
+    parser.add_argument('--concurrency', type=int, default=edgar_tools.SEC_FILING_FETCH_CONCURRENCY)
+    parser.add_argument('--months-back', type=int, default=3)
+    parser.add_argument('--live', metavar='TICKER', help='Scan a real company on EDGAR instead of a simulated one')
+    args = parser.parse_args()
+
+    edgar_tools.SEC_FILING_FETCH_CONCURRENCY = args.concurrency
+    # Measure downloads, not filing-text cache hits from the first run
+    edgar_tools.filing_text_cache = FilingTextCache(max_bytes=0)
+    print(f"concurrency={args.concurrency}")
+
+    if args.live:
+        ticker = args.live
+        sequential = _measure('sequential', _sequential_search, ticker, args.months_back)
+        parallel = _measure('parallel', edgar_tools.search_debt_conversions, ticker, args.months_back)
+    else:
+        filings = _fake_filings(args.filings, args.latency)
+        ticker = 'SIM'
+        with patch.object(edgar_tools, '_indexed_filings', lambda t, form, start, limit: filings):
+            sequential = _measure('sequential', _sequential_search, ticker, args.months_back)
+            parallel = _measure('parallel', edgar_tools.search_debt_conversions, ticker, args.months_back)
+
+    print(f"speedup: {sequential / parallel:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
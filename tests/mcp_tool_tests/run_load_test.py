@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""In-process load test for the upstream executor layer.
+
+Fires N concurrent `get_stock_data` calls (distinct tickers, so the history
+cache cannot help) and reports wall-clock time and throughput for two modes:
+
+- inline:   the blocking yfinance call runs directly on the event loop, which
+            is how the tools behaved before `src/tools/upstream.py` existed.
+- executor: the call goes through `run_upstream`, so requests overlap.
+
+By default the Yahoo upstream is simulated with a fixed per-request latency so
+the numbers are reproducible offline. Pass `--live` to hit Yahoo Finance.
+
+    python tests/mcp_tool_tests/run_load_test.py --requests 32 --latency 0.25
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, REPO_ROOT)
+
+from src.tools import financial_tools, history_cache  # noqa: E402
+
+
+def _fake_ticker(latency: float):
+    def factory(symbol):
+        ticker = MagicMock()
+
+        def history(*args, **kwargs):
+            time.sleep(latency)
+            return pd.DataFrame({'Close': [10.0, 11.0], 'High': [12.0, 12.5], 'Low': [9.0, 9.5]})
+
+        ticker.history.side_effect = history
+        return ticker
+    return factory
+
+
+async def _run_inline(tickers):
+    async def one(t):
+        # Old behaviour: blocking download on the event loop thread.
+        return history_cache._download_history(t, '1d', '1y', None, None)
+    return await asyncio.gather(*(one(t) for t in tickers))
+
+
+async def _run_executor(tickers):
+    return await asyncio.gather(*(financial_tools.get_stock_data(t, '1y') for t in tickers))
+
+
+def _measure(label, coro_factory, tickers):
+    history_cache.history_cache.clear()
+    start = time.perf_counter()
+    asyncio.run(coro_factory(tickers))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<9} requests={len(tickers):<4} elapsed={elapsed:6.2f}s throughput={len(tickers) / elapsed:7.2f} req/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Upstream executor load test')
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--latency', type=float, default=0.25, help='Simulated upstream latency (seconds)')
+    parser.add_argument('--live', action='store_true', help='Use real Yahoo Finance instead of a simulated upstream')
+    args = parser.parse_args()
+
+    tickers = [f'T{i:04d}' for i in range(args.requests)]
+    if args.live:
+        tickers = ['AAPL', 'MSFT', 'GOOG', 'AMZN', 'META', 'NVDA', 'TSLA', 'AMD'] * max(1, args.requests // 8)
+        inline = _measure('inline', _run_inline, tickers)
+        pooled = _measure('executor', _run_executor, tickers)
+    else:
+        with patch('src.tools.history_cache.yf.Ticker', side_effect=_fake_ticker(args.latency)):
+            inline = _measure('inline', _run_inline, tickers)
+            pooled = _measure('executor', _run_executor, tickers)
+
+    print(f"speedup: {inline / pooled:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
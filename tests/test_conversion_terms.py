@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import src.tools.edgar_tools as edgar_tools  # noqa: E402
+from src.tools.conversion_terms import extract_prices, extract_terms, extract_terms_batch  # noqa: E402
+from src.tools.filing_cache import FilingTextCache  # noqa: E402
+
+NOTE_TEXT = (
+    "On May 1, 2025 the Company issued $5,000,000 aggregate principal amount of Senior Convertible Notes. "
+    "The notes are convertible into common stock at a conversion price of $0.50, subject to adjustment. "
+    "The Notes mature on June 30, 2027. "
+    "Upon an event of default the conversion price shall equal 85% of the lowest VWAP during the "
+    "ten (10) trading days prior to conversion."
+)
+
+
+def _by_kind(terms):
+    out = {}
+    for term in terms:
+        out.setdefault(term.kind, []).append(term)
+    return out
+
+
+def test_extracts_each_term_with_offsets():
+    terms = _by_kind(extract_terms(NOTE_TEXT))
+    assert [t.value for t in terms["principal"]] == [5_000_000.0]
+    assert [t.value for t in terms["conversion_price"]] == [0.5]
+    assert [t.value for t in terms["maturity"]] == ["2027-06-30"]
+    vwap = terms["vwap_discount"][0].value
+    assert vwap == {"discount_pct": 15.0, "percent_of_vwap": 85.0, "lookback_days": 10.0}
+    for kind_terms in terms.values():
+        for term in kind_terms:
+            assert NOTE_TEXT[term.start:term.end] == term.text
+
+
+def test_ratio_and_scaled_principal():
+    text = (
+        "The 4.25% Convertible Senior Notes due 2029 in an aggregate principal amount of $150 million "
+        "have an initial conversion rate of 74.0741 shares of common stock per $1,000 principal amount of notes."
+    )
+    terms = _by_kind(extract_terms(text))
+    ratio = terms["conversion_ratio"][0].value
+    assert ratio["shares"] == 74.0741 and ratio["per_principal"] == 1000.0
+    assert ratio["implied_price"] == pytest.approx(13.50, abs=0.01)
+    # "$1,000 principal amount" is the ratio denominator, not the issue size
+    assert [t.value for t in terms["principal"]] == [150_000_000.0]
+    assert [t.value for t in terms["maturity"]] == ["2029"]
+
+
+def test_batch_shifts_offsets_and_keeps_prices_helper():
+    batches = extract_terms_batch(["no terms here", NOTE_TEXT], [0, 1000])
+    assert batches[0] == []
+    assert min(t.start for t in batches[1]) >= 1000
+    assert extract_prices("Price of $1,234.56 or $5 and $0") == [1234.56, 5.0]
+    assert edgar_tools._extract_price("at $10 then $20") == 10.0
+
+
+@pytest.mark.asyncio
+async def test_extract_conversion_terms_tool_uses_cached_text(tmp_path, monkeypatch):
+    cache = FilingTextCache(root=tmp_path / "cache")
+    accession = "0001234567-25-000042"
+    cache.put(accession, NOTE_TEXT)
+    cache.put(f"{accession}-exhibits", edgar_tools._EXHIBITS_MARKER)
+    monkeypatch.setattr(edgar_tools, "filing_text_cache", cache)
+
+    def no_fetch(accession):
+        raise AssertionError("cached filing must not be fetched")
+
+    monkeypatch.setattr(edgar_tools, "_find_filing", no_fetch)
+    url = "https://www.sec.gov/Archives/edgar/data/1234567/000123456725000042/0001234567-25-000042-index.htm"
+    result = await edgar_tools.extract_conversion_terms(url)
+    assert result.startswith(f"Conversion Terms for {accession}:")
+    assert "conversion_price=$0.50" in result
+    assert "principal=$5,000,000.00" in result
+
+    assert "no accession number" in await edgar_tools.extract_conversion_terms("not a url")
@@ -0,0 +1,191 @@
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import src.tools.edgar_tools as edgar_tools  # noqa: E402
+from src.tools.filing_cache import FilingTextCache  # noqa: E402
+
+
+def _filings(n: int):
+    today = datetime.now()
+    return [
+        SimpleNamespace(
+            accession_no=f"0000000000-25-{i:06d}",
+            filing_date=(today - timedelta(days=i)).date(),
+            url=f"https://www.sec.gov/{i}",
+            body=f"Item 8.01 holders elected conversion of notes #{i}" if i % 2 == 0 else "Item 5.02 officer change",
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def fake_sec(monkeypatch):
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_text(filing):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        # Later (older) filings finish first to scramble completion order
+        time.sleep(0.02 + 0.002 * (20 - int(filing.accession_no[-2:])))
+        with lock:
+            state["active"] -= 1
+        return filing.body
+
+    monkeypatch.setattr(edgar_tools, "_filing_text", fake_text)
+    monkeypatch.setattr(edgar_tools, "_exhibits_text", lambda filing: "")
+    monkeypatch.setattr(edgar_tools, "filing_text_cache", FilingTextCache(max_bytes=0))
+    return state
+
+
+@pytest.mark.asyncio
+async def test_search_fetches_in_parallel_and_keeps_date_order(fake_sec, monkeypatch):
+    filings = _filings(20)
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: filings)
+    monkeypatch.setattr(edgar_tools, "SEC_FILING_FETCH_CONCURRENCY", 3)
+
+    result = await edgar_tools.search_debt_conversions("TEST", months_back=3)
+
+    assert "Found 10 potential conversion events" in result
+    accessions = [line.split()[-1] for line in result.splitlines() if "Accession:" in line]
+    assert accessions == [f.accession_no for f in filings if "conversion" in f.body]
+    assert 1 < fake_sec["peak"] <= 3
+
+
+@pytest.mark.asyncio
+async def test_search_skips_filings_outside_window(fake_sec, monkeypatch):
+    filings = _filings(4)
+    filings[0].filing_date = (datetime.now() - timedelta(days=365)).date()
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: filings)
+
+    result = await edgar_tools.search_debt_conversions("TEST", months_back=1)
+
+    assert "Found 1 potential conversion events" in result
+    assert filings[2].accession_no in result
+
+
+@pytest.mark.asyncio
+async def test_search_with_custom_keywords(fake_sec, monkeypatch):
+    filings = _filings(6)
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: filings)
+
+    result = await edgar_tools.search_debt_conversions("TEST", months_back=3, keywords=["OFFICER CHANGE"])
+
+    assert "Found 3 potential conversion events" in result
+    assert "Keywords: officer change (1)" in result
+
+
+@pytest.mark.asyncio
+async def test_item_prefilter_skips_unrelated_8ks(fake_sec, monkeypatch, capsys):
+    filings = _filings(6)
+    for f, items in zip(filings, ["2.03,9.01", "5.02", "2.02,9.01", "", "3.02", "7.01"]):
+        f.items = items
+    fetched = []
+    monkeypatch.setattr(edgar_tools, "_filing_text", lambda filing: fetched.append(filing.accession_no) or filing.body)
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: filings)
+
+    result = await edgar_tools.search_debt_conversions("TEST", months_back=3)
+    # 2.03, 3.02 and the filing with unknown items are downloaded
+    assert sorted(fetched) == sorted(filings[i].accession_no for i in (0, 3, 4))
+    assert "Skipped 3 8-Ks with unrelated items" in result
+    assert "Items: 2.03,9.01" in result
+    # Diagnostics go to the log: stdout is the stdio transport's JSON-RPC stream
+    assert capsys.readouterr().out == ""
+
+    fetched.clear()
+    await edgar_tools.search_debt_conversions("TEST", months_back=3, items=["all"])
+    assert len(fetched) == 6
+
+    fetched.clear()
+    await edgar_tools.search_debt_conversions("TEST", months_back=3, items=["5.02"])
+    assert sorted(fetched) == sorted(filings[i].accession_no for i in (1, 3))
+
+
+@pytest.mark.asyncio
+async def test_exhibit_text_is_scanned(monkeypatch):
+    filing = _filings(1)[0]
+    filing.body = "Item 2.03 creation of a direct financial obligation"
+    filing.exhibits = [
+        SimpleNamespace(document_type="EX-4.1", text=lambda: "The Notes are convertible at $0.50 per share"),
+        SimpleNamespace(document_type="GRAPHIC", text=lambda: "conversion"),
+    ]
+    monkeypatch.setattr(edgar_tools, "_filing_text", lambda f: f.body)
+    monkeypatch.setattr(edgar_tools, "filing_text_cache", FilingTextCache(max_bytes=0))
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: [filing])
+
+    result = await edgar_tools.search_debt_conversions("TEST", months_back=3)
+    assert "Found 1 potential conversion events" in result
+    assert "Keywords: convertible (1)" in result
+    assert "[EX-4.1]" in result
+
+
+@pytest.mark.asyncio
+async def test_search_streams_matches_and_progress(fake_sec, monkeypatch):
+    filings = _filings(6)
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: filings)
+    streamed, progress = [], []
+
+    async def on_match(conv):
+        streamed.append(conv["accession"])
+        assert conv["terms"] == []
+
+    async def on_progress(scanned, total):
+        progress.append((scanned, total))
+
+    result = await edgar_tools.search_debt_conversions(
+        "TEST", months_back=3, progress=on_progress, on_match=on_match,
+    )
+    assert sorted(streamed) == sorted(f.accession_no for f in filings if "conversion" in f.body)
+    assert progress == [(i, 6) for i in range(1, 7)]
+    assert "Found 3 potential conversion events\n" in result
+
+
+@pytest.mark.asyncio
+async def test_search_stops_after_max_results(fake_sec, monkeypatch):
+    filings = _filings(20)
+    started = []
+    monkeypatch.setattr(edgar_tools, "_filing_text", lambda filing: started.append(filing) or filing.body)
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: filings)
+    monkeypatch.setattr(edgar_tools, "SEC_FILING_FETCH_CONCURRENCY", 2)
+
+    result = await edgar_tools.search_debt_conversions("TEST", months_back=3, max_results=2)
+    assert "Found 2 potential conversion events (stopped after 2 matches; scanned" in result
+    # Only the filings in flight when the limit was hit were downloaded
+    assert len(started) <= 6
+
+
+@pytest.mark.asyncio
+async def test_search_and_render_returns_chunks_in_one_call(fake_sec, monkeypatch):
+    filings = _filings(4)
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: filings)
+
+    chunked = await edgar_tools.search_and_render_conversions(
+        "TEST", months_back=3, options={"mode": "chunked", "max_tokens": 64},
+    )
+    assert chunked["mode"] == "chunked"
+    assert chunked["summary"].startswith("Debt Conversion Search for TEST")
+    assert "Found 2 potential conversion events" in chunked["summary"]
+    text = "\n\n".join(c["markdown"] for c in chunked["chunks"])
+    assert [c["index"] for c in chunked["chunks"]] == list(range(len(chunked["chunks"])))
+    # Newest match first, each with its accession, keywords and snippet
+    assert text.index(filings[0].accession_no) < text.index(filings[2].accession_no)
+    assert "Keywords: conversion (1)" in text
+    assert "holders elected conversion of notes #2" in text
+
+    snippet = await edgar_tools.search_and_render_conversions("TEST", months_back=3)
+    assert snippet["mode"] == "snippet"
+    assert f"- accession: {filings[0].accession_no}" in snippet["markdown"]
+
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: [])
+    empty = await edgar_tools.search_and_render_conversions("TEST", options={"mode": "snippet"})
+    assert "Found 0 potential conversion events" in empty["markdown"]
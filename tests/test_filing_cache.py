@@ -0,0 +1,123 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import src.tools.edgar_tools as edgar_tools  # noqa: E402
+import src.tools.markdown_tools as markdown_tools  # noqa: E402
+from src.tools.filing_cache import FilingTextCache  # noqa: E402
+from src.tools.text_index import TextIndex  # noqa: E402
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FilingTextCache(root=tmp_path / "filings", max_bytes=10_000_000)
+
+
+def test_roundtrip_and_persistence(cache, tmp_path):
+    cache.put("0001-25-000001", "convertible notes " * 100)
+    assert cache.get("0001-25-000001") == "convertible notes " * 100
+    reopened = FilingTextCache(root=tmp_path / "filings", max_bytes=10_000_000)
+    assert reopened.contains("0001-25-000001")
+    assert reopened.get("0001-25-000001") == "convertible notes " * 100
+    assert reopened.get("0001-25-000002") is None
+    assert reopened.stats()["hits"] == 1 and reopened.stats()["misses"] == 1
+
+
+def test_rejects_unsafe_keys_and_empty_text(cache):
+    cache.put("../escape", "text")
+    cache.put(None, "text")
+    cache.put("0001-25-000003", "")
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_by_compressed_size(tmp_path):
+    texts = {f"acc-{i}": os.urandom(2000).hex() for i in range(4)}
+    cache = FilingTextCache(root=tmp_path / "filings", max_bytes=5000)
+    cache.put("acc-0", texts["acc-0"])
+    cache.put("acc-1", texts["acc-1"])
+    cache.get("acc-0")  # acc-1 is now least recently used
+    cache.put("acc-2", texts["acc-2"])
+    assert cache.contains("acc-0") and cache.contains("acc-2")
+    assert not cache.contains("acc-1")
+    assert not (tmp_path / "filings" / "acc-1.txt.gz").exists()
+    assert cache.stats()["bytes"] <= 5000
+    assert cache.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_repeat_search_downloads_nothing(cache, tmp_path, monkeypatch):
+    downloads = []
+
+    def filing(i):
+        def text(detail=None):
+            downloads.append(i)
+            return f"Item 3.02 conversion of notes {i}"
+        return SimpleNamespace(
+            accession_no=f"0000000000-25-{i:06d}",
+            filing_date=(datetime.now() - timedelta(days=i)).date(),
+            url=f"https://www.sec.gov/{i}",
+            text=text,
+        )
+
+    filings = [filing(i) for i in range(5)]
+    monkeypatch.setattr(edgar_tools, "filing_text_cache", cache)
+    monkeypatch.setattr(edgar_tools, "text_index", TextIndex(tmp_path / "text_index.sqlite3"))
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: filings)
+
+    first = await edgar_tools.search_debt_conversions("TEST", months_back=3)
+    assert len(downloads) == 5
+    second = await edgar_tools.search_debt_conversions("TEST", months_back=3)
+    assert len(downloads) == 5
+    assert first == second
+
+
+def test_convert_full_text_reads_cache(cache, monkeypatch):
+    monkeypatch.setattr(markdown_tools, "filing_text_cache", cache)
+    cache.put("0000000000-25-000001", "FULL FILING TEXT")
+    structured = {"structured": [
+        {"snippet": "short", "accession": "0000000000-25-000001"},
+        {"snippet": "uncached", "accession": "0000000000-25-000009"},
+    ]}
+    out = markdown_tools.render_structured_result(structured, {"mode": "snippet", "full_text": True})
+    assert "FULL FILING TEXT" in out["markdown"]
+    assert "uncached" in out["markdown"]
+    assert "short" not in out["markdown"]
+
+
+def test_snippet_full_text_is_capped_to_the_budget(cache, monkeypatch):
+    monkeypatch.setattr(markdown_tools, "filing_text_cache", cache)
+    cache.put("0000000000-25-000001", "x" * 100_000)
+    structured = {"structured": [{"snippet": "short", "accession": "0000000000-25-000001"}]}
+    out = markdown_tools.render_structured_result(structured, {"mode": "snippet", "max_tokens": 500,
+                                                               "full_text": True})
+    assert out["chars"] <= 500 * 4
+
+
+def test_file_io_happens_outside_the_lock(cache, monkeypatch):
+    cache.put("0000000000-25-000001", "text")
+    real_read = type(cache._path("x")).read_bytes
+
+    def read_bytes(path):
+        # Another thread can use the cache while a large file is being read
+        assert not cache._lock.locked()
+        return real_read(path)
+
+    monkeypatch.setattr(type(cache._path("x")), "read_bytes", read_bytes)
+    assert cache.get("0000000000-25-000001") == "text"
+
+    real_unlink = type(cache._path("x")).unlink
+
+    def unlink(path, missing_ok=False):
+        assert not cache._lock.locked()
+        return real_unlink(path, missing_ok=missing_ok)
+
+    monkeypatch.setattr(type(cache._path("x")), "unlink", unlink)
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+    assert not cache._path("0000000000-25-000001").exists()
@@ -0,0 +1,142 @@
+import os
+import sys
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import src.tools.filing_index as filing_index_module  # noqa: E402
+from src.tools.filing_index import FilingIndex, _parse_filing_date  # noqa: E402
+from src.tools.ticker_map import TickerMap  # noqa: E402
+
+
+class FakeCompany:
+    """EDGAR stub: the submissions JSON holds every filing, or only 2025 when ``truncated``."""
+
+    def __init__(self, filings):
+        self.cik = 1234
+        self.name = "Fake Corp"
+        self.filings = filings
+        self.truncated = False
+        self.calls = []
+
+    def submissions(self, cik, validators=None):
+        etag = f'"{len(self.filings)}"'
+        self.calls.append(("submissions", (validators or {}).get("etag")))
+        if validators and validators.get("etag") == etag:
+            return None, validators
+        rows = [f for f in self.filings if not self.truncated or f.filing_date >= "2025-01-01"]
+        recent = {
+            "filingDate": [f.filing_date for f in reversed(rows)],
+            "accessionNumber": [f.accession_no for f in reversed(rows)],
+            "form": [f.form for f in reversed(rows)],
+            "items": [f.items for f in reversed(rows)],
+        }
+        files = [{"name": f"CIK{cik:010d}-submissions-001.json"}] if self.truncated else []
+        return {"name": self.name, "filings": {"recent": recent, "files": files}}, {"etag": etag}
+
+    def get_filings(self, trigger_full_load=True, **kwargs):
+        self.calls.append(("history", trigger_full_load))
+        return list(reversed(self.filings))
+
+
+def _filing(day: str, n: int, form: str = "8-K", items: str = "8.01"):
+    return SimpleNamespace(filing_date=day, accession_no=f"0001234-{n:06d}", form=form, items=items)
+
+
+@pytest.fixture
+def company():
+    return FakeCompany([
+        _filing("2023-06-01", 1),
+        _filing("2024-03-15", 2, form="10-K", items=""),
+        _filing("2025-01-10", 3),
+        _filing("2025-02-20", 4, form="8-K/A"),
+        _filing("2025-03-05", 5, form="10-Q", items=""),
+        _filing("2025-04-01", 6, items="2.03,9.01"),
+    ])
+
+
+@pytest.fixture
+def index(tmp_path, company, monkeypatch):
+    idx = FilingIndex(root=tmp_path / "index", ttl=3600)
+    tickers = tmp_path / "company_tickers.json"
+    tickers.write_text('{"0": {"cik_str": 1234, "ticker": "FAKE", "title": "Fake Corp"}}')
+    monkeypatch.setattr(filing_index_module, "ticker_map", TickerMap(source_file=str(tickers)))
+    monkeypatch.setattr(FilingIndex, "_company", staticmethod(lambda ticker_or_cik: company))
+    monkeypatch.setattr(FilingIndex, "_submissions", staticmethod(company.submissions))
+    return idx
+
+
+def test_parse_filing_date():
+    assert _parse_filing_date("2025-03-05") == datetime(2025, 3, 5)
+    assert _parse_filing_date("2025-03-05T16:01:02Z").date() == date(2025, 3, 5)
+    assert _parse_filing_date(date(2025, 3, 5)) == datetime(2025, 3, 5)
+    assert _parse_filing_date("not a date") is None
+    assert _parse_filing_date(None) is None
+
+
+def test_window_is_newest_first_and_form_filtered(index, company):
+    cik, name, records = index.query("fake", form="8-K", start=date(2025, 1, 1))
+    assert (cik, name) == (1234, "Fake Corp")
+    assert [r.accession_no for r in records] == ["0001234-000006", "0001234-000004", "0001234-000003"]
+    assert records[0].items == "2.03,9.01"
+    assert company.calls == [("submissions", None)]
+
+    _, _, limited = index.query("FAKE", form="8-K", start=date(2025, 1, 1), limit=1)
+    assert [r.accession_no for r in limited] == ["0001234-000006"]
+    # Served from the in-memory index without another download
+    assert company.calls == [("submissions", None)]
+
+
+def test_complete_recent_page_skips_full_history(index, company):
+    _, _, records = index.query("FAKE", start=date(2020, 1, 1))
+    assert len(records) == 6
+    assert company.calls == [("submissions", None)]
+
+
+def test_older_window_loads_full_history_once(index, company, monkeypatch):
+    # The submissions JSON lists older pages, so the full history is needed
+    company.truncated = True
+    _, _, records = index.query("FAKE", start=date(2023, 1, 1), end=date(2024, 12, 31))
+    assert [r.accession_no for r in records] == ["0001234-000002", "0001234-000001"]
+    assert company.calls == [("submissions", None), ("history", True)]
+    index.query("FAKE", start=date(2023, 1, 1))
+    assert len(company.calls) == 2
+
+
+def test_refresh_is_a_conditional_get(tmp_path, index, company):
+    index.query("FAKE", start=date(2025, 1, 1))
+    company.filings.append(_filing("2025-05-02", 7, items="3.02"))
+
+    # The stored ETag is sent with the refresh; the changed document is merged in
+    reopened = FilingIndex(root=tmp_path / "index", ttl=0)
+    _, _, records = reopened.query("FAKE", form="8-K", start=date(2025, 1, 1))
+    assert company.calls[-1] == ("submissions", '"6"')
+    assert records[0].accession_no == "0001234-000007"
+    assert reopened.stats()["records_added"] == 1
+    assert reopened.stats()["full_builds"] == 0
+
+    # Unchanged since the last refresh: 304, nothing merged
+    reopened.query("FAKE", form="8-K", start=date(2025, 1, 1))
+    assert company.calls[-1] == ("submissions", '"7"')
+    assert reopened.stats()["not_modified"] == 1
+    assert reopened.stats()["records_added"] == 1
+
+
+def test_index_file_is_written_outside_the_global_lock(index, monkeypatch):
+    writes = []
+    save = filing_index_module.save_json
+
+    def save_json(path, data):
+        # Queries for other companies must not wait on this write
+        assert not index._lock.locked()
+        writes.append(path.name)
+        return save(path, data)
+
+    monkeypatch.setattr(filing_index_module, "save_json", save_json)
+    index.query("FAKE", form="8-K")
+    assert writes == ["1234.json"]
+    assert FilingIndex(root=index.root).query("FAKE", form="8-K")[2] == index.query("FAKE", form="8-K")[2]
@@ -0,0 +1,124 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import src.tools.edgar_tools as edgar_tools  # noqa: E402
+import src.tools.form_index as form_index_module  # noqa: E402
+from src.tools.filing_cache import FilingTextCache  # noqa: E402
+from src.tools.form_index import FormIndex, parse_form_index  # noqa: E402
+
+HEADER = """Description:           Daily Index of EDGAR Dissemination Feed by Form Type
+Last Data Received:    {day}
+
+Form Type   Company Name                                                  CIK         Date Filed  File Name
+---------------------------------------------------------------------------------------------------------------------------------------------
+"""
+
+
+def _row(form, company, cik, filed, accession):
+    return f"{form:<12}{company:<62}{cik:<12}{filed:<12}edgar/data/{cik}/{accession}.txt\n"
+
+
+def _write_daily(base, day: date, rows):
+    q = (day.month - 1) // 3 + 1
+    path = base / "daily-index" / str(day.year) / f"QTR{q}" / f"form.{day:%Y%m%d}.idx"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HEADER.format(day=day) + "".join(rows))
+
+
+def _write_quarter(base, year, q, rows):
+    path = base / "full-index" / str(year) / f"QTR{q}" / "form.idx"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HEADER.format(day=year) + "".join(rows))
+
+
+def test_parse_keeps_only_8k_rows():
+    lines = (HEADER.format(day="x") + "".join([
+        _row("10-Q", "ALPHA INC", 11, "20250401", "0000000011-25-000001"),
+        _row("8-K", "BETA  CORP", 22, "20250401", "0000000022-25-000002"),
+        _row("8-K/A", "GAMMA LTD", 33, "2025-04-01", "0000000033-25-000003"),
+        _row("8-K12B", "DELTA CO", 44, "20250401", "0000000044-25-000004"),
+        _row("SC 13D", "EPSILON", 55, "20250401", "0000000055-25-000005"),
+    ])).splitlines()
+    entries = list(parse_form_index(lines))
+    assert [(e.form, e.company, e.cik, e.filing_date, e.accession_no) for e in entries] == [
+        ("8-K", "BETA  CORP", 22, "2025-04-01", "0000000022-25-000002"),
+        ("8-K/A", "GAMMA LTD", 33, "2025-04-01", "0000000033-25-000003"),
+    ]
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    base = tmp_path / "mirror"
+    monkeypatch.setattr(form_index_module, "EDGAR_INDEX_BASE", str(base))
+    return base
+
+
+def test_past_quarter_read_once_from_full_index(tmp_path, mirror):
+    _write_quarter(mirror, 2024, 2, [
+        _row("8-K", "ALPHA INC", 11, "2024-05-01", "0000000011-24-000001"),
+        _row("8-K", "BETA CORP", 22, "2024-05-02", "0000000022-24-000002"),
+        _row("8-K", "GAMMA LTD", 33, "2024-06-28", "0000000033-24-000003"),
+    ])
+    index = FormIndex(root=tmp_path / "tables")
+    entries = index.filings(date(2024, 5, 1), date(2024, 5, 31))
+    assert [e.cik for e in entries] == [22, 11]
+    index.filings(date(2024, 6, 1), date(2024, 6, 30))
+    assert index.files_read == 1
+
+    # Parsed tables persist, so a new process reads no index files
+    reopened = FormIndex(root=tmp_path / "tables")
+    assert [e.cik for e in reopened.filings(date(2024, 4, 1), date(2024, 6, 30))] == [33, 22, 11]
+    assert reopened.files_read == 0
+
+
+def test_current_quarter_uses_daily_files(tmp_path, mirror):
+    yesterday = date.today() - timedelta(days=1)
+    _write_daily(mirror, yesterday, [_row("8-K", "ALPHA INC", 11, f"{yesterday:%Y%m%d}", "0000000011-26-000009")])
+    index = FormIndex(root=tmp_path / "tables")
+    entries = index.filings(yesterday, date.today())
+    assert [e.accession_no for e in entries] == ["0000000011-26-000009"]
+
+
+@pytest.mark.asyncio
+async def test_market_scan_reports_matches_newest_first(tmp_path, mirror, monkeypatch):
+    _write_quarter(mirror, 2024, 2, [
+        _row("8-K", "ALPHA INC", 11, "2024-05-01", "0000000011-24-000001"),
+        _row("8-K", "BETA CORP", 22, "2024-05-02", "0000000022-24-000002"),
+        _row("8-K", "GAMMA LTD", 33, "2024-05-03", "0000000033-24-000003"),
+    ])
+    bodies = {
+        "0000000011-24-000001": "Item 3.02 holders converted notes under the convertible debenture",
+        "0000000022-24-000002": "Item 5.02 departure of directors",
+        "0000000033-24-000003": "Item 1.01 note conversion agreement",
+    }
+    monkeypatch.setattr(edgar_tools, "form_index", FormIndex(root=tmp_path / "tables"))
+    monkeypatch.setattr(edgar_tools, "filing_text_cache", FilingTextCache(max_bytes=0))
+    monkeypatch.setattr(edgar_tools, "_filing_text", lambda filing: bodies[filing.accession_no])
+
+    result = await edgar_tools.scan_market_conversions("2024-05-01", "2024-05-03")
+    assert "Scanned 3 of 3 8-K filings" in result
+    assert "Found 2 potential conversion events" in result
+    assert result.index("GAMMA LTD (CIK 33)") < result.index("ALPHA INC (CIK 11)")
+    assert "BETA CORP" not in result
+
+    limited = await edgar_tools.scan_market_conversions("2024-05-01", "2024-05-03", max_filings=1)
+    assert "Scanned 1 of 3 8-K filings (newest 1" in limited
+
+    monkeypatch.setattr(edgar_tools, "MARKET_SCAN_MAX_FILINGS", 2)
+    configured = await edgar_tools.scan_market_conversions("2024-05-01", "2024-05-03")
+    assert "Scanned 2 of 3 8-K filings (newest 2" in configured
+
+
+@pytest.mark.asyncio
+async def test_market_scan_rejects_bad_dates():
+    result = await edgar_tools.scan_market_conversions("2024-13-45", "2024-05-03")
+    assert result == ("Error scanning market conversions: "
+                      "start must be a date in YYYY-MM-DD form, got '2024-13-45'")
+    result = await edgar_tools.scan_market_conversions(None, "yesterday")
+    assert "end must be a date in YYYY-MM-DD form, got 'yesterday'" in result
@@ -0,0 +1,158 @@
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools import history_cache as hc  # noqa: E402
+from src.tools.financial_tools import check_52week_low, get_stock_data  # noqa: E402
+
+
+def _frame(days: int = 300) -> pd.DataFrame:
+    index = pd.date_range(end=pd.Timestamp.now().normalize(), periods=days, freq="D")
+    close = pd.Series(range(days), index=index, dtype=float) + 100
+    return pd.DataFrame({"Close": close, "High": close + 1, "Low": close - 1})
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(hc.ohlcv_store, "root", tmp_path)
+    hc.history_cache.clear()
+    yield
+    hc.history_cache.clear()
+
+
+def test_cache_hit_miss_counters():
+    cache = hc.HistoryCache(ttl=60, max_entries=4)
+    key = hc.make_key("aapl", "1d", "1y")
+    assert cache.get(key) is None
+    cache.put(key, _frame())
+    assert cache.get(hc.make_key("AAPL", "1d", "1y")) is not None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_lru_eviction():
+    cache = hc.HistoryCache(ttl=60, max_entries=2)
+    for t in ("A", "B", "C"):
+        cache.put(hc.make_key(t, "1d", "1y"), _frame(5))
+    assert cache.get(hc.make_key("A", "1d", "1y")) is None
+    assert cache.get(hc.make_key("C", "1d", "1y")) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ttl_expiry():
+    cache = hc.HistoryCache(ttl=0, max_entries=2)
+    key = hc.make_key("A", "1d", "1y")
+    cache.put(key, _frame(5))
+    with patch("src.tools.history_cache.time.monotonic", return_value=1e12):
+        assert cache.get(key) is None
+
+
+def test_shorter_period_served_from_longer():
+    cache = hc.HistoryCache(ttl=60, max_entries=4)
+    cache.put(hc.make_key("A", "1d", "1y"), _frame(300))
+    sliced = cache.get(hc.make_key("A", "1d", "6mo"))
+    assert sliced is not None
+    assert 150 <= len(sliced) <= 190
+    # A different interval must not be served from daily bars
+    assert cache.get(hc.make_key("A", "1wk", "6mo")) is None
+
+
+@pytest.mark.asyncio
+async def test_tools_share_one_download():
+    mock_ticker = MagicMock()
+    mock_ticker.history.return_value = _frame(300)
+
+    with patch("src.tools.history_cache.yf.Ticker", return_value=mock_ticker):
+        await get_stock_data("F", "1y")
+        text = await check_52week_low("F", 0.05)
+
+    assert "52-Week Low Analysis for F" in text
+    assert mock_ticker.history.call_count == 1
+    assert hc.cache_stats()["hits"] == 1
+
+
+def _bulk_frame(tickers, days=300):
+    return pd.concat({t: _frame(days) for t in tickers}, axis=1)
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_one_bulk_download_for_misses():
+    hc.history_cache.put(hc.make_key("AAA", "1d", hc.HISTORY_DAILY_PERIOD), _frame(300))
+
+    with patch("src.tools.history_cache.yf.download", return_value=_bulk_frame(["BBB", "CCC"])) as dl:
+        frames = await hc.get_history_batch("aaa, bbb ccc, ZZZ", period="1y")
+
+    dl.assert_called_once()
+    assert dl.call_args.args[0] == ["BBB", "CCC", "ZZZ"]
+    assert list(frames) == ["AAA", "BBB", "CCC", "ZZZ"]
+    assert frames["ZZZ"].empty
+    assert hc.history_cache.get(hc.make_key("BBB", "1d", "1y")) is not None
+
+
+@pytest.mark.asyncio
+async def test_batch_then_single_ticker_share_one_download():
+    mock_ticker = MagicMock()
+    with patch("src.tools.history_cache.yf.download", return_value=_bulk_frame(["AAA", "BBB"], days=700)) as dl, \
+            patch("src.tools.history_cache.yf.Ticker", return_value=mock_ticker):
+        frames = await hc.get_history_batch(["AAA", "BBB"], period="1y")
+        single = await hc.get_history("AAA", period="1y")
+
+    dl.assert_called_once()
+    assert dl.call_args.kwargs["period"] == hc.HISTORY_DAILY_PERIOD
+    mock_ticker.history.assert_not_called()
+    assert single.equals(frames["AAA"])
+    assert len(single) < 700
+
+
+@pytest.mark.asyncio
+async def test_stock_data_batch_table():
+    from src.tools.financial_tools import get_stock_data_batch
+
+    with patch("src.tools.history_cache.yf.download", return_value=_bulk_frame(["AAA", "BBB"])):
+        text = await get_stock_data_batch(["AAA", "BBB", "NOPE"], "1y")
+
+    assert "2/3 tickers" in text
+    assert "| AAA | 399.00 |" in text
+    assert "No data: NOPE" in text
+
+
+def test_resample_bars_weekly_and_monthly():
+    index = pd.date_range("2024-01-01", periods=10, freq="B")  # Mon 1 Jan .. Fri 12 Jan
+    daily = pd.DataFrame({
+        "Open": range(10), "High": range(10, 20), "Low": range(10), "Close": range(1, 11), "Volume": [1] * 10,
+    }, index=index, dtype=float)
+
+    weekly = hc.resample_bars(daily, "1wk")
+    assert list(weekly.index) == [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-08")]
+    assert weekly["Open"].tolist() == [0, 5]
+    assert weekly["High"].tolist() == [14, 19]
+    assert weekly["Close"].tolist() == [5, 10]
+    assert weekly["Volume"].tolist() == [5, 5]
+
+    monthly = hc.resample_bars(daily, "1mo")
+    assert len(monthly) == 1 and monthly["Close"].iloc[0] == 10
+
+
+@pytest.mark.asyncio
+async def test_macd_both_timeframes_share_one_daily_download(tmp_path, monkeypatch):
+    from src.tools import financial_tools
+
+    monkeypatch.setattr(financial_tools.macd_state_store, "path", tmp_path / "macd.json")
+    monkeypatch.setattr(financial_tools.macd_state_store, "_states", None)
+    mock_ticker = MagicMock()
+    mock_ticker.history.return_value = _frame(730)
+
+    with patch("src.tools.history_cache.yf.Ticker", return_value=mock_ticker):
+        text = await financial_tools.calculate_macd("F", "both")
+
+    assert "MACD Analysis for F (daily)" in text
+    assert "MACD Analysis for F (weekly)" in text
+    assert mock_ticker.history.call_count == 1
+    assert mock_ticker.history.call_args.kwargs == {"period": "2y", "interval": "1d"}
@@ -0,0 +1,58 @@
+import os
+import sys
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools import financial_tools  # noqa: E402
+from src.tools.financial_tools import _calculate_macd_manual  # noqa: E402
+from src.tools.indicators import align_frames, last_valid, macd_matrix  # noqa: E402
+
+
+def _frames():
+    rng = np.random.default_rng(7)
+    index = pd.date_range("2024-01-01", periods=80, freq="B")
+    frames = {}
+    for i, t in enumerate(["AAA", "BBB", "CCC"]):
+        close = pd.Series(50 + 10 * i + rng.normal(0, 1, len(index)).cumsum(), index=index)
+        frames[t] = pd.DataFrame({"Close": close})
+    # Ragged histories: late listing and a missing bar in the middle
+    frames["BBB"] = frames["BBB"].iloc[20:]
+    frames["CCC"] = frames["CCC"].drop(index[40])
+    return frames
+
+
+def test_macd_matrix_matches_per_ticker_pandas():
+    frames = _frames()
+    tickers, matrices, _ = align_frames(frames, ("Close",))
+    macd = macd_matrix(matrices["Close"])
+
+    for row, t in enumerate(tickers):
+        expected = _calculate_macd_manual(frames[t]["Close"].dropna())
+        assert last_valid(macd["macd"])[row] == pytest.approx(expected["MACD_12_26_9"].iloc[-1])
+        assert last_valid(macd["signal"])[row] == pytest.approx(expected["MACDs_12_26_9"].iloc[-1])
+        assert last_valid(macd["histogram"])[row] == pytest.approx(expected["MACDh_12_26_9"].iloc[-1])
+
+
+def test_leading_bars_stay_nan():
+    tickers, matrices, _ = align_frames(_frames(), ("Close",))
+    macd = macd_matrix(matrices["Close"])
+    assert np.isnan(macd["macd"][tickers.index("BBB"), :20]).all()
+
+
+@pytest.mark.asyncio
+async def test_calculate_macd_batch_table():
+    frames = _frames()
+    frames["NONE"] = pd.DataFrame()
+    with patch.object(financial_tools, "get_history_batch", AsyncMock(return_value=frames)):
+        text = await financial_tools.calculate_macd_batch(["AAA", "BBB", "CCC", "NONE"], "weekly")
+
+    assert "MACD Batch (weekly, 3/4 tickers)" in text
+    expected = _calculate_macd_manual(frames["AAA"]["Close"])["MACD_12_26_9"].iloc[-1]
+    assert f"| AAA | {frames['AAA']['Close'].iloc[-1]:.2f} | {expected:.4f} |" in text
+    assert "No data: NONE" in text
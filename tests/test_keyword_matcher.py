@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools.keyword_matcher import (  # noqa: E402
+    DEFAULT_CONVERSION_KEYWORDS, KeywordMatcher, get_matcher, normalize_keywords,
+)
+
+
+def _naive(text, keywords):
+    text_l = text.lower()
+    hits = []
+    for k in keywords:
+        i = text_l.find(k)
+        while i != -1:
+            hits.append((i, k))
+            i = text_l.find(k, i + 1)
+    return sorted(hits)
+
+
+def test_matches_naive_scan_including_overlaps():
+    text = ("On March 3 the Holder elected a DEBT CONVERSION of its Convertible Note; "
+            "note conversion price $0.25. Debentures remain outstanding. Reconversion.") * 3
+    matcher = KeywordMatcher(DEFAULT_CONVERSION_KEYWORDS)
+    assert sorted(matcher.finditer(text)) == _naive(text, DEFAULT_CONVERSION_KEYWORDS)
+    assert matcher.first(text) == (text.lower().find("debt conversion"), "debt conversion")
+
+
+def test_prefix_keywords_at_same_offset():
+    matcher = KeywordMatcher(["convert", "convertible"])
+    assert list(matcher.finditer("Convertible")) == [(0, "convertible"), (0, "convert")]
+    assert matcher.counts("convertible, converted") == {"convertible": 1, "convert": 2}
+
+
+def test_keywords_are_literal_and_configurable():
+    matcher = get_matcher(["item 3.02", "(PIPE)"])
+    assert matcher.counts("Item 3.02 ... item 3x02 ... (pipe)") == {"item 3.02": 1, "(pipe)": 1}
+    assert get_matcher(["item 3.02", "(PIPE)"]) is matcher
+    assert get_matcher().keywords == tuple(DEFAULT_CONVERSION_KEYWORDS)
+    assert KeywordMatcher(["x"]).first("nothing here") is None
+    # A string is a comma-separated list, not a sequence of characters
+    assert get_matcher("item 3.02, (PIPE)") is matcher
+    assert normalize_keywords("convertible") == ("convertible",)
+    assert normalize_keywords(" , ") is None
+
+
+def test_empty_vocabulary_rejected():
+    with pytest.raises(ValueError):
+        KeywordMatcher([" ", ""])
+
+
+def test_unicode_case_mapping_falls_back_to_original_offsets():
+    # "İ".lower() is two characters, so offsets must come from the original text
+    text = "İİ convertible note"
+    matcher = KeywordMatcher(["convertible", "note"])
+    assert list(matcher.finditer(text)) == [(3, "convertible"), (15, "note")]
+    assert matcher.scan(text) == (3, {"convertible": 1, "note": 1})
+
+
+def test_scan_agrees_with_regex_path_on_a_large_filing():
+    filler = "The Company issued shares of common stock to holders of record. " * 40
+    text = (filler + "Debt Conversion of the Convertible Note at the conversion price. ") * 400
+    matcher = KeywordMatcher(DEFAULT_CONVERSION_KEYWORDS)
+    regex_hits = list(matcher._regex_finditer(text))
+    first, counts = matcher.scan(text)
+    assert first == regex_hits[0][0] == text.lower().find("debt conversion")
+    expected = {}
+    for _, keyword in regex_hits:
+        expected[keyword] = expected.get(keyword, 0) + 1
+    assert counts == expected
+    assert sorted(matcher.finditer(text)) == sorted(regex_hits)
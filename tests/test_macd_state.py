@@ -0,0 +1,93 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools.financial_tools import _calculate_macd_manual  # noqa: E402
+from src.tools.macd_state import MACDStateStore  # noqa: E402
+
+
+def _closes(n: int, seed: int = 1) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq="B", tz="America/New_York")
+    return pd.Series(100 + rng.normal(0, 1, n).cumsum(), index=index)
+
+
+def _expected(closes: pd.Series):
+    macd = _calculate_macd_manual(closes)
+    return macd["MACD_12_26_9"].iloc[-1], macd["MACDs_12_26_9"].iloc[-1], macd["MACDh_12_26_9"].iloc[-1]
+
+
+def _values(result):
+    return result["macd"], result["signal"], result["histogram"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MACDStateStore(path=tmp_path / "macd.json")
+
+
+def test_cold_start_matches_pandas(store):
+    closes = _closes(120)
+    assert _values(store.update("abc", "daily", closes)) == pytest.approx(_expected(closes))
+    assert store.cold_starts == 1
+
+
+def test_incremental_update_matches_full_recompute(store):
+    full = _closes(130)
+    store.update("ABC", "daily", full.iloc[:120])
+    # Later download is a sliding window: older bars dropped, new bars appended
+    result = store.update("ABC", "daily", full.iloc[5:])
+    assert _values(result) == pytest.approx(_expected(full))
+    assert store.cold_starts == 1
+    assert store.incremental_updates == 1
+
+
+def test_moving_intraday_bar_does_not_corrupt_state(store):
+    full = _closes(100)
+    store.update("ABC", "daily", full)
+    live = full.copy()
+    live.iloc[-1] += 3.0
+    assert _values(store.update("ABC", "daily", live)) == pytest.approx(_expected(live))
+    assert store.cold_starts == 1
+
+
+def test_adjusted_history_forces_recompute(store):
+    full = _closes(100)
+    store.update("ABC", "daily", full)
+    split = full / 2
+    assert _values(store.update("ABC", "daily", split)) == pytest.approx(_expected(split))
+    assert store.adjustments == 1
+    assert store.cold_starts == 2
+
+
+def test_state_persists_across_instances(tmp_path):
+    path = tmp_path / "macd.json"
+    full = _closes(110)
+    MACDStateStore(path=path).update("ABC", "weekly", full.iloc[:100])
+    reloaded = MACDStateStore(path=path)
+    assert _values(reloaded.update("ABC", "weekly", full)) == pytest.approx(_expected(full))
+    assert reloaded.cold_starts == 0
+
+
+def test_state_file_is_rewritten_only_when_the_anchor_moves(store, monkeypatch):
+    saves = []
+    save = store._save
+    monkeypatch.setattr(store, "_save", lambda: saves.append(1) or save())
+    full = _closes(101)
+    store.update("ABC", "daily", full.iloc[:100])
+    assert len(saves) == 1
+    # Same anchor, only the live bar moved: nothing to persist
+    live = full.iloc[:100].copy()
+    live.iloc[-1] += 1.0
+    store.update("ABC", "daily", live)
+    assert len(saves) == 1
+    # A new bar closes the previous one and moves the anchor
+    store.update("ABC", "daily", full)
+    assert len(saves) == 2
+    assert "ABC|daily" in MACDStateStore(path=store.path)._load()
@@ -1,4 +1,7 @@
 import json
+import time
+
+import pytest
 
 from src.tools.markdown_tools import render_structured_result
 
@@ -29,3 +32,167 @@ def test_chunked_mode_paragraph_splitting():
         assert 'markdown' in c
         assert c.get('chars') == len(c['markdown'])
         assert c['markdown'].strip()
+
+
+def test_html_sniffing_only_reads_the_prefix():
+    from src.tools import markdown_tools
+
+    assert markdown_tools._looks_like_html("<HTML><BODY>x</BODY></HTML>")
+    assert not markdown_tools._looks_like_html("plain text")
+    assert not markdown_tools._looks_like_html("x" * markdown_tools._SNIFF_CHARS + "<div>late</div>")
+
+
+@pytest.mark.parametrize("previous", [
+    "<table><tr><td>a",
+    "<table><tr><td>a</td><td>b</td></tr></table>",
+    "<a href='https://www.sec.gov/x'>open link",
+    "<pre>open\n  code",
+    "<ul><li>open",
+])
+def test_conversions_do_not_share_parser_state(previous):
+    pytest.importorskip("html2text")
+    from src.tools import markdown_tools
+
+    doc = "<p>plain</p><p>two</p>b<br>c"
+    expected = markdown_tools._html_to_text(doc)
+    assert expected.startswith("plain\n\ntwo\n\n")
+    markdown_tools._html_to_text(previous)
+    assert markdown_tools._html_to_text(doc) == expected
+
+
+def test_tables_links_and_pre_are_converted():
+    pytest.importorskip("html2text")
+    from src.tools import markdown_tools
+
+    assert markdown_tools._html_to_text("<table><tr><td>a</td><td>b</td></tr></table>") == "a| b  \n---|---\n"
+    assert markdown_tools._html_to_text("<a href='https://www.sec.gov/x'>link</a>") == "[link](https://www.sec.gov/x)\n"
+    assert markdown_tools._html_to_text("<pre>code\n  x</pre>") == "\n    code\n      x\n"
+
+
+def test_streaming_paragraphs_across_fragment_boundaries():
+    from src.tools.markdown_tools import iter_html_paragraphs
+
+    html = "<html><body><p>First para</p><script>var x;</script><div>Second <b>bold</b> para</div><p>Third</p></body></html>"
+    fragments = [html[i:i + 7] for i in range(0, len(html), 7)]
+    paras = iter_html_paragraphs(fragments)
+    # The first paragraph is available before the rest of the document is fed
+    assert next(paras) == "First para"
+    rest = list(paras)
+    assert "Third" in rest[-1]
+    assert any("Second" in p and "bold" in p for p in rest)
+    assert not any("var x" in p for p in rest)
+
+
+@pytest.mark.parametrize("use_html2text", [True, False])
+def test_streaming_matches_one_shot_conversion(use_html2text, monkeypatch):
+    from src.tools import markdown_tools
+
+    if use_html2text:
+        pytest.importorskip("html2text")
+    else:
+        monkeypatch.setattr(markdown_tools, "_HAS_HTML2TEXT", False)
+    rows = "".join(f"<tr><td>row {i}</td><td>${i}.00</td></tr>" for i in range(300))
+    html = f"<html><body><p>Intro</p><br><br><table>{rows}</table><p>A</p><p>B<br>C</p><pre>x\n<b>\ny</b></pre></body></html>"
+    one_shot = list(markdown_tools.iter_html_paragraphs([html]))
+    # One tag per fragment: paragraph separators straddle fragment outputs
+    assert list(markdown_tools.iter_html_paragraphs(html[i:i + 5] for i in range(0, len(html), 5))) == one_shot
+    assert one_shot[0] == "Intro" and any("C" in p for p in one_shot)
+
+
+def test_chunked_mode_converts_large_html_incrementally():
+    body = "".join(f"<p>Paragraph {i} about the conversion price.</p>" for i in range(2000))
+    sample = {'structuredContent': {'result': f"<html><body>{body}</body></html>"}}
+    res = render_structured_result(sample, {'mode': 'chunked', 'max_tokens': 500})
+    chunks = res['chunks']
+    assert len(chunks) > 10
+    assert chunks[0]['markdown'].startswith("Paragraph 0")
+    assert "<p>" not in "".join(c['markdown'] for c in chunks)
+    assert "Paragraph 1999" in chunks[-1]['markdown']
+
+
+def test_cursor_pages_through_chunks_in_order():
+    from src.tools import markdown_tools
+    from src.tools.markdown_tools import ChunkCursors
+
+    cursors = ChunkCursors(ttl=60, max_entries=2)
+    markdown_tools.chunk_cursors, saved = cursors, markdown_tools.chunk_cursors
+    try:
+        paras = [f"Paragraph {i}: " + ("lorem ipsum " * 10).strip() for i in range(12)]
+        sample = {'structuredContent': {'result': "\n\n".join(paras)}}
+        full = render_structured_result(sample, {'mode': 'chunked', 'max_tokens': 100})['chunks']
+
+        page = render_structured_result(sample, {'mode': 'chunked', 'max_tokens': 100, 'page_size': 5})
+        first_cursor = page['next_cursor']
+        seen = list(page['chunks'])
+        while page['next_cursor']:
+            page = render_structured_result({}, {'cursor': page['next_cursor']})
+            seen.extend(page['chunks'])
+        assert seen == full
+        assert [c['index'] for c in seen] == list(range(len(full)))
+        # The exhausted source is released
+        assert cursors.stats()['open'] == 0
+        with pytest.raises(ValueError):
+            render_structured_result({}, {'cursor': first_cursor})
+        with pytest.raises(ValueError):
+            render_structured_result({}, {'cursor': 'garbage'})
+    finally:
+        markdown_tools.chunk_cursors = saved
+
+
+def test_cursor_retry_and_bounds():
+    from src.tools.markdown_tools import ChunkCursors
+
+    snippets = [{'text': "\n\n".join(f"para {i}" for i in range(10)), 'meta': {}}]
+    cursors = ChunkCursors(ttl=60, max_entries=1)
+    first = cursors.start(snippets, max_chars=8, page_size=3)
+    assert [c['markdown'] for c in first['chunks']] == ["para 0", "para 1", "para 2"]
+    second = cursors.resume(first['next_cursor'])
+    # Retrying a page rewinds the source instead of skipping chunks
+    assert cursors.resume(first['next_cursor'], page_size=2)['chunks'] == second['chunks'][:2]
+    # Everything fits on one page: no cursor and nothing kept
+    single = cursors.start(snippets, max_chars=1000, page_size=3)
+    assert single['next_cursor'] is None and len(single['chunks']) == 1
+    # Opening a second source evicts the least recently used one
+    cursors.start(snippets, max_chars=8, page_size=3)
+    assert cursors.stats()['evictions'] == 1
+
+    expiring = ChunkCursors(ttl=0, max_entries=4)
+    page = expiring.start(snippets, max_chars=8, page_size=3)
+    time.sleep(0.01)
+    with pytest.raises(ValueError):
+        expiring.resume(page['next_cursor'])
+    assert expiring.stats()['expired'] == 1
+
+
+def test_top_k_keeps_densest_chunks_with_positions():
+    from src.tools.markdown_tools import score_chunk
+
+    # Each paragraph is longer than the minimum chunk size, so it is its own chunk
+    filler = [f"Paragraph {i}: " + "the board discussed general corporate matters. " * 6 for i in range(10)]
+    filler[3] = "On May 1, 2025 the holder converted the convertible note at a conversion price of $0.50 per share."
+    filler[7] = "The debenture conversion was completed on 2025-06-02."
+    sample = {'result': "\n\n".join(filler)}
+    res = render_structured_result(sample, {'mode': 'chunked', 'max_tokens': 20, 'top_k': 2})
+    assert res['ranked'] is True and res['total_chunks'] == 10
+    assert [c['index'] for c in res['chunks']] == [3, 7]
+    assert res['chunks'][0]['markdown'] == filler[3]
+    assert res['chunks'][0]['score'] > res['chunks'][1]['score'] > 0
+    assert score_chunk(filler[0]) == 0
+    assert score_chunk(filler[0], keywords=['board']) == 6
+
+    # A custom vocabulary changes what counts; chunks without any signal are dropped
+    custom = render_structured_result(sample, {'mode': 'chunked', 'max_tokens': 20, 'top_k': 5, 'keywords': ['board']})
+    assert len(custom['chunks']) == 5
+    assert all('board' in c['markdown'] for c in custom['chunks'])
+    assert render_structured_result({'result': "nothing here"}, {'mode': 'chunked', 'top_k': 3})['chunks'] == []
+
+
+def test_keywords_given_as_a_string_are_not_split_into_characters():
+    from src.tools.markdown_tools import score_chunk
+
+    text = "The board approved the plan. " * 3
+    assert score_chunk(text, keywords="board") == score_chunk(text, keywords=["board"]) == 3
+    assert score_chunk(text, keywords="board, plan") == 6
+    sample = {'result': "\n\n".join(["a quiet paragraph about nothing at all. " * 4, text * 2])}
+    res = render_structured_result(sample, {'mode': 'chunked', 'max_tokens': 20, 'top_k': 5, 'keywords': "board"})
+    assert [c['index'] for c in res['chunks']] == [1]
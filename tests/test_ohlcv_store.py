@@ -0,0 +1,138 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools.ohlcv_store import OHLCVStore  # noqa: E402
+
+pytest.importorskip("pyarrow")
+
+
+def _bars(end: pd.Timestamp, days: int, base: float = 100.0) -> pd.DataFrame:
+    index = pd.date_range(end=end, periods=days, freq="D", tz="America/New_York")
+    close = pd.Series([base + i for i in range(days)], index=index, dtype=float)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0})
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCVStore(root=tmp_path, enabled=True)
+
+
+def test_cold_refresh_writes_partition(store, tmp_path):
+    full = _bars(pd.Timestamp.now(tz="America/New_York").normalize(), 400)
+    calls = []
+
+    def download(since):
+        calls.append(since)
+        return full
+
+    out = store.refresh("abc", "1d", "1y", download)
+    assert calls == [None]
+    assert (tmp_path / "1d" / "ABC.parquet").exists()
+    assert 360 <= len(out) <= 367
+
+
+def test_warm_refresh_downloads_only_tail(store):
+    today = pd.Timestamp.now(tz="America/New_York").normalize()
+    full = _bars(today - pd.Timedelta(days=2), 400)
+    store.refresh("ABC", "1d", "1y", lambda since: full)
+
+    # Tail repeats the last two stored bars and adds two new ones
+    tail = _bars(today, 4, base=full["Close"].iloc[-2])
+    calls = []
+
+    def download(since):
+        calls.append(since)
+        return tail
+
+    out = store.refresh("ABC", "1d", "1y", download)
+    # Resumes from the last closed bar, not the possibly still-open last one
+    assert calls == [full.index[-2]]
+    assert out.index[-1] == tail.index[-1]
+    assert store.read("ABC", "1d").index.is_unique
+    assert store.incremental_downloads == 1
+
+
+def test_split_adjustment_triggers_full_rebuild(store):
+    today = pd.Timestamp.now(tz="America/New_York").normalize()
+    full = _bars(today - pd.Timedelta(days=1), 400)
+    store.refresh("ABC", "1d", "1y", lambda since: full)
+
+    adjusted = _bars(today, 400, base=50.0)
+    calls = []
+
+    def download(since):
+        calls.append(since)
+        return _bars(today, 3, base=999.0) if since is not None else adjusted
+
+    out = store.refresh("ABC", "1d", "1y", download)
+    assert calls[-1] is None
+    assert out["Close"].iloc[-1] == adjusted["Close"].iloc[-1]
+
+
+def test_moving_last_bar_is_replaced_not_treated_as_adjustment(store):
+    today = pd.Timestamp.now(tz="America/New_York").normalize()
+    full = _bars(today, 400)
+    store.refresh("ABC", "1d", "1y", lambda since: full)
+
+    # Intraday snapshot stored earlier; the session closed 0.6% higher
+    tail = full.iloc[-2:].copy()
+    tail.loc[tail.index[-1], "Close"] *= 1.006
+    calls = []
+
+    def download(since):
+        calls.append(since)
+        return tail
+
+    for _ in range(2):
+        out = store.refresh("ABC", "1d", "1y", download)
+    assert None not in calls
+    assert store.full_downloads == 1
+    assert store.incremental_downloads == 2
+    assert out["Close"].iloc[-1] == pytest.approx(full["Close"].iloc[-1] * 1.006)
+    assert len(store.read("ABC", "1d")) == len(full)
+
+
+def test_shorter_partition_does_not_serve_longer_period(store):
+    full = _bars(pd.Timestamp.now(tz="America/New_York").normalize(), 200)
+    store.refresh("ABC", "1d", "6mo", lambda since: full)
+    assert store.tail_start("ABC", "1d", "2y", store.read("ABC", "1d")) is None
+    assert store.tail_start("ABC", "1d", "3mo", store.read("ABC", "1d")) is not None
+
+
+def test_short_full_download_does_not_truncate_partition(store, tmp_path):
+    today = pd.Timestamp.now(tz="America/New_York").normalize()
+    full = _bars(today - pd.Timedelta(days=1), 500)
+    store.refresh("ABC", "1d", "2y", lambda since: full)
+
+    # "ytd" has no fixed lookback, so it is always a full download
+    ytd = _bars(today, 208, base=full["Close"].iloc[-207])
+    out = store.refresh("ABC", "1d", "ytd", lambda since: ytd)
+    assert out.index[-1] == today
+    stored = store.read("ABC", "1d")
+    assert len(stored) == 501 and stored.index[0] == full.index[0]
+    assert '"bars": 501' in (tmp_path / "1d" / "ABC.json").read_text()
+    # The 2y period is still served from the partition with a tail download
+    assert store.tail_start("ABC", "1d", "2y", stored) is not None
+
+
+def test_refresh_many_groups_requests(store):
+    today = pd.Timestamp.now(tz="America/New_York").normalize()
+    store.refresh("OLD", "1d", "1y", lambda since: _bars(today - pd.Timedelta(days=1), 400))
+    requests = []
+
+    def download_many(tickers, since):
+        requests.append((list(tickers), since))
+        if since is None:
+            return {t: _bars(today, 400) for t in tickers}
+        return {t: _bars(today, 3, base=100.0 + 398) for t in tickers}
+
+    out = store.refresh_many(["OLD", "NEW"], "1d", "1y", download_many)
+    assert [r[0] for r in requests] == [["OLD"], ["NEW"]]
+    assert requests[1][1] is None
+    assert set(out) == {"OLD", "NEW"}
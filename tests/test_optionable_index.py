@@ -0,0 +1,111 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import src.tools.financial_tools as financial_tools  # noqa: E402
+import src.tools.optionable_index as oi  # noqa: E402
+from src.tools.optionable_index import OptionableIndex  # noqa: E402
+
+
+@pytest.fixture
+def index(tmp_path):
+    return OptionableIndex(path=tmp_path / "optionable.json", symbols_file=None)
+
+
+def test_learned_entries_persist_for_the_day(index, tmp_path):
+    assert index.lookup("abc") is None
+    index.record_many({"abc": True, "xyz": False})
+    reloaded = OptionableIndex(path=tmp_path / "optionable.json", symbols_file=None)
+    assert reloaded.lookup("ABC") is True
+    assert reloaded.lookup("XYZ") is False
+    assert reloaded.lookup("QQQ") is None
+
+
+def test_learned_entries_expire_on_a_new_day(index, tmp_path):
+    index.record_many({"abc": True})
+    path = tmp_path / "optionable.json"
+    path.write_text(path.read_text().replace(date.today().isoformat(), "2000-01-01"))
+    reloaded = OptionableIndex(path=path, symbols_file=None)
+    assert reloaded.lookup("ABC") is None
+
+
+def test_symbol_directory_is_authoritative(tmp_path):
+    symbols = tmp_path / "symbols.csv"
+    symbols.write_text("Symbol,Name\nAAPL,Apple\n\"MSFT\",Microsoft\n")
+    index = OptionableIndex(path=tmp_path / "optionable.json", symbols_file=str(symbols))
+    assert index.lookup("aapl") is True
+    assert index.lookup("MSFT") is True
+    assert index.lookup("TINY") is False
+    assert index.stats()["directory_symbols"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_checks_only_unknown_tickers_live(index, monkeypatch):
+    index.record_many({"AAA": True, "BBB": False})
+    calls = []
+
+    def fake_expirations(ticker):
+        calls.append(ticker)
+        return ("2026-01-16",) if ticker == "CCC" else ()
+
+    monkeypatch.setattr(financial_tools, "optionable_index", index)
+    monkeypatch.setattr(financial_tools, "_fetch_option_expirations", fake_expirations)
+
+    result = await financial_tools.check_optionable_batch(["aaa", "bbb", "ccc", "ddd"])
+    assert sorted(calls) == ["CCC", "DDD"]
+    assert "| AAA | ✓ YES | index |" in result
+    assert "| BBB | ✗ NO | index |" in result
+    assert "| CCC | ✓ YES | live |" in result
+    assert "| DDD | ✗ NO | live |" in result
+    assert index.lookup("CCC") is True
+
+    calls.clear()
+    await financial_tools.check_optionable_batch(["ccc", "ddd"])
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_fast_mode_skips_option_chain(index, monkeypatch):
+    monkeypatch.setattr(financial_tools, "optionable_index", index)
+    monkeypatch.setattr(financial_tools, "_fetch_option_expirations", lambda t: ("2026-01-16", "2026-02-20"))
+
+    def no_chain(ticker):
+        raise AssertionError("full option chain should not be downloaded in fast mode")
+
+    monkeypatch.setattr(financial_tools, "_fetch_option_summary", no_chain)
+    result = await financial_tools.check_optionable("ABC", fast=True)
+    assert "Number of Expirations: 2" in result
+    assert "Call Options Available" not in result
+    assert index.lookup("ABC") is True
+
+
+def test_symbol_directory_is_downloaded_on_schedule(tmp_path, monkeypatch):
+    downloads = []
+
+    def fake_download(url):
+        downloads.append(url)
+        return b"Symbol\nAAPL\nSPY\n"
+
+    monkeypatch.setattr(oi, "_download_symbols", fake_download)
+    index = OptionableIndex(path=tmp_path / "optionable.json", symbols_file=None,
+                            symbols_url="https://example.test/symbols.csv", ttl=3600)
+    assert index.refresh_symbols() is True
+    assert index.lookup("spy") is True and index.lookup("ZZZZ") is False
+    # Fresh within the TTL: no second download
+    assert index.refresh_symbols() is False
+    assert downloads == ["https://example.test/symbols.csv"]
+    assert index.stats()["directory_downloads"] == 1
+
+    # A failed refresh keeps the previous directory
+    def unavailable(url):
+        raise OSError("directory unavailable")
+
+    monkeypatch.setattr(oi, "_download_symbols", unavailable)
+    index.ttl = 0
+    assert index.refresh_symbols() is False
+    assert index.lookup("AAPL") is True
@@ -0,0 +1,41 @@
+import json
+import os
+import sys
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools.persist import atomic_write, save_json  # noqa: E402
+
+
+def test_atomic_write_creates_parents_and_replaces(tmp_path):
+    path = tmp_path / "a" / "b" / "state.json"
+    atomic_write(path, "one")
+    atomic_write(path, b"two")
+    atomic_write(path, lambda tmp: tmp.write_text("three"))
+    assert path.read_text() == "three"
+    assert os.listdir(path.parent) == ["state.json"]
+
+
+def test_failed_write_leaves_target_and_no_temp_file(tmp_path):
+    path = tmp_path / "state.json"
+    atomic_write(path, "kept")
+
+    def broken(tmp):
+        tmp.write_text("partial")
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(path, broken)
+    assert path.read_text() == "kept"
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_save_json_is_best_effort(tmp_path):
+    assert save_json(tmp_path / "x.json", {"a": 1})
+    assert json.loads((tmp_path / "x.json").read_text()) == {"a": 1}
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    assert save_json(blocker / "x.json", {"a": 1}) is False
@@ -0,0 +1,91 @@
+import os
+import sys
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools import screener  # noqa: E402
+
+
+def test_rank_52week_lows_vectorised():
+    nan = np.nan
+    close = np.array([
+        [10.0, 9.0, 8.0, 8.2],    # 2.5% above low -> hit
+        [10.0, 11.0, 12.0, 13.0],  # far above low
+        [nan, 5.0, 4.0, nan],     # trailing NaN, sits at its low -> best hit
+        [nan, nan, nan, nan],     # no data
+    ])
+    low = close - 0.0
+    low[0, 2] = 8.0
+
+    ranked = screener.rank_52week_lows(close, low, tolerance=0.05)
+
+    assert list(ranked["order"]) == [2, 0]
+    assert ranked["last"][2] == 4.0
+    assert ranked["low_idx"][0] == 2
+    assert ranked["distance"][0] == pytest.approx(0.025)
+    assert np.isnan(ranked["distance"][3])
+    assert not ranked["near"][1]
+
+
+def test_build_matrices_aligns_mixed_calendars():
+    a = pd.DataFrame({"Close": [1.0, 2.0], "Low": [0.5, 1.5]},
+                     index=pd.DatetimeIndex(["2024-01-02", "2024-01-03"], tz="America/New_York"))
+    b = pd.DataFrame({"Close": [3.0], "Low": [2.5]}, index=pd.DatetimeIndex(["2024-01-04"]))
+
+    tickers, close, low, dates = screener.build_matrices({"A": a, "B": b, "EMPTY": pd.DataFrame()})
+
+    assert tickers == ["A", "B"]
+    assert close.shape == (2, 3)
+    assert np.isnan(close[1, 0]) and close[1, 2] == 3.0
+    assert dates[0] == pd.Timestamp("2024-01-02")
+
+
+def test_resolve_universe_from_file(tmp_path, monkeypatch):
+    (tmp_path / "small.txt").write_text("aapl\n# comment\nmsft  # inline\n\nAAPL\n")
+    monkeypatch.setattr(screener, "UNIVERSE_DIR", tmp_path)
+    assert screener.resolve_universe("small") == ["AAPL", "MSFT"]
+    assert screener.resolve_universe("f, gm") == ["F", "GM"]
+    # A single name without a file must be a ticker symbol
+    assert screener.resolve_universe("brk.b") == ["BRK.B"]
+    for name in ("sp500", "russell2000", "nasdaq_100"):
+        with pytest.raises(ValueError, match="Unknown universe"):
+            screener.resolve_universe(name)
+
+
+def test_shipped_universe():
+    assert len(screener.resolve_universe("dow30")) == 30
+
+
+def test_resolve_universe_rejects_paths(tmp_path, monkeypatch):
+    universes = tmp_path / "universes"
+    universes.mkdir()
+    (tmp_path / "secret.txt").write_text("root:x:0:0\n")
+    monkeypatch.setattr(screener, "UNIVERSE_DIR", universes)
+    for name in ("../secret", str(tmp_path / "secret.txt"), "../../../../etc/passwd", "..\\secret"):
+        with pytest.raises(ValueError):
+            screener.resolve_universe(name)
+    # A symlink out of the directory is not followed either
+    (universes / "link.txt").symlink_to(tmp_path / "secret.txt")
+    assert screener.resolve_universe("link") == ["LINK"]
+
+
+@pytest.mark.asyncio
+async def test_scan_52week_lows_table():
+    index = pd.date_range("2024-01-01", periods=5, freq="D")
+    frames = {
+        "NEAR": pd.DataFrame({"Close": [5, 4, 3, 2, 2.05], "Low": [5, 4, 3, 2, 2]}, index=index, dtype=float),
+        "FAR": pd.DataFrame({"Close": [1, 2, 3, 4, 5], "Low": [1, 2, 3, 4, 5]}, index=index, dtype=float),
+    }
+    with patch.object(screener, "get_history_batch", AsyncMock(return_value=frames)):
+        text = await screener.scan_52week_lows(["NEAR", "FAR", "GONE"], tolerance=0.05)
+
+    assert "1 hits" in text
+    assert "| 1 | NEAR | 2.05 | 2.00 | 2024-01-04 | 2.50 |" in text
+    assert "FAR |" not in text
+    assert "No data: 1 tickers" in text
@@ -0,0 +1,96 @@
+import os
+import sys
+
+import httpx
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools.sec_http import (  # noqa: E402
+    SecHttpClient, TokenBucket, share_budget_with_edgartools, split_rate_budget, validators_of,
+)
+
+
+def _flaky_handler(statuses):
+    """Answer with ``statuses`` in turn, then 200; records every request."""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        status = statuses[len(seen) - 1] if len(seen) <= len(statuses) else 200
+        return httpx.Response(status, headers={"Retry-After": "0"} if status == 429 else {}, text="ok")
+
+    return handler, seen
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    bucket = TokenBucket(rate=10, capacity=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+    assert TokenBucket(rate=0).reserve() == 0.0
+
+
+def test_retries_429_and_503_then_succeeds():
+    handler, seen = _flaky_handler([429, 503])
+    client = SecHttpClient(rate=0, backoff=0.001, transport=httpx.MockTransport(handler))
+    response = client.get("https://www.sec.gov/x")
+    assert response.status_code == 200
+    assert len(seen) == 3
+    assert seen[0].headers["User-Agent"]
+    assert client.stats()["retries"] == 2
+
+
+def test_gives_up_after_configured_retries():
+    handler, seen = _flaky_handler([503] * 5)
+    client = SecHttpClient(rate=0, retries=2, backoff=0.001, transport=httpx.MockTransport(handler))
+    assert client.get("https://www.sec.gov/x").status_code == 503
+    assert len(seen) == 3
+
+
+def test_conditional_get_sends_validators():
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+                              json={"name": "Fake"})
+
+    client = SecHttpClient(rate=0, transport=httpx.MockTransport(handler))
+    first = client.get("https://data.sec.gov/submissions/CIK0000001234.json")
+    validators = validators_of(first)
+    assert validators == {"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    again = client.get("https://data.sec.gov/submissions/CIK0000001234.json", validators=validators)
+    assert again.status_code == 304
+    assert client.stats()["not_modified"] == 1
+
+
+def test_open_lines_streams_and_maps_missing_to_none():
+    def handler(request):
+        if request.url.path.endswith("missing.idx"):
+            return httpx.Response(403)
+        return httpx.Response(200, text="a\nb\n")
+
+    client = SecHttpClient(rate=0, transport=httpx.MockTransport(handler))
+    assert client.open_lines("https://www.sec.gov/missing.idx") is None
+    assert list(client.open_lines("https://www.sec.gov/form.idx")) == ["a", "b"]
+
+
+def test_rate_budget_is_split_with_edgartools():
+    assert split_rate_budget(10) == (5.0, 5)
+    assert split_rate_budget(10, edgartools=7) == (3.0, 7)
+    # edgartools cannot take the whole budget
+    assert split_rate_budget(10, edgartools=12) == (1.0, 9)
+    assert split_rate_budget(0) == (0.0, 9)
+
+
+def test_edgartools_throttle_gets_its_share(monkeypatch):
+    from edgar import httpclient
+
+    applied = []
+    monkeypatch.setattr(httpclient.HTTP_MGR, "update_rate_limiter", applied.append)
+    monkeypatch.setenv("EDGAR_RATE_LIMIT_PER_SEC", "9")
+    share_budget_with_edgartools(4)
+    assert os.environ["EDGAR_RATE_LIMIT_PER_SEC"] == "4"
+    assert applied == [4]
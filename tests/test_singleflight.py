@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools import history_cache as hc  # noqa: E402
+from src.tools.singleflight import SingleFlight  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "bars"
+
+    results = await asyncio.gather(*(flights.do("AAPL", fetch) for _ in range(5)))
+    assert results == ["bars"] * 5
+    assert calls == 1
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "followers": 4}
+
+    # Once finished the key is released and a new call fetches again
+    await flights.do("AAPL", fetch)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_all_waiters():
+    flights = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(*(flights.do("k", boom) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_abort_shared_fetch():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return 42
+
+    first = asyncio.create_task(flights.do("k", fetch))
+    second = asyncio.create_task(flights.do("k", fetch))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == 42
+
+
+@pytest.mark.asyncio
+async def test_concurrent_history_requests_download_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(hc.ohlcv_store, "root", tmp_path)
+    hc.history_cache.clear()
+    index = pd.date_range(end=pd.Timestamp.now().normalize(), periods=30, freq="D")
+    mock_ticker = MagicMock()
+
+    def slow_history(**kwargs):
+        import time
+        time.sleep(0.05)
+        return pd.DataFrame({"Close": 1.0, "High": 1.0, "Low": 1.0}, index=index)
+
+    mock_ticker.history.side_effect = slow_history
+    with patch("src.tools.history_cache.yf.Ticker", return_value=mock_ticker):
+        frames = await asyncio.gather(*(hc.get_history("HOT", period="2y") for _ in range(6)))
+
+    assert all(len(f) == 30 for f in frames)
+    assert mock_ticker.history.call_count == 1
+    hc.history_cache.clear()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools import stats  # noqa: E402
+from src.tools.filing_cache import FilingTextCache  # noqa: E402
+from src.tools.text_index import TextIndex  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_report_covers_every_subsystem(tmp_path, monkeypatch):
+    monkeypatch.setattr(stats, "filing_text_cache", FilingTextCache(root=tmp_path / "filings"))
+    monkeypatch.setattr(stats, "text_index", TextIndex(tmp_path / "text_index.sqlite3"))
+    report = await stats.get_cache_stats()
+    for section in ("Price History Cache:", "OHLCV Store", "MACD State:", "Optionable Index",
+                    "Filing Text Cache", "Filing Metadata Index:", "Ticker Map:", "SEC HTTP Client:",
+                    "Filing Text Index:", "Markdown Chunk Cursors:"):
+        assert section in report
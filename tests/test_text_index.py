@@ -0,0 +1,110 @@
+import os
+import sys
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import src.tools.edgar_tools as edgar_tools  # noqa: E402
+from src.tools.filing_cache import FilingTextCache  # noqa: E402
+from src.tools.text_index import TextIndex, tokenize  # noqa: E402
+from src.tools.ticker_map import TickerMap  # noqa: E402
+
+BODY = "On May 1 the Company issued a Convertible Note. The conversion price is $0.50 per share."
+EXHIBIT = "SECURITIES PURCHASE AGREEMENT for the convertible note; conversion\nprice adjusts."
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = TextIndex(tmp_path / "text_index.sqlite3")
+    idx.add("0000000011-25-000001", BODY, "body", cik=11, company="ALPHA INC", form="8-K", filing_date="2025-05-01")
+    idx.add("0000000022-25-000002", "Item 5.02 departure of a convertible director", "body",
+            cik=22, company="BETA CORP", form="8-K", filing_date="2025-05-02")
+    idx.add("0000000033-25-000003", "Item 1.01 material agreement", "body",
+            cik=33, company="GAMMA LTD", form="8-K", filing_date="2025-05-03")
+    idx.add("0000000033-25-000003", EXHIBIT, "exhibits",
+            cik=33, company="GAMMA LTD", form="8-K", filing_date="2025-05-03")
+    return idx
+
+
+def test_tokenize_lowercases_alphanumeric_runs():
+    assert tokenize("Convertible Note, $0.50!") == ["convertible", "note", "0", "50"]
+
+
+def test_phrases_match_consecutive_terms_with_offsets(index):
+    hits = index.query(["convertible note", "conversion price"])
+    # Body and exhibit text both count; newest first
+    assert [h.accession_no for h in hits] == ["0000000033-25-000003", "0000000011-25-000001"]
+    alpha = hits[1]
+    assert alpha.company == "ALPHA INC" and alpha.cik == 11
+    part, offset = alpha.matches["convertible note"][0]
+    assert (part, BODY[offset:offset + 16].lower()) == ("body", "convertible note")
+    gamma = hits[0]
+    assert gamma.matches["conversion price"] == [("exhibits", EXHIBIT.index("conversion"))]
+    # "convertible director" is not the phrase
+    assert "0000000022-25-000002" not in [h.accession_no for h in index.query(["convertible note"])]
+
+
+def test_date_window_ciks_and_reindex(index):
+    assert [h.accession_no for h in index.query(["convertible"], start=date(2025, 5, 2))] == [
+        "0000000033-25-000003", "0000000022-25-000002",
+    ]
+    assert [h.cik for h in index.query(["convertible"], ciks=[11, 22])] == [22, 11]
+    assert index.query(["convertible"], ciks=[]) == []
+
+    index.add("0000000011-25-000001", "restated text", "body", cik=11, company="ALPHA INC", filing_date="2025-05-01")
+    assert index.query(["convertible note"], ciks=[11]) == []
+    assert index.stats()["filings"] == 3
+    with pytest.raises(ValueError):
+        index.query(["  ", "$"])
+
+
+@pytest.mark.asyncio
+async def test_filings_entering_cache_are_indexed_and_queryable(tmp_path, monkeypatch):
+    today = date.today()
+    filings = [
+        SimpleNamespace(accession_no=f"000000001{i}-26-00000{i}", cik=10 + i, company=f"CO {i}", form="8-K",
+                        filing_date=today - timedelta(days=i), url="u", items="3.02",
+                        text=lambda i=i: f"Item 3.02 holders converted the convertible note #{i}")
+        for i in range(3)
+    ]
+    idx = TextIndex(tmp_path / "text_index.sqlite3")
+    monkeypatch.setattr(edgar_tools, "text_index", idx)
+    monkeypatch.setattr(edgar_tools, "filing_text_cache", FilingTextCache(root=tmp_path / "cache"))
+    monkeypatch.setattr(edgar_tools, "_exhibits_text", lambda filing: "")
+    monkeypatch.setattr(edgar_tools, "_indexed_filings", lambda ticker, form, start, limit: filings)
+    await edgar_tools.search_debt_conversions("TEST", months_back=3)
+    assert idx.stats()["filings"] == 3
+
+    tickers = tmp_path / "company_tickers.json"
+    tickers.write_text('{"0": {"cik_str": 11, "ticker": "ONE", "title": "CO 1"}}')
+    monkeypatch.setattr(edgar_tools, "ticker_map", TickerMap(source_file=str(tickers)))
+    result = await edgar_tools.search_indexed_filings(["convertible note"], days=30, universe=["ONE"])
+    assert "Found 1 filings among 3 indexed" in result
+    assert "CO 1 (CIK 11)" in result
+    assert '"convertible note": 1 (body@' in result
+
+
+def test_index_shrinks_when_cache_evicts(tmp_path, monkeypatch):
+    idx = TextIndex(tmp_path / "text_index.sqlite3")
+    monkeypatch.setattr(edgar_tools, "text_index", idx)
+    # A one-byte budget keeps only the newest entry
+    cache = FilingTextCache(root=tmp_path / "cache", max_bytes=1, on_evict=edgar_tools._unindex_evicted)
+    for i in range(3):
+        accession = f"000000001{i}-25-00000{i}"
+        cache.put(accession, f"{BODY} #{i}")
+        idx.add(accession, f"{BODY} #{i}", "body", cik=10 + i, filing_date=f"2025-05-0{i + 1}")
+    assert cache.stats()["entries"] == 1
+    assert idx.stats()["docs"] == 1
+    assert [h.accession_no for h in idx.query(["convertible note"])] == ["0000000012-25-000002"]
+
+    cache.put("0000000012-25-000002-exhibits", EXHIBIT)
+    idx.add("0000000012-25-000002", EXHIBIT, "exhibits", cik=12, filing_date="2025-05-03")
+    assert idx.stats() == {"docs": 1, "filings": 1, "queries": 1}
+    assert [p for p, _ in idx.query(["conversion price"])[0].matches["conversion price"]] == ["exhibits"]
+
+    cache.clear()
+    assert idx.stats()["docs"] == 0
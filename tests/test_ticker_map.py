@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import src.tools.ticker_map as ticker_map_module  # noqa: E402
+from src.tools.ticker_map import CompanyCache, TickerMap, UnknownTickerError  # noqa: E402
+
+TABLE = {
+    "0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."},
+    "1": {"cik_str": 1067983, "ticker": "BRK-B", "title": "BERKSHIRE HATHAWAY INC"},
+}
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    calls = []
+
+    def fake_download(url):
+        calls.append(url)
+        return TABLE
+
+    monkeypatch.setattr(ticker_map_module, "_download_tickers", fake_download)
+    return calls
+
+
+def test_local_file_is_authoritative_and_unknown_fails_fast(tmp_path, downloads):
+    source = tmp_path / "company_tickers.json"
+    source.write_text(json.dumps(TABLE))
+    tickers = TickerMap(path=tmp_path / "cache.json", source_file=str(source))
+
+    assert tickers.resolve("aapl") == 320193
+    assert tickers.resolve("BRK.B") == 1067983
+    assert tickers.lookup("AAPL") == (320193, "Apple Inc.")
+    assert tickers.resolve("0000320193") == 320193
+    with pytest.raises(UnknownTickerError):
+        tickers.resolve("NOPE")
+    assert downloads == []
+    assert tickers.stats() == {"tickers": 2, "downloads": 0, "unknown": 1}
+
+
+def test_download_is_persisted_and_refreshed_after_ttl(tmp_path, downloads):
+    path = tmp_path / "cache.json"
+    tickers = TickerMap(path=path, source_file=None, ttl=3600)
+    assert tickers.resolve("AAPL") == 320193
+    assert tickers.resolve("BRK-B") == 1067983
+    assert len(downloads) == 1
+
+    # A new process reads the fresh on-disk copy instead of downloading
+    reopened = TickerMap(path=path, source_file=None, ttl=3600)
+    assert reopened.load() == 2
+    assert len(downloads) == 1
+
+    stale = time.time() - 7200
+    os.utime(path, (stale, stale))
+    expired = TickerMap(path=path, source_file=None, ttl=3600)
+    expired.load()
+    assert len(downloads) == 2
+
+
+def test_no_table_falls_back_to_edgar(tmp_path, monkeypatch):
+    def offline(url):
+        raise OSError("offline")
+
+    monkeypatch.setattr(ticker_map_module, "_download_tickers", offline)
+    tickers = TickerMap(path=tmp_path / "missing.json", source_file=None)
+    assert tickers.resolve("AAPL") is None
+
+
+def test_company_cache_memoises_until_ttl(monkeypatch):
+    loads = []
+    monkeypatch.setattr(ticker_map_module, "Company", lambda key: loads.append(key) or object())
+    cache = CompanyCache(ttl=3600)
+    first = cache.get(320193)
+    assert cache.get("320193") is first
+    assert loads == [320193]
+
+    cache.ttl = 0
+    assert cache.get(320193) is not first
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2}
@@ -0,0 +1,42 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.tools.upstream import SEC, YAHOO, get_executor, run_upstream  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_blocking_calls_overlap():
+    """Blocking upstream calls must not serialise on the event loop."""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_upstream(YAHOO, time.sleep, 0.2) for _ in range(4)))
+    elapsed = time.perf_counter() - start
+    assert results == [None] * 4
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive():
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    await run_upstream(SEC, time.sleep, 0.2)
+    beat.cancel()
+    assert ticks >= 5
+
+
+def test_unknown_upstream_rejected():
+    with pytest.raises(ValueError):
+        get_executor("nasdaq")